@@ -0,0 +1,371 @@
+from array import array
+
+from antlr4 import Token
+from antlr4.RuleContext import RuleContext
+from antlr4.Token import CommonToken
+from antlr4.tree.Tree import TerminalNodeImpl
+
+from .JavaParser import JavaParser
+
+
+class FlatTree(object):
+    """
+    A parse tree stored as columns of integers instead of ANTLR objects. Nodes are identified by their rank in the
+    preorder walk that visits the last child first, which is the order seekAllNodes reports them in. The subtree of a
+    node is the range of ranks [rank, rank + size). Node objects are only created on demand, as views on the columns
+    that behave like the ANTLR contexts and terminal nodes they replace.
+    """
+
+    formatVersion = 1  # part of the parse cache key, so that entries in an older layout are not read back
+    tokenFieldCount = 7  # type, channel, start, stop, tokenIndex, line, column
+
+    def __init__(self):
+        self.nodeClasses = list()  # kind -> context class, or TerminalNodeImpl
+        self.nodeKinds = array('i')
+        self.parentRanks = array('i')  # -1 for the root
+        self.firstChildRanks = array('i')  # rank of the leftmost child, -1 for leaves
+        self.subtreeSizes = array('i')
+        self.nodeDepths = array('i')
+        self.nodeIndices = array('i')  # breadth-first index assigned by numerify
+        self.tokenStarts = array('i')  # start token of a context, or the symbol of a terminal node
+        self.tokenStops = array('i')
+        self.nodeLines = array('i')
+        self.nodeSymbols = array('i')  # token type of a terminal node, -1 for contexts
+        self.ranksByNodeIndex = array('i')
+        self.tokenColumns = array('i')
+        self.tokenTexts = list()
+        self.viewClasses = list()
+        self.kindIndex = None
+
+    def __len__(self):
+        return len(self.nodeKinds)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['nodeClasses'] = [nodeClass.__name__ for nodeClass in self.nodeClasses]
+        del state['viewClasses']
+        del state['kindIndex']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.nodeClasses = [TerminalNodeImpl if className == TerminalNodeImpl.__name__ else
+                            getattr(JavaParser, className) for className in self.nodeClasses]
+        self.viewClasses = [getViewClass(nodeClass) for nodeClass in self.nodeClasses]
+        self.kindIndex = None
+
+    def addParseTree(self, tree: RuleContext) -> list:
+        """
+        Fills the columns from an ANTLR parse tree.
+
+        :param tree:
+        :type tree: RuleContext
+        :return: the nodes of the tree by rank
+        :rtype: list
+        """
+        assert len(self) == 0
+        preorderNodes = list()
+        classKinds = dict()
+        tokenIDs = dict()
+
+        def getTokenID(token):
+            if token is None:
+                return -1
+            if id(token) not in tokenIDs:
+                tokenIDs[id(token)] = len(self.tokenTexts)
+                self.tokenColumns.extend((token.type, token.channel, token.start, token.stop, token.tokenIndex,
+                                          token.line, token.column))
+                self.tokenTexts.append(token.text)
+            return tokenIDs[id(token)]
+
+        stack = [(tree, -1, 0)]
+        while len(stack) > 0:
+            node, parentRank, depth = stack.pop()
+            rank = len(preorderNodes)
+            preorderNodes.append(node)
+
+            nodeClass = TerminalNodeImpl if isinstance(node, TerminalNodeImpl) else type(node)
+            if nodeClass not in classKinds:
+                classKinds[nodeClass] = len(self.nodeClasses)
+                self.nodeClasses.append(nodeClass)
+
+            self.nodeKinds.append(classKinds[nodeClass])
+            self.parentRanks.append(parentRank)
+            self.nodeDepths.append(depth)
+
+            if nodeClass is TerminalNodeImpl:
+                tokenID = getTokenID(node.symbol)
+                self.tokenStarts.append(tokenID)
+                self.tokenStops.append(tokenID)
+                self.nodeSymbols.append(node.symbol.type)
+                self.nodeLines.append(node.symbol.line)
+            else:
+                self.tokenStarts.append(getTokenID(node.start))
+                self.tokenStops.append(getTokenID(node.stop))
+                self.nodeSymbols.append(-1)
+                self.nodeLines.append(node.start.line if node.start is not None else 0)
+
+            children = getattr(node, 'children', None)
+            if children:
+                stack.extend([(child, rank, depth + 1) for child in children])
+
+        self.viewClasses = [getViewClass(nodeClass) for nodeClass in self.nodeClasses]
+        self.buildDerivedColumns()
+
+        return preorderNodes
+
+    def buildDerivedColumns(self):
+        """
+        Computes subtree sizes, first children and the breadth-first numbering from the parent and depth columns.
+        """
+        nodeCount = len(self)
+        self.subtreeSizes = array('i', [1]) * nodeCount
+        self.firstChildRanks = array('i', [-1]) * nodeCount
+        levels = [list() for _ in range(max(self.nodeDepths) + 1)]
+
+        # read backwards, the walk visits the nodes of each depth from left to right, which is exactly breadth-first
+        # order once grouped by depth. the leftmost child of a node is the last one seen in this pass.
+        for rank in range(nodeCount - 1, -1, -1):
+            levels[self.nodeDepths[rank]].append(rank)
+
+            parentRank = self.parentRanks[rank]
+            if parentRank != -1:
+                self.subtreeSizes[parentRank] += self.subtreeSizes[rank]
+                if self.firstChildRanks[parentRank] == -1:
+                    self.firstChildRanks[parentRank] = rank
+
+        self.nodeIndices = array('i', [0]) * nodeCount
+        self.ranksByNodeIndex = array('i', [-1])
+        for level in levels:
+            for rank in level:
+                self.nodeIndices[rank] = len(self.ranksByNodeIndex)
+                self.ranksByNodeIndex.append(rank)
+
+    def getChildRanks(self, rank: int) -> list:
+        """
+
+        :param rank:
+        :type rank: int
+        :return: the ranks of the children of the node, from left to right
+        :rtype: list
+        """
+        childRanks = list()
+        if self.firstChildRanks[rank] == -1:
+            return childRanks
+
+        # the last child comes right after its parent, and each earlier sibling right after the subtree of the next.
+        childRank = rank + 1
+        while childRank <= self.firstChildRanks[rank]:
+            childRanks.append(childRank)
+            childRank += self.subtreeSizes[childRank]
+
+        childRanks.reverse()
+        return childRanks
+
+    def getKindIndex(self) -> dict:
+        """
+
+        :return: node class -> ordered ranks of the nodes of that class
+        :rtype: dict
+        """
+        if self.kindIndex is None:
+            kindRanks = [array('i') for _ in self.nodeClasses]
+            for rank, kind in enumerate(self.nodeKinds):
+                kindRanks[kind].append(rank)
+            self.kindIndex = dict(zip(self.nodeClasses, kindRanks))
+
+        return self.kindIndex
+
+    def getNode(self, rank: int):
+        """
+
+        :param rank:
+        :type rank: int
+        :return: a view on the node with the given rank
+        """
+        return self.viewClasses[self.nodeKinds[rank]](self, rank)
+
+    def getToken(self, tokenID: int):
+        """
+
+        :param tokenID:
+        :type tokenID: int
+        :return: a view on the token, or None
+        """
+        return FlatToken(self, tokenID) if tokenID != -1 else None
+
+    def getText(self, rank: int) -> str:
+        """
+
+        :param rank:
+        :type rank: int
+        :return: the concatenated text of the terminal nodes under the node, like RuleContext.getText
+        :rtype: str
+        """
+        terminalKind = self.nodeClasses.index(TerminalNodeImpl) if TerminalNodeImpl in self.nodeClasses else -1
+        textList = [self.tokenTexts[self.tokenStarts[descendant]]
+                    for descendant in range(rank, rank + self.subtreeSizes[rank])
+                    if self.nodeKinds[descendant] == terminalKind]
+
+        # leaves appear from right to left in this walk.
+        textList.reverse()
+        return "".join(textList)
+
+    def toParseTree(self) -> RuleContext:
+        """
+        Rebuilds the ANTLR parse tree.
+
+        :return:
+        :rtype: JavaParser.CompilationUnitContext
+        """
+        tokens = list()
+        for tokenID in range(0, len(self.tokenTexts)):
+            offset = tokenID * self.tokenFieldCount
+            tokenType, channel, start, stop, tokenIndex, line, column = \
+                self.tokenColumns[offset:offset + self.tokenFieldCount]
+            token = CommonToken(type=tokenType, channel=channel, start=start, stop=stop)
+            token.tokenIndex = tokenIndex
+            token.line = line
+            token.column = column
+            token.text = self.tokenTexts[tokenID]
+            tokens.append(token)
+
+        nodes = list()
+        for rank in range(0, len(self)):
+            nodeClass = self.nodeClasses[self.nodeKinds[rank]]
+            parent = nodes[self.parentRanks[rank]] if self.parentRanks[rank] != -1 else None
+
+            if nodeClass is TerminalNodeImpl:
+                node = TerminalNodeImpl(tokens[self.tokenStarts[rank]])
+                node.parentCtx = parent
+            else:
+                node = nodeClass(None, parent)
+                node.start = tokens[self.tokenStarts[rank]] if self.tokenStarts[rank] != -1 else None
+                node.stop = tokens[self.tokenStops[rank]] if self.tokenStops[rank] != -1 else None
+            nodes.append(node)
+
+        for rank in range(0, len(self)):
+            if self.firstChildRanks[rank] != -1:
+                nodes[rank].children = [nodes[childRank] for childRank in self.getChildRanks(rank)]
+
+        return nodes[0]
+
+
+class FlatToken(Token):
+    """
+    A read-only view on a token of a FlatTree.
+    """
+
+    def __init__(self, flatTree: FlatTree, tokenID: int):
+        self.flatTree = flatTree
+        self.tokenID = tokenID
+
+    def getField(self, field: int) -> int:
+        """
+
+        :param field: position of the field in the token columns
+        :type field: int
+        :return:
+        :rtype: int
+        """
+        return self.flatTree.tokenColumns[self.tokenID * FlatTree.tokenFieldCount + field]
+
+    source = CommonToken.EMPTY_SOURCE
+    type = property(lambda self: self.getField(0))
+    channel = property(lambda self: self.getField(1))
+    start = property(lambda self: self.getField(2))
+    stop = property(lambda self: self.getField(3))
+    tokenIndex = property(lambda self: self.getField(4))
+    line = property(lambda self: self.getField(5))
+    column = property(lambda self: self.getField(6))
+    text = property(lambda self: self.flatTree.tokenTexts[self.tokenID])
+
+    def __eq__(self, other):
+        return isinstance(other, FlatToken) and self.flatTree is other.flatTree and self.tokenID == other.tokenID
+
+    def __hash__(self):
+        return hash((id(self.flatTree), self.tokenID))
+
+    def __str__(self):
+        return self.text
+
+
+class FlatNode(object):
+    """
+    Base class of the views on the nodes of a FlatTree. Two views on the same node compare equal.
+    """
+
+    def __init__(self, flatTree: FlatTree, rank: int):
+        self.flatTree = flatTree
+        self.preorderRank = rank
+
+    @property
+    def nodeIndex(self) -> int:
+        return self.flatTree.nodeIndices[self.preorderRank]
+
+    @property
+    def parentCtx(self):
+        parentRank = self.flatTree.parentRanks[self.preorderRank]
+        return self.flatTree.getNode(parentRank) if parentRank != -1 else None
+
+    def __eq__(self, other):
+        return isinstance(other, FlatNode) and self.flatTree is other.flatTree and \
+            self.preorderRank == other.preorderRank
+
+    def __hash__(self):
+        return hash((id(self.flatTree), self.preorderRank))
+
+
+class FlatContext(FlatNode):
+    """
+    Mixed into a JavaParser context class to make a view on a context node.
+    """
+
+    @property
+    def children(self):
+        if self.flatTree.firstChildRanks[self.preorderRank] == -1:
+            return None
+        return [self.flatTree.getNode(childRank) for childRank in self.flatTree.getChildRanks(self.preorderRank)]
+
+    @property
+    def start(self):
+        return self.flatTree.getToken(self.flatTree.tokenStarts[self.preorderRank])
+
+    @property
+    def stop(self):
+        return self.flatTree.getToken(self.flatTree.tokenStops[self.preorderRank])
+
+    def getChildCount(self):
+        return len(self.flatTree.getChildRanks(self.preorderRank))
+
+    def getText(self):
+        return self.flatTree.getText(self.preorderRank)
+
+
+class FlatTerminalNode(FlatNode, TerminalNodeImpl):
+    """
+    A view on a terminal node.
+    """
+
+    @property
+    def symbol(self):
+        return self.flatTree.getToken(self.flatTree.tokenStarts[self.preorderRank])
+
+
+viewClassCache = dict()
+
+
+def getViewClass(nodeClass: type) -> type:
+    """
+
+    :param nodeClass: a JavaParser context class, or TerminalNodeImpl
+    :type nodeClass: type
+    :return: the class of the views on nodes of that class
+    :rtype: type
+    """
+    # views keep the name of the class they stand in for, so that they print the same.
+    if nodeClass not in viewClassCache:
+        viewBases = (FlatTerminalNode,) if nodeClass is TerminalNodeImpl else (FlatContext, nodeClass)
+        viewClassCache[nodeClass] = type(nodeClass.__name__, viewBases, {'__module__': __name__})
+
+    return viewClassCache[nodeClass]
@@ -1,7 +1,10 @@
+import collections
+import contextlib
 import fnmatch
 import io
 import os
 import shutil
+import zipfile
 from typing import Dict, List
 
 
@@ -15,6 +18,12 @@ class JavaIO(object):
         self.sourceDirectory = None
         self.targetDirectory = None
         self.fileList = list()
+        # the number of the next mutant in each mutant directory that was prepared, and the numbers of the mutants
+        # that were already in the directory
+        self.mutantCounters = dict()  # type: Dict[str, int]
+        self.existingMutantNumbers = dict()  # type: Dict[str, set]
+        # the mutant directories the density and complexity reports were written to
+        self.artifactDirectories = set()
 
     def filterFiles(self, mode="blacklist", filterList=None):
         """
@@ -130,12 +139,119 @@ class JavaIO(object):
 
         return aggregateReport
 
+    def getTargetDirectory(self, originalFile=None):
+        """
+
+        :param originalFile:
+        :type originalFile:
+        :return: the directory the mutants of the source file are written to
+        :rtype: str
+        """
+        originalFileRoot, originalFileName = os.path.split(originalFile)
+
+        return os.path.join(self.targetDirectory, os.path.relpath(originalFileRoot, self.sourceDirectory),
+                            originalFileName)
+
+    def prepareTargetDirectory(self, originalFile=None):
+        """
+        Creates the directory for the mutants of a source file, with a copy of the original file.
+
+        :param originalFile:
+        :type originalFile:
+        :return: the directory
+        :rtype: str
+        """
+        targetDir = self.getTargetDirectory(originalFile)
+
+        # the directory is only looked at the first time, after that only its counter is used.
+        if targetDir in self.mutantCounters:
+            return targetDir
+
+        if not os.path.exists(targetDir):
+            os.makedirs(targetDir)
+        if not os.path.isfile(os.path.join(targetDir, "original.java")):
+            shutil.copyfile(originalFile, os.path.join(targetDir, "original.java"))
+
+        # the mutants left in the directory keep their numbers, and new mutants are numbered around them.
+        self.mutantCounters[targetDir] = 1
+        self.existingMutantNumbers[targetDir] = set(int(fileName[:-5]) for fileName in os.listdir(targetDir)
+                                                    if fileName.endswith(".java") and fileName[:-5].isdigit())
+
+        return targetDir
+
+    def writeFileArtifacts(self, originalFile=None, mutantsPerLine=None, densityReport=None,
+                           aggregateComplexity=None):
+        """
+        Writes the density and complexity reports of a source file next to its mutants. This happens once per
+        file, and the reports are kept if they are already there.
+
+        :param originalFile:
+        :type originalFile:
+        :param mutantsPerLine:
+        :type mutantsPerLine:
+        :param densityReport:
+        :type densityReport:
+        :param aggregateComplexity:
+        :type aggregateComplexity:
+        """
+        targetDir = self.prepareTargetDirectory(originalFile)
+
+        if targetDir in self.artifactDirectories:
+            return
+        self.artifactDirectories.add(targetDir)
+
+        fileArtifacts = self.getFileArtifacts(mutantsPerLine, densityReport, aggregateComplexity)
+
+        if not all(os.path.isfile(os.path.join(targetDir, artifactName)) for artifactName in fileArtifacts.keys()):
+            for artifactName, artifactContent in fileArtifacts.items():
+                with open(os.path.abspath(os.path.join(targetDir, artifactName)), 'w') as densityFileHandle:
+                    densityFileHandle.write(artifactContent)
+
+    @staticmethod
+    def getFileArtifacts(mutantsPerLine=None, densityReport=None, aggregateComplexity=None):
+        """
+        Renders the density and complexity reports of a source file.
+
+        :param mutantsPerLine:
+        :type mutantsPerLine:
+        :param densityReport:
+        :type densityReport:
+        :param aggregateComplexity:
+        :type aggregateComplexity:
+        :return: the content of each report, by file name
+        :rtype: Dict[str, str]
+        """
+        densityPerLine = "".join(str(key) + ',' + str(mutantsPerLine[key]) + '\n'
+                                 for key in sorted(mutantsPerLine.keys()))
+        complexityPerMethod = "".join(";".join([str(key)] + [str(x) for x in aggregateComplexity[key]]) + '\n'
+                                      for key in sorted(aggregateComplexity.keys()))
+
+        return {"MutantDensityPerLine.csv": densityPerLine, "ComplexityPerMethod.csv": complexityPerMethod,
+                "aggregate.html": densityReport}
+
+    def getNextMutantNumber(self, targetDir=None):
+        """
+        Gives the number of the next mutant in a directory made by prepareTargetDirectory, without looking at the
+        files in the directory.
+
+        :param targetDir: the mutant directory
+        :type targetDir: str
+        :return: the number of the mutant
+        :rtype: int
+        """
+        counter = self.mutantCounters[targetDir]
+        while counter in self.existingMutantNumbers[targetDir]:
+            counter += 1
+        self.mutantCounters[targetDir] = counter + 1
+
+        return counter
+
     def generateNewFile(self, originalFile=None, fileData=None, mutantsPerLine=None, densityReport=None, aggregateComplexity=None):
         """
 
         :param originalFile:
         :type originalFile:
-        :param fileData:
+        :param fileData: the content of the mutant file, or a mutant that writes itself to the file
         :type fileData:
         :param mutantsPerLine:
         :type mutantsPerLine:
@@ -146,44 +262,266 @@ class JavaIO(object):
         :return:
         :rtype:
         """
-        originalFileRoot, originalFileName = os.path.split(originalFile)
+        targetDir = self.prepareTargetDirectory(originalFile)
+        if mutantsPerLine is not None and densityReport is not None and aggregateComplexity is not None:
+            self.writeFileArtifacts(originalFile, mutantsPerLine, densityReport, aggregateComplexity)
 
-        targetDir = os.path.join(self.targetDirectory, os.path.relpath(originalFileRoot, self.sourceDirectory),
-                                 originalFileName)
+        targetFile = os.path.abspath(os.path.join(targetDir, str(self.getNextMutantNumber(targetDir)) + ".java"))
+        with open(targetFile, 'w') as contentFile:
+            # a mutant renders itself into the file, so its whole source code never has to be in memory.
+            if isinstance(fileData, str):
+                contentFile.write(fileData)
+            else:
+                fileData.write(contentFile)
 
-        if not os.path.exists(targetDir):
-            os.makedirs(targetDir)
-        if not os.path.isfile(os.path.join(targetDir, "original.java")):
-            shutil.copyfile(originalFile, os.path.join(targetDir, "original.java"))
+        if self.verbose:
+            print("--> generated file: ", targetFile)
+        return os.path.relpath(targetFile, self.targetDirectory)
+
+    def generateNewFiles(self, originalFile=None, mutants=None, mutantsPerLine=None, densityReport=None,
+                         aggregateComplexity=None):
+        """
+        Writes all mutants of a source file, in order, like generateNewFile does for each of them.
 
+        :param originalFile:
+        :type originalFile:
+        :param mutants: the contents of the mutant files, or mutants that write themselves to the files
+        :type mutants: list
+        :param mutantsPerLine:
+        :type mutantsPerLine:
+        :param densityReport:
+        :type densityReport:
+        :param aggregateComplexity:
+        :type aggregateComplexity:
+        :return: paths of the mutant files, relative to the target directory
+        :rtype: List[str]
+        """
+        return [self.generateNewFile(originalFile, mutant, mutantsPerLine, densityReport, aggregateComplexity)
+                for mutant in mutants]
+
+    def generateNewPatch(self, originalFile=None, mutantsPerLine=None, densityReport=None, aggregateComplexity=None):
+        """
+        Numbers a mutant and prepares its directory like generateNewFile, but does not write the mutant. The mutant is
+        kept as a patch to original.java instead, and written by materializeMutant when it is needed.
+
+        :param originalFile:
+        :type originalFile:
+        :param mutantsPerLine:
+        :type mutantsPerLine:
+        :param densityReport:
+        :type densityReport:
+        :param aggregateComplexity:
+        :type aggregateComplexity:
+        :return: path of the mutant file, relative to the target directory
+        :rtype: str
+        """
+        isNewDirectory = self.getTargetDirectory(originalFile) not in self.mutantCounters
+
+        targetDir = self.prepareTargetDirectory(originalFile)
         if mutantsPerLine is not None and densityReport is not None and aggregateComplexity is not None:
-            densityPerLineCSVFile = os.path.abspath(os.path.join(targetDir, "MutantDensityPerLine.csv"))
-            complexityPerMethodCSVFile = os.path.abspath(os.path.join(targetDir, "ComplexityPerMethod.csv"))
-            densityReportFile = os.path.abspath(os.path.join(targetDir, "aggregate.html"))
-
-            if not os.path.isfile(complexityPerMethodCSVFile) or not os.path.isfile(
-                    densityPerLineCSVFile) or not os.path.isfile(densityReportFile):
-                with open(densityPerLineCSVFile, 'w') as densityFileHandle:
-                    for key in sorted(mutantsPerLine.keys()):
-                        densityFileHandle.write(str(key) + ',' + str(mutantsPerLine[key]) + '\n')
-
-                with open(complexityPerMethodCSVFile, 'w') as densityFileHandle:
-                    for key in sorted(aggregateComplexity.keys()):
-                        line = [str(key)]
-                        line.extend([str(x) for x in aggregateComplexity[key]])
-                        densityFileHandle.write(";".join(line) + '\n')
-
-                with open(densityReportFile, 'w') as densityFileHandle:
-                    densityFileHandle.write(densityReport)
-
-        counter = 1
-        while os.path.isfile(os.path.join(targetDir, str(counter) + ".java")):
-            counter += 1
+            self.writeFileArtifacts(originalFile, mutantsPerLine, densityReport, aggregateComplexity)
 
-        targetFile = os.path.abspath(os.path.join(targetDir, str(counter) + ".java"))
-        with open(targetFile, 'w') as contentFile:
-            contentFile.write(fileData)
+        # the patches are made from the current source code, so original.java must not be left from an earlier run.
+        if isNewDirectory:
+            shutil.copyfile(originalFile, os.path.join(targetDir, "original.java"))
 
+        targetFile = os.path.abspath(os.path.join(targetDir, str(self.getNextMutantNumber(targetDir)) + ".java"))
         if self.verbose:
-            print("--> generated file: ", targetFile)
+            print("--> generated patch: ", targetFile)
         return os.path.relpath(targetFile, self.targetDirectory)
+
+    def materializeMutant(self, targetFile=None, patch=None, originalCode=None):
+        """
+        Writes a mutant kept as a patch. The file is the same as the one generateNewFile writes for the mutant.
+
+        :param targetFile: path to write the mutant to
+        :type targetFile: str
+        :param patch: the patch, as made by Mutant.getPatch
+        :type patch: dict
+        :param originalCode: the source code the patch was made from. if not given, the original.java next to
+        targetFile is read.
+        :type originalCode: str
+        """
+        if originalCode is None:
+            originalCode = self.getFileContent(os.path.join(os.path.dirname(targetFile), "original.java"))
+
+        with open(targetFile, 'w') as contentFile:
+            self.writePatchedCode(contentFile, patch, originalCode)
+
+    @staticmethod
+    def writePatchedCode(fileHandle=None, patch=None, originalCode=None):
+        """
+        Writes a mutant kept as a patch to an open file.
+
+        :param fileHandle: the file to write to
+        :type fileHandle: io.TextIOBase
+        :param patch: the patch, as made by Mutant.getPatch
+        :type patch: dict
+        :param originalCode: the source code the patch was made from
+        :type originalCode: str
+        """
+        position = 0
+
+        fileHandle.write(patch["stub"])
+        for startPos, endPos, replacementText in patch["edits"]:
+            fileHandle.write(originalCode[position:startPos])
+            fileHandle.write(replacementText)
+            position = endPos + 1
+        fileHandle.write(originalCode[position:])
+
+    def getMutantPaths(self, originalFile=None, mutantCount=0):
+        """
+        Numbers the mutants of a source file from 1, without looking at or writing anything in the target directory.
+
+        :param originalFile:
+        :type originalFile:
+        :param mutantCount: the number of mutants
+        :type mutantCount: int
+        :return: paths of the mutant files, relative to the target directory
+        :rtype: List[str]
+        """
+        targetDir = os.path.relpath(self.getTargetDirectory(originalFile), self.targetDirectory)
+
+        return [os.path.join(targetDir, str(mutantNumber) + ".java") for mutantNumber in range(1, mutantCount + 1)]
+
+
+class ResultsArchive(object):
+    """
+    Keeps the files of the results directory in a single zip archive instead of a directory tree. The files are
+    addressed by the paths they would have in the results directory, and are read and written without extracting
+    the archive. A zip archive is only valid once it is closed, so an archive that is still needed is never written
+    to in place: new files are written to a separate part archive, and merged in with mergeParts.
+    """
+
+    def __init__(self, archivePath=None, rootDirectory=None, mode="r"):
+        """
+
+        :param archivePath: path of the zip archive
+        :type archivePath: str
+        :param rootDirectory: the results directory the archive stands in for
+        :type rootDirectory: str
+        :param mode: "r" to read, "w" to start a new archive, "a" to add to an existing one
+        :type mode: str
+        """
+        self.archivePath = archivePath
+        self.rootDirectory = os.path.abspath(rootDirectory)
+        self.archive = zipfile.ZipFile(archivePath, mode, compression=zipfile.ZIP_DEFLATED)
+        self.names = set(self.archive.namelist())
+
+    def getName(self, path=None):
+        """
+
+        :param path: path of the file in the results directory
+        :type path: str
+        :return: name of the file in the archive
+        :rtype: str
+        """
+        return os.path.relpath(os.path.abspath(path), self.rootDirectory).replace(os.sep, "/")
+
+    def contains(self, path=None):
+        """
+
+        :param path: path of the file in the results directory
+        :type path: str
+        :return: whether the file is in the archive
+        :rtype: bool
+        """
+        return self.getName(path) in self.names
+
+    @contextlib.contextmanager
+    def openText(self, path=None):
+        """
+        Opens a new file in the archive for writing text, the same way open() does for a file on disk. The text is
+        kept in memory and added to the archive when the with block ends, since zip archives can only be written to
+        as a stream from Python 3.6 on.
+
+        :param path: path of the file in the results directory
+        :type path: str
+        :return: the file, as a context manager
+        :rtype: io.TextIOWrapper
+        """
+        name = self.getName(path)
+        fileBuffer = io.BytesIO()
+        fileHandle = io.TextIOWrapper(fileBuffer)
+
+        yield fileHandle
+
+        fileHandle.flush()
+        self.archive.writestr(name, fileBuffer.getvalue())
+        self.names.add(name)
+        fileHandle.close()
+
+    def writeText(self, path=None, content=None):
+        """
+
+        :param path: path of the file in the results directory
+        :type path: str
+        :param content: the content of the file
+        :type content: str
+        """
+        with self.openText(path) as fileHandle:
+            fileHandle.write(content)
+
+    def addFile(self, path=None, sourceFile=None):
+        """
+        Copies a file from the disk into the archive.
+
+        :param path: path of the file in the results directory
+        :type path: str
+        :param sourceFile: the file to copy
+        :type sourceFile: str
+        """
+        name = self.getName(path)
+        self.names.add(name)
+        self.archive.write(sourceFile, name)
+
+    def extractFile(self, path=None, targetFile=None):
+        """
+        Copies a file from the archive to the disk.
+
+        :param path: path of the file in the results directory
+        :type path: str
+        :param targetFile: the file to write
+        :type targetFile: str
+        """
+        with self.archive.open(self.getName(path), "r") as archiveHandle, open(targetFile, "wb") as fileHandle:
+            shutil.copyfileobj(archiveHandle, fileHandle)
+
+    def close(self):
+        self.archive.close()
+
+    @staticmethod
+    def mergeParts(archivePath=None, partPaths=None):
+        """
+        Adds the files of the part archives to an archive. A file that is already in the archive, or in an earlier
+        part, is replaced rather than added twice. The merged archive is written next to the archive and then moved
+        in its place, so the archive stays valid if the merge is interrupted.
+
+        :param archivePath: path of the zip archive
+        :type archivePath: str
+        :param partPaths: paths of the part archives, in order
+        :type partPaths: List[str]
+        """
+        partNames = dict()
+        for partPath in partPaths:
+            with zipfile.ZipFile(partPath, "r") as partArchive:
+                for name in partArchive.namelist():
+                    partNames[name] = partPath
+
+        def copyFiles(sourceArchive, names):
+            for name in names:
+                mergedArchive.writestr(name, sourceArchive.read(name))
+
+        mergedPath = archivePath + ".tmp"
+        with zipfile.ZipFile(mergedPath, "w", compression=zipfile.ZIP_DEFLATED) as mergedArchive:
+            with zipfile.ZipFile(archivePath, "r") as archive:
+                # the last copy of a file is the one that is read, so the earlier copies are left out.
+                copyFiles(archive, [name for name in collections.OrderedDict.fromkeys(archive.namelist())
+                                    if name not in partNames])
+
+            for partPath in partPaths:
+                with zipfile.ZipFile(partPath, "r") as partArchive:
+                    copyFiles(partArchive, [name for name in collections.OrderedDict.fromkeys(partArchive.namelist())
+                                            if partNames[name] == partPath])
+
+        os.replace(mergedPath, archivePath)
@@ -1,8 +1,13 @@
-import copy
+import hashlib
+import re
 import sys
+from bisect import bisect_right, insort
+from collections import deque
+from heapq import heapify, heappop, heappush
 from math import log10
-from random import shuffle
-from typing import List, Tuple, Dict
+from random import Random, shuffle
+from time import perf_counter
+from typing import List, Tuple, Dict, Set
 
 from antlr4 import Token
 from antlr4.tree.Tree import TerminalNodeImpl
@@ -31,6 +36,7 @@ class Mutation(object):
         self.mutatorType = mutatorType
         self.replacementText = replacementText
         self.color = color
+        self.methodName = None  # the method the mutation is in, set by JavaMutate
 
     def __str__(self):
         text = "Mutated Text: {} \n".format(self.replacementText)
@@ -74,6 +80,95 @@ class Mutation(object):
         return len(self.replacementText) - (self.endPos - self.startPos + 1)
 
 
+class SourceLines(object):
+    """
+    The offsets of the lines of a source file, as str.splitlines finds them, so that a line can be sliced out of the
+    source code instead of splitting the whole file every time. All mutants of a file share the same table.
+    """
+
+    lastSourceLines = None  # the table of the source code that was used last
+
+    def __init__(self, sourceCode: str):
+        """
+
+        :param sourceCode: the source code
+        :type sourceCode: str
+        """
+        self.sourceCode = sourceCode
+        self.lineStarts = list()
+        self.lineEnds = list()  # where the text of each line ends, before its line break
+
+        position = 0
+        for lineText, line in zip(sourceCode.splitlines(keepends=False), sourceCode.splitlines(keepends=True)):
+            self.lineStarts.append(position)
+            self.lineEnds.append(position + len(lineText))
+            position += len(line)
+
+    @classmethod
+    def getSourceLines(cls, sourceCode: str):
+        """
+
+        :param sourceCode: the source code
+        :type sourceCode: str
+        :return: the table of the source code, made only once for consecutive calls with the same source code
+        :rtype: SourceLines
+        """
+        if cls.lastSourceLines is None or cls.lastSourceLines.sourceCode is not sourceCode:
+            cls.lastSourceLines = SourceLines(sourceCode)
+
+        return cls.lastSourceLines
+
+    def getLine(self, lineNumber: int) -> str:
+        """
+
+        :param lineNumber: line number, counted like the lines of str.splitlines
+        :type lineNumber: int
+        :return: the line, without its line break
+        :rtype: str
+        """
+        return self.sourceCode[self.lineStarts[lineNumber - 1]:self.lineEnds[lineNumber - 1]]
+
+    def getLineIndex(self, position: int) -> int:
+        """
+
+        :param position: an offset in the source code
+        :type position: int
+        :return: the index of the line that contains the offset
+        :rtype: int
+        """
+        return bisect_right(self.lineStarts, position) - 1
+
+    def getMutatedLine(self, lineNumber: int, mutation: Mutation) -> str:
+        """
+        Finds a line of the source code with one mutation applied. Only the lines around the mutation are put
+        together and split; the lines before and after them are included, so that line breaks are found exactly as
+        in the whole mutated source code.
+
+        :param lineNumber: line number in the mutated source code, counted like the lines of str.splitlines
+        :type lineNumber: int
+        :param mutation: the mutation
+        :type mutation: Mutation
+        :return: the line, without its line break
+        :rtype: str
+        """
+        if lineNumber < 1:
+            return mutation.applyMutation(self.sourceCode).splitlines(keepends=False)[lineNumber - 1]
+
+        firstLine = max(self.getLineIndex(mutation.startPos) - 1, 0)
+        lastLine = min(self.getLineIndex(mutation.endPos) + 1, len(self.lineStarts) - 1)
+        changedTextEnd = self.lineStarts[lastLine + 1] if lastLine + 1 < len(self.lineStarts) else len(self.sourceCode)
+        changedLines = (self.sourceCode[self.lineStarts[firstLine]:mutation.startPos] + mutation.replacementText +
+                        self.sourceCode[mutation.endPos + 1:changedTextEnd]).splitlines(keepends=False)
+
+        lineIndex = lineNumber - 1
+        if lineIndex < firstLine:
+            return self.getLine(lineNumber)
+        if lineIndex < firstLine + len(changedLines):
+            return changedLines[lineIndex - firstLine]
+
+        return self.getLine(lineNumber - len(changedLines) + lastLine - firstLine + 1)
+
+
 class Mutant(object):
     """
     Defines a mutant consisting of one or several mutations.
@@ -104,28 +199,75 @@ class Mutant(object):
         :param code: The code from which the line is taken. Defaults to original source code.
         """
         if code is None:
-            code = self.sourceCode
+            return SourceLines.getSourceLines(self.sourceCode).getLine(lineNumber)
 
         return code.splitlines(keepends=False)[lineNumber - 1]
 
     def mutateCode(self):
         """
-        Applies the mutations in mutationList to the source code.
+        Applies the mutations in mutationList to the source code, and keeps the result in mutatedCode.
         """
-        code = self.sourceCode
-        byteOffsetDict = dict()
+        self.mutatedCode = self.getMutatedCode()
 
-        for mutation in self.mutationList:
-            byteOffsetDict[mutation.startPos] = mutation.byteOffset
-            for pos in sorted(byteOffsetDict.keys()):
-                if pos < mutation.startPos:
-                    byteOffsetDict[mutation.startPos] = byteOffsetDict[pos] + mutation.byteOffset
-                elif pos > mutation.startPos:
-                    byteOffsetDict[pos] += mutation.byteOffset
+    def getMutatedCode(self) -> str:
+        """
+        Applies the mutations in mutationList to the source code. Unless mutateCode was called, the result is not kept,
+        so that a mutant only holds its mutations.
+
+        :return: the mutated source code
+        :rtype: str
+        """
+        if self.mutatedCode is not None:
+            return self.mutatedCode
+
+        return "".join(self.iterateFragments())
+
+    def getSortedMutations(self) -> List[Mutation]:
+        """
+        Sorts the mutations by their position in the source code, and makes sure that no two of them overlap.
+
+        :return: the mutations in mutationList, in the order of their positions
+        :rtype: List[Mutation]
+        """
+        sortedMutations = sorted(self.mutationList, key=lambda mutation: mutation.startPos)
+
+        for position in range(1, len(sortedMutations)):
+            if sortedMutations[position].startPos <= sortedMutations[position - 1].endPos:
+                raise ValueError("Mutations of a mutant cannot overlap.")
+
+        return sortedMutations
 
-            code = mutation.applyMutation(code, byteOffsetDict[mutation.startPos] - mutation.byteOffset)
+    def iterateFragments(self):
+        """
+        Splits the mutated source code into the unchanged parts of the source code and the replacement texts of the
+        mutations. The mutations are sorted once, and the source code is passed over once.
+
+        :return: generator of the fragments of the mutated source code, in order
+        :rtype: Iterator[str]
+        """
+        position = 0
+
+        for mutation in self.getSortedMutations():
+            yield self.sourceCode[position:mutation.startPos]
+            yield mutation.replacementText
+            position = mutation.endPos + 1
+
+        yield self.sourceCode[position:]
+
+    def overlaps(self, other) -> bool:
+        """
+
+        :param other: another mutant of the same source code
+        :type other: Mutant
+        :return: whether a mutation of this mutant overlaps a mutation of the other
+        :rtype: bool
+        """
+        for mutation in self.mutationList:
+            for otherMutation in other.mutationList:
+                if mutation.startPos <= otherMutation.endPos and otherMutation.startPos <= mutation.endPos:
+                    return True
 
-        self.mutatedCode = code
+        return False
 
     @property
     def stub(self) -> str:
@@ -136,15 +278,14 @@ class Mutant(object):
         :rtype: str
         """
         assert len(self.mutationList) > 0
-        assert self.mutatedCode is not None
 
         textStub = "/* LittleDarwin generated order-{0} mutant\n".format(str(len(self.mutationList)))  # type: str
+        sourceLines = SourceLines.getSourceLines(self.sourceCode)
 
         for mutation in self.mutationList:
             textStub += "mutant type: " + mutation.mutatorType + \
-                        "\n----> before: " + self.getLine(mutation.lineNumber) + \
-                        "\n----> after: " + self.getLine(mutation.lineNumber,
-                                                         code=mutation.applyMutation(self.sourceCode)) + \
+                        "\n----> before: " + sourceLines.getLine(mutation.lineNumber) + \
+                        "\n----> after: " + sourceLines.getMutatedLine(mutation.lineNumber, mutation) + \
                         "\n----> line number in original file: " + str(mutation.lineNumber) + \
                         "\n----> mutated node: " + str(mutation.nodeID) + "\n\n"
 
@@ -152,16 +293,32 @@ class Mutant(object):
 
         return textStub
 
+    @property
+    def summary(self) -> str:
+        """
+        Describes the mutations of the mutant in a single line.
+
+        :return: the type, line number and mutated line of each mutation
+        :rtype: str
+        """
+        sourceLines = SourceLines.getSourceLines(self.sourceCode)
+
+        return "; ".join("{} on line {}: {}".format(
+            mutation.mutatorType, mutation.lineNumber,
+            sourceLines.getMutatedLine(mutation.lineNumber, mutation).strip()) for mutation in self.mutationList)
+
     def __add__(self, other):
         if other is None:
-            return copy.deepcopy(self)
+            # the mutations are never changed once made, so the new mutant can share them.
+            return Mutant(self.mutantID, list(self.mutationList), self.sourceCode)
         if isinstance(other, Mutant):
             if self.sourceCode == other.sourceCode:
+                if self.overlaps(other):
+                    raise ValueError("Only Mutant objects with mutations that do not overlap can be added.")
                 newMutationList = list()
                 newMutationList.extend(self.mutationList)
                 newMutationList.extend(other.mutationList)
                 newMutant = Mutant(-1 * self.mutantID * other.mutantID, newMutationList, self.sourceCode)
-                newMutant.mutateCode()
                 return newMutant
             else:
                 raise ValueError("Only Mutant objects of the same source code can be added.")
@@ -172,9 +329,48 @@ class Mutant(object):
         return self.__add__(other)
 
     def __str__(self):
-        if self.mutatedCode is None:
-            self.mutateCode()
-        return self.stub + self.mutatedCode
+        return self.stub + self.getMutatedCode()
+
+    def write(self, fileHandle):
+        """
+        Writes the stub and the mutated source code to a file, without putting the whole mutated code together in
+        memory first.
+
+        :param fileHandle: the file to write to
+        :type fileHandle: io.TextIOBase
+        """
+        fileHandle.write(self.stub)
+
+        if self.mutatedCode is not None:
+            fileHandle.write(self.mutatedCode)
+            return
+
+        for fragment in self.iterateFragments():
+            fileHandle.write(fragment)
+
+    def getPatch(self) -> dict:
+        """
+        Describes the mutant as a patch to the source code: the stub and, in order of position, the start and end
+        positions and the replacement text of each mutation. JavaIO.materializeMutant writes the mutant back from it.
+
+        :return: the stub and the edits of the mutant
+        :rtype: dict
+        """
+        edits = [(mutation.startPos, mutation.endPos, mutation.replacementText)
+                 for mutation in self.getSortedMutations()]
+
+        return {"stub": self.stub, "edits": edits}
+
+    def getMutationRecords(self) -> List[Dict]:
+        """
+        Describes each mutation of the mutant for the mutation database.
+
+        :return: the operator, line number, node, method and positions of each mutation
+        :rtype: List[Dict]
+        """
+        return [{"operator": mutation.mutatorType, "line": mutation.lineNumber, "node": mutation.nodeID,
+                 "method": mutation.methodName, "startPos": mutation.startPos, "endPos": mutation.endPos}
+                for mutation in self.mutationList]
 
 
 class MutationOperator(object):
@@ -183,6 +379,12 @@ class MutationOperator(object):
     """
     instantiable = True
     metaTypes = ["Generic"]
+    # groups of tokens for the lexer-only prescan: the operator can only produce mutants in a file that contains at
+    # least one token of every group. None means the operator cannot be ruled out by a prescan.
+    prescanTokens = None
+    # the node types the operator looks at. each node of these types is passed to visitNode, in the order of
+    # JavaParse.seekAllNodes.
+    nodeTypes = ()
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
                  generateMutants=True):
@@ -194,24 +396,62 @@ class MutationOperator(object):
         self.mutableNodes = list()  # populated by filterCriteria
         self.mutants = list()  # populated by generateMutants
         self.javaParseObject = javaParseObject
+        self.candidateNodeCount = 0  # counted only when the dispatcher profiles the operators
+        self.elapsedTime = 0.0  # seconds spent in the operator, measured only when profiling
+
+    def collectMutants(self, generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
+        """
+        Finds the mutable nodes and generates the mutants. If a dispatcher is given, the operator is registered with
+        it instead, and receives its nodes when the dispatcher walks the tree.
+
+        :param generateMutants: whether to generate the mutants, or only find the mutable nodes
+        :type generateMutants: bool
+        :param dispatcher: the dispatcher shared by the operators of a file
+        :type dispatcher: MutationDispatcher
+        """
+        if dispatcher is not None:
+            dispatcher.register(self, generateMutants)
+            return
+
+        self.findNodes()
+        self.filterCriteria()
+        if generateMutants:
+            self.generateMutants()
 
     def findNodes(self):
         """
         Finds all nodes that match the search criteria
         """
-        pass
+        self.allNodes = self.javaParseObject.seekAllNodes(self.sourceTree, self.nodeTypes)
 
     def filterCriteria(self):
         """
         Filters out the nodes that do not match the input critera
         """
+        for node in self.allNodes:
+            self.visitNode(node)
+
+    def visitNode(self, node):
+        """
+        Keeps the node if it can be mutated
+
+        :param node: a node of one of the node types of the operator
+        """
         pass
 
     def generateMutants(self):
         """
         Generates the mutants
         """
-        pass
+        self.mutants.extend(self.iterateMutants())
+
+    def iterateMutants(self):
+        """
+        Generates the mutants of the mutable nodes one at a time
+
+        :return: generator of the mutants
+        """
+        return iter(())
 
     @property
     def cssClass(self):
@@ -235,36 +475,29 @@ class RemoveMethod(MutationOperator):
     """
     instantiable = True
     metaTypes = ["Method", "All"]
+    prescanTokens = [{"class", "interface", "enum", "new"}]  # method declarations: type bodies, @interface included
+    nodeTypes = (JavaParser.MethodBodyContext,)
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "RemoveMethod"
         self.color = "#FF00D4"
         self.mutableNodesWithTypes = list()
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
+        self.collectMutants(generateMutants, dispatcher)
 
-    def findNodes(self):
-        """
-
-        """
-        self.allNodes = self.javaParseObject.seekAllNodes(self.sourceTree, JavaParser.MethodBodyContext)
-
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            assert isinstance(node, JavaParser.MethodBodyContext)
-            nodeType = self.javaParseObject.getMethodTypeForNode(node)
-            if nodeType is not None:
-                self.mutableNodes.append(node)  # No need to do this, but kept here for compatibility.
-                self.mutableNodesWithTypes.append((node, nodeType))
+        assert isinstance(node, JavaParser.MethodBodyContext)
+        nodeType = self.javaParseObject.getMethodTypeForNode(node)
+        if nodeType is not None:
+            self.mutableNodes.append(node)  # No need to do this, but kept here for compatibility.
+            self.mutableNodesWithTypes.append((node, nodeType))
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -293,8 +526,7 @@ class RemoveMethod(MutationOperator):
                                     lineNumber=node.start.line, nodeID=node.nodeIndex,
                                     mutatorType=self.mutatorType, replacementText=replacementText)
                 mutant = Mutant(mutantID=id, mutationList=[mutation], sourceCode=self.sourceCode)
-                mutant.mutateCode()
-                self.mutants.append(mutant)
+                yield mutant
 
 
 #################################################
@@ -308,48 +540,41 @@ class RemoveNullCheck(MutationOperator):
     """
     instantiable = True
     metaTypes = ["Null", "All"]
+    prescanTokens = [{"==", "!="}]  # the null check is matched on the text of the expression, not on a token
+    nodeTypes = (JavaParser.ExpressionContext,)
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "RemoveNullCheck"
         self.color = "#ADD8E6"
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
-
-    def findNodes(self):
-        """
+        self.collectMutants(generateMutants, dispatcher)
 
+    def visitNode(self, node):
         """
-        self.allNodes = self.javaParseObject.seekAllNodes(self.sourceTree, JavaParser.ExpressionContext)
 
-    def filterCriteria(self):
+        :param node: a candidate node
         """
+        assert isinstance(node, JavaParser.ExpressionContext)
 
-        """
-        for node in self.allNodes:
-            assert isinstance(node, JavaParser.ExpressionContext)
-
-            try:
-                if not (isinstance(node.children[0], JavaParser.ExpressionContext) and
-                        isinstance(node.children[1], TerminalNodeImpl) and
-                        isinstance(node.children[2], JavaParser.ExpressionContext)):
-                    continue  # not a binary expression
+        try:
+            if not (isinstance(node.children[0], JavaParser.ExpressionContext) and
+                    isinstance(node.children[1], TerminalNodeImpl) and
+                    isinstance(node.children[2], JavaParser.ExpressionContext)):
+                return  # not a binary expression
 
-            except Exception as e:
-                continue
+        except Exception as e:
+            return
 
-            if not (node.children[1].symbol.text == "!=" or node.children[1].symbol.text == "=="):
-                continue  # not a relational operator
+        if not (node.children[1].symbol.text == "!=" or node.children[1].symbol.text == "=="):
+            return  # not a relational operator
 
-            if 'null' not in node.getText():
-                continue  # not a null check
+        if 'null' not in node.getText():
+            return  # not a null check
 
-            self.mutableNodes.append(node)
+        self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -366,8 +591,7 @@ class RemoveNullCheck(MutationOperator):
                                 nodeID=node.nodeIndex, mutatorType=self.mutatorType, replacementText=replacementText)
 
             mutant = Mutant(mutantID=id, mutationList=[mutation], sourceCode=self.sourceCode)
-            mutant.mutateCode()
-            self.mutants.append(mutant)
+            yield mutant
 
 
 class NullifyObjectInitialization(MutationOperator):
@@ -376,49 +600,42 @@ class NullifyObjectInitialization(MutationOperator):
     """
     instantiable = True
     metaTypes = ["Null", "All"]
+    prescanTokens = [{"new"}]
+    nodeTypes = (JavaParser.CreatorContext,)
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "NullifyObjectInitialization"
         self.color = "#F08080"
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
-
-    def findNodes(self):
-        """
-
-        """
-        self.allNodes = self.javaParseObject.seekAllNodes(self.sourceTree, JavaParser.CreatorContext)
+        self.collectMutants(generateMutants, dispatcher)
 
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            assert isinstance(node, JavaParser.CreatorContext)
+        assert isinstance(node, JavaParser.CreatorContext)
 
-            try:
-                newStatement = node.parentCtx.getChild(0, TerminalNodeImpl)
-                argumentsStatement = node.children[-1].children[-1]
+        try:
+            newStatement = node.parentCtx.getChild(0, TerminalNodeImpl)
+            argumentsStatement = node.children[-1].children[-1]
 
-                if newStatement.symbol.text != u'new':
-                    continue
+            if newStatement.symbol.text != u'new':
+                return
 
-                if not isinstance(argumentsStatement, JavaParser.ArgumentsContext):
-                    continue
+            if not isinstance(argumentsStatement, JavaParser.ArgumentsContext):
+                return
 
-                if argumentsStatement.children[-1].symbol.text != u')':
-                    continue
+            if argumentsStatement.children[-1].symbol.text != u')':
+                return
 
-            except:
-                continue
+        except:
+            return
 
-            self.mutableNodes.append(node)
+        self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -434,8 +651,7 @@ class NullifyObjectInitialization(MutationOperator):
                                 mutatorType=self.mutatorType, replacementText=replacementText)
 
             mutant = Mutant(mutantID=id, mutationList=[mutation], sourceCode=self.sourceCode)
-            mutant.mutateCode()
-            self.mutants.append(mutant)
+            yield mutant
 
 
 class NullifyReturnValue(MutationOperator):
@@ -444,52 +660,45 @@ class NullifyReturnValue(MutationOperator):
     """
     instantiable = True
     metaTypes = ["Null", "All"]
+    prescanTokens = [{"return"}, {"class", "interface", "enum", "new"}]
+    nodeTypes = (TerminalNodeImpl,)
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "NullifyReturnValue"
         self.color = "#E0FFFF"
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
-
-    def findNodes(self):
-        """
+        self.collectMutants(generateMutants, dispatcher)
 
-        """
-        self.allNodes = self.javaParseObject.seekAllNodes(self.sourceTree, TerminalNodeImpl)
-
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            assert isinstance(node, TerminalNodeImpl)
+        assert isinstance(node, TerminalNodeImpl)
 
-            if node.symbol.text != u'return':
-                continue
+        if node.symbol.text != u'return':
+            return
 
-            if not isinstance(node.getParent().getChild(1), JavaParser.ExpressionContext):
-                continue
+        if not isinstance(node.getParent().getChild(1), JavaParser.ExpressionContext):
+            return
 
-            parentMethod = self.javaParseObject.seekFirstMatchingParent(node, JavaParser.MethodDeclarationContext)
-            if parentMethod is None:
-                continue
+        parentMethod = self.javaParseObject.seekFirstMatchingParent(node, JavaParser.MethodDeclarationContext)
+        if parentMethod is None:
+            return
 
-            assert isinstance(parentMethod, JavaParser.MethodDeclarationContext)
+        assert isinstance(parentMethod, JavaParser.MethodDeclarationContext)
 
-            parentType = parentMethod.getChild(0, JavaParser.JTypeContext)
-            if not isinstance(parentType, JavaParser.JTypeContext):
-                continue
+        parentType = parentMethod.getChild(0, JavaParser.JTypeContext)
+        if not isinstance(parentType, JavaParser.JTypeContext):
+            return
 
-            if parentType.getChild(0, JavaParser.PrimitiveTypeContext) is not None:
-                continue  # primitive typed method
+        if parentType.getChild(0, JavaParser.PrimitiveTypeContext) is not None:
+            return  # primitive typed method
 
-            self.mutableNodes.append(node)
+        self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -504,8 +713,7 @@ class NullifyReturnValue(MutationOperator):
                                 mutatorType=self.mutatorType, replacementText=replacementText)
 
             mutant = Mutant(mutantID=id, mutationList=[mutation], sourceCode=self.sourceCode)
-            mutant.mutateCode()
-            self.mutants.append(mutant)
+            yield mutant
 
 
 class NullifyInputVariable(MutationOperator):
@@ -514,57 +722,49 @@ class NullifyInputVariable(MutationOperator):
     """
     instantiable = True
     metaTypes = ["Null", "All"]
+    prescanTokens = [{"class", "interface", "enum", "new"}]
+    nodeTypes = (JavaParser.MethodDeclarationContext,)
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "NullifyInputVariable"
         self.color = "#90EE90"
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
-
-    def findNodes(self):
-        """
-
-        """
-        self.allNodes = self.javaParseObject.seekAllNodes(self.sourceTree, JavaParser.MethodDeclarationContext)
+        self.replacementTextDict = dict()
+        self.collectMutants(generateMutants, dispatcher)
 
-    def filterCriteria(self):
+    def visitNode(self, methodDeclaration):
         """
 
+        :param methodDeclaration: a candidate node
         """
-        self.replacementTextDict = dict()
-
-        for methodDeclaration in self.allNodes:
-            try:
-                variableList = self.javaParseObject.seekAllNodes(methodDeclaration.formalParameters(),
-                                                                 JavaParser.VariableDeclaratorIdContext)
+        try:
+            variableList = self.javaParseObject.seekAllNodes(methodDeclaration.formalParameters(),
+                                                             JavaParser.VariableDeclaratorIdContext)
 
-                if len(variableList) == 0:
-                    continue  # no variables in this declaration
+            if len(variableList) == 0:
+                return  # no variables in this declaration
 
-                # can fail on methods with no body
-                node = methodDeclaration.methodBody().block().getChild(0, TerminalNodeImpl)
+            # can fail on methods with no body
+            node = methodDeclaration.methodBody().block().getChild(0, TerminalNodeImpl)
 
-            except Exception as e:
-                continue
+        except Exception as e:
+            return
 
-            variablesPerNodeReplacementTextList = list()
-            for variablesPerNode in variableList:
-                assert isinstance(variablesPerNode, JavaParser.VariableDeclaratorIdContext)
+        variablesPerNodeReplacementTextList = list()
+        for variablesPerNode in variableList:
+            assert isinstance(variablesPerNode, JavaParser.VariableDeclaratorIdContext)
 
-                if variablesPerNode.parentCtx.getChild(0, JavaParser.JTypeContext).getChild(0,
-                                                                                            JavaParser.PrimitiveTypeContext) is not None:
-                    continue  # primitive typed variable
+            if variablesPerNode.parentCtx.getChild(0, JavaParser.JTypeContext).getChild(0,
+                                                                                        JavaParser.PrimitiveTypeContext) is not None:
+                continue  # primitive typed variable
 
-                variablesPerNodeReplacementTextList.append('{ ' + variablesPerNode.getText() + ' = null;')
+            variablesPerNodeReplacementTextList.append('{ ' + variablesPerNode.getText() + ' = null;')
 
-            self.replacementTextDict[node] = variablesPerNodeReplacementTextList
-            self.mutableNodes.append(node)
+        self.replacementTextDict[node] = variablesPerNodeReplacementTextList
+        self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -578,8 +778,7 @@ class NullifyInputVariable(MutationOperator):
                                     mutatorType=self.mutatorType, replacementText=replacementText)
 
                 mutant = Mutant(mutantID=id, mutationList=[mutation], sourceCode=self.sourceCode)
-                mutant.mutateCode()
-                self.mutants.append(mutant)
+                yield mutant
 
 
 #################################################
@@ -592,18 +791,14 @@ class TraditionalMutationOperator(MutationOperator):
     """
 
     metaTypes = ["Traditional", "All"]
+    prescanTokens = [set()]  # the generic operator itself never produces mutants
+    nodeTypes = (JavaParser.ExpressionContext,)
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "GenericTraditionalMutationOperator"
 
-    def findNodes(self):
-        """
-
-        """
-        self.allNodes = self.javaParseObject.seekAllNodes(self.sourceTree, JavaParser.ExpressionContext)
-
     def filterCriteriaBinaryExpression(self, node: JavaParser.ExpressionContext, symbolList: List[str]):
         """
 
@@ -653,7 +848,6 @@ class TraditionalMutationOperator(MutationOperator):
                             mutatorType=self.mutatorType, replacementText=replacementText, color=self.color)
 
         mutant = Mutant(mutantID=id, mutationList=[mutation], sourceCode=self.sourceCode)
-        mutant.mutateCode()
 
         return mutant
 
@@ -668,7 +862,6 @@ class TraditionalMutationOperator(MutationOperator):
                             replacementText=replacementText, color=self.color)
 
         mutant = Mutant(mutantID=id, mutationList=[mutation], sourceCode=self.sourceCode)
-        mutant.mutateCode()
 
         return mutant
 
@@ -678,27 +871,25 @@ class ArithmeticOperatorReplacementBinary(TraditionalMutationOperator):
 
     """
     instantiable = True
+    prescanTokens = [{"+", "-", "*", "/", "%"}]
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "ArithmeticOperatorReplacementBinary"
         self.color = "#FFB6C1"
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
+        self.collectMutants(generateMutants, dispatcher)
 
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            if (self.filterCriteriaBinaryExpression(node, ['+', '-', '*', '/', '%'])
-                    and node.children[0].getText()[0] != '\"' and node.children[2].getText()[0] != '\"'):
-                self.mutableNodes.append(node)
+        if (self.filterCriteriaBinaryExpression(node, ['+', '-', '*', '/', '%'])
+                and node.children[0].getText()[0] != '\"' and node.children[2].getText()[0] != '\"'):
+            self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -706,7 +897,7 @@ class ArithmeticOperatorReplacementBinary(TraditionalMutationOperator):
         for node in self.mutableNodes:
             id += 1
             mutant = self.generateMutantsBinaryExpression(node, {'+': '-', '-': '+', '/': '*', '*': '/', '%': '/'}, id)
-            self.mutants.append(mutant)
+            yield mutant
 
 
 class RelationalOperatorReplacement(TraditionalMutationOperator):
@@ -714,26 +905,24 @@ class RelationalOperatorReplacement(TraditionalMutationOperator):
 
     """
     instantiable = True
+    prescanTokens = [{">", ">=", "<", "<=", "==", "!="}]
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "RelationalOperatorReplacement"
         self.color = "#FFA07A"
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
+        self.collectMutants(generateMutants, dispatcher)
 
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            if self.filterCriteriaBinaryExpression(node, ['>', '>=', '<', '<=', '==', '!=']):
-                self.mutableNodes.append(node)
+        if self.filterCriteriaBinaryExpression(node, ['>', '>=', '<', '<=', '==', '!=']):
+            self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -742,7 +931,7 @@ class RelationalOperatorReplacement(TraditionalMutationOperator):
             id += 1
             mutant = self.generateMutantsBinaryExpression(node, {'>': '<=', '<': '>=', '>=': '<', '<=': '>', '!=': '==',
                                                                  '==': '!='}, id)
-            self.mutants.append(mutant)
+            yield mutant
 
 
 class ConditionalOperatorReplacement(TraditionalMutationOperator):
@@ -750,26 +939,24 @@ class ConditionalOperatorReplacement(TraditionalMutationOperator):
 
     """
     instantiable = True
+    prescanTokens = [{"&&", "||"}]
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "ConditionalOperatorReplacement"
         self.color = "#87CEFA"
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
+        self.collectMutants(generateMutants, dispatcher)
 
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            if self.filterCriteriaBinaryExpression(node, ['&&', '||']):
-                self.mutableNodes.append(node)
+        if self.filterCriteriaBinaryExpression(node, ['&&', '||']):
+            self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -777,7 +964,7 @@ class ConditionalOperatorReplacement(TraditionalMutationOperator):
         for node in self.mutableNodes:
             id += 1
             mutant = self.generateMutantsBinaryExpression(node, {'&&': '||', '||': '&&'}, id)
-            self.mutants.append(mutant)
+            yield mutant
 
 
 class LogicalOperatorReplacement(TraditionalMutationOperator):
@@ -785,26 +972,24 @@ class LogicalOperatorReplacement(TraditionalMutationOperator):
 
     """
     instantiable = True
+    prescanTokens = [{"&", "|", "^"}]
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "LogicalOperatorReplacement"
         self.color = "#F0E68C"
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
+        self.collectMutants(generateMutants, dispatcher)
 
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            if self.filterCriteriaBinaryExpression(node, ['&', '|', '^']):
-                self.mutableNodes.append(node)
+        if self.filterCriteriaBinaryExpression(node, ['&', '|', '^']):
+            self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -812,7 +997,7 @@ class LogicalOperatorReplacement(TraditionalMutationOperator):
         for node in self.mutableNodes:
             id += 1
             mutant = self.generateMutantsBinaryExpression(node, {'&': '|', '|': '^', '^': '&'}, id)
-            self.mutants.append(mutant)
+            yield mutant
 
 
 class AssignmentOperatorReplacementShortcut(TraditionalMutationOperator):
@@ -820,27 +1005,25 @@ class AssignmentOperatorReplacementShortcut(TraditionalMutationOperator):
 
     """
     instantiable = True
+    prescanTokens = [{"+=", "-=", "*=", "/=", "%=", "&=", "|=", "^=", "<<=", ">>=", ">>>="}]
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "AssignmentOperatorReplacementShortcut"
         self.color = "#B0C4DE"
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
+        self.collectMutants(generateMutants, dispatcher)
 
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            if self.filterCriteriaBinaryExpression(node, ['+=', '-=', '*=', '/=', '%=', '&=', '|=', '^=', '<<=', '>>=',
-                                                          '>>>=']):
-                self.mutableNodes.append(node)
+        if self.filterCriteriaBinaryExpression(node, ['+=', '-=', '*=', '/=', '%=', '&=', '|=', '^=', '<<=', '>>=',
+                                                      '>>>=']):
+            self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -850,7 +1033,7 @@ class AssignmentOperatorReplacementShortcut(TraditionalMutationOperator):
             mutant = self.generateMutantsBinaryExpression(node, {'+=': '-=', '-=': '+=', '*=': '/=', '/=': '*=',
                                                                  '%=': '/=', '&=': '|=', '|=': '^=', '^=': '&=',
                                                                  '<<=': '>>=', '>>=': '>>>=', '>>>=': '>>='}, id)
-            self.mutants.append(mutant)
+            yield mutant
 
 
 class ArithmeticOperatorReplacementUnary(TraditionalMutationOperator):
@@ -859,26 +1042,24 @@ class ArithmeticOperatorReplacementUnary(TraditionalMutationOperator):
     """
 
     instantiable = True
+    prescanTokens = [{"+", "-"}]
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "ArithmeticOperatorReplacementUnary"
         self.color = "#DDA0DD"
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
+        self.collectMutants(generateMutants, dispatcher)
 
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            if self.filterCriteriaUnaryExpression(node, ['+', '-']):
-                self.mutableNodes.append(node)
+        if self.filterCriteriaUnaryExpression(node, ['+', '-']):
+            self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -886,7 +1067,7 @@ class ArithmeticOperatorReplacementUnary(TraditionalMutationOperator):
         for node in self.mutableNodes:
             id += 1
             mutant = self.generateMutantsUnaryExpression(node, {'+': '-', '-': '+'}, id)
-            self.mutants.append(mutant)
+            yield mutant
 
 
 class ConditionalOperatorDeletion(TraditionalMutationOperator):
@@ -894,26 +1075,24 @@ class ConditionalOperatorDeletion(TraditionalMutationOperator):
 
     """
     instantiable = True
+    prescanTokens = [{"!"}]
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "ConditionalOperatorDeletion"
         self.color = "#FFD700"
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
+        self.collectMutants(generateMutants, dispatcher)
 
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            if self.filterCriteriaUnaryExpression(node, ['!']):
-                self.mutableNodes.append(node)
+        if self.filterCriteriaUnaryExpression(node, ['!']):
+            self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -921,7 +1100,7 @@ class ConditionalOperatorDeletion(TraditionalMutationOperator):
         for node in self.mutableNodes:
             id += 1
             mutant = self.generateMutantsUnaryExpression(node, {'!': ' '}, id)
-            self.mutants.append(mutant)
+            yield mutant
 
 
 class ArithmeticOperatorReplacementShortcut(TraditionalMutationOperator):
@@ -929,43 +1108,41 @@ class ArithmeticOperatorReplacementShortcut(TraditionalMutationOperator):
 
     """
     instantiable = True
+    prescanTokens = [{"++", "--"}]
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "ArithmeticOperatorReplacementShortcut"
         self.color = "#FF00FF"
         self.terminalChild = dict()
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
+        self.collectMutants(generateMutants, dispatcher)
 
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            assert isinstance(node, JavaParser.ExpressionContext)
-
-            try:
-                if (isinstance(node.children[0], TerminalNodeImpl)
-                        and isinstance(node.children[1], JavaParser.ExpressionContext)):
-                    self.terminalChild[node] = 0
-                elif (isinstance(node.children[1], TerminalNodeImpl)
-                      and isinstance(node.children[0], JavaParser.ExpressionContext)):
-                    self.terminalChild[node] = 1
-                else:
-                    continue  # not a shortcut expression
-            except Exception as e:
-                continue
+        assert isinstance(node, JavaParser.ExpressionContext)
+
+        try:
+            if (isinstance(node.children[0], TerminalNodeImpl)
+                    and isinstance(node.children[1], JavaParser.ExpressionContext)):
+                self.terminalChild[node] = 0
+            elif (isinstance(node.children[1], TerminalNodeImpl)
+                  and isinstance(node.children[0], JavaParser.ExpressionContext)):
+                self.terminalChild[node] = 1
+            else:
+                return  # not a shortcut expression
+        except Exception as e:
+            return
 
-            if node.children[self.terminalChild[node]].symbol.text not in ["++", "--"]:
-                continue  # not an arithmetic operator
+        if node.children[self.terminalChild[node]].symbol.text not in ["++", "--"]:
+            return  # not an arithmetic operator
 
-            self.mutableNodes.append(node)
+        self.mutableNodes.append(node)
 
-    def generateMutants(self):
+    def iterateMutants(self):
         """
 
         """
@@ -984,8 +1161,7 @@ class ArithmeticOperatorReplacementShortcut(TraditionalMutationOperator):
                                 color=self.color)
 
             mutant = Mutant(mutantID=id, mutationList=[mutation], sourceCode=self.sourceCode)
-            mutant.mutateCode()
-            self.mutants.append(mutant)
+            yield mutant
 
 
 class ShiftOperatorReplacement(TraditionalMutationOperator):
@@ -993,65 +1169,63 @@ class ShiftOperatorReplacement(TraditionalMutationOperator):
 
     """
     instantiable = True
+    prescanTokens = [{"<", ">"}]  # shift operators are lexed as separate angle brackets
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 generateMutants: bool = True):
+                 generateMutants: bool = True, dispatcher: "MutationDispatcher" = None):
         super().__init__(sourceTree, sourceCode, javaParseObject)
         self.mutatorType = "ShiftOperatorReplacement"
         self.color = "#9ACD32"
         self.threeTerminals = dict()
-        self.findNodes()
-        self.filterCriteria()
-        if generateMutants:
-            self.generateMutants()
+        self.collectMutants(generateMutants, dispatcher)
 
-    def filterCriteria(self):
+    def visitNode(self, node):
         """
 
+        :param node: a candidate node
         """
-        for node in self.allNodes:
-            assert isinstance(node, JavaParser.ExpressionContext)
-
-            try:
-                if (isinstance(node.children[0], JavaParser.ExpressionContext)
-                        and isinstance(node.children[1], TerminalNodeImpl)
-                        and isinstance(node.children[2], TerminalNodeImpl)
-                        and isinstance(node.children[3], JavaParser.ExpressionContext)):
-                    self.threeTerminals[node] = False
-
-                elif (isinstance(node.children[0], JavaParser.ExpressionContext)
-                      and isinstance(node.children[1], TerminalNodeImpl)
-                      and isinstance(node.children[2], TerminalNodeImpl)
-                      and isinstance(node.children[3], TerminalNodeImpl)
-                      and isinstance(node.children[4], JavaParser.ExpressionContext)):
-                    self.threeTerminals[node] = True
-                else:
-                    continue  # not a binary shift expression
+        assert isinstance(node, JavaParser.ExpressionContext)
 
-            except Exception as e:
-                continue
+        try:
+            if (isinstance(node.children[0], JavaParser.ExpressionContext)
+                    and isinstance(node.children[1], TerminalNodeImpl)
+                    and isinstance(node.children[2], TerminalNodeImpl)
+                    and isinstance(node.children[3], JavaParser.ExpressionContext)):
+                self.threeTerminals[node] = False
+
+            elif (isinstance(node.children[0], JavaParser.ExpressionContext)
+                  and isinstance(node.children[1], TerminalNodeImpl)
+                  and isinstance(node.children[2], TerminalNodeImpl)
+                  and isinstance(node.children[3], TerminalNodeImpl)
+                  and isinstance(node.children[4], JavaParser.ExpressionContext)):
+                self.threeTerminals[node] = True
+            else:
+                return  # not a binary shift expression
 
-            try:
-                if not self.threeTerminals[node] \
-                        and ((node.children[1].symbol.text == u"<" and node.children[2].symbol.text == u"<")
-                             or (node.children[1].symbol.text == u">" and node.children[2].symbol.text == u">")):
-                    pass
+        except Exception as e:
+            return
 
-                elif self.threeTerminals[node] \
-                        and (node.children[1].symbol.text == u">"
-                             and node.children[2].symbol.text == u">"
-                             and node.children[3].symbol.text == u">"):
-                    pass
+        try:
+            if not self.threeTerminals[node] \
+                    and ((node.children[1].symbol.text == u"<" and node.children[2].symbol.text == u"<")
+                         or (node.children[1].symbol.text == u">" and node.children[2].symbol.text == u">")):
+                pass
 
-                else:
-                    continue  # not a shift operator
+            elif self.threeTerminals[node] \
+                    and (node.children[1].symbol.text == u">"
+                         and node.children[2].symbol.text == u">"
+                         and node.children[3].symbol.text == u">"):
+                pass
 
-            except Exception as e:
-                continue
+            else:
+                return  # not a shift operator
 
-            self.mutableNodes.append(node)
+        except Exception as e:
+            return
 
-    def generateMutants(self):
+        self.mutableNodes.append(node)
+
+    def iterateMutants(self):
         """
 
         """
@@ -1073,8 +1247,7 @@ class ShiftOperatorReplacement(TraditionalMutationOperator):
                                     replacementText=replacementText, color=self.color)
 
             mutant = Mutant(mutantID=id, mutationList=[mutation], sourceCode=self.sourceCode)
-            mutant.mutateCode()
-            self.mutants.append(mutant)
+            yield mutant
 
 
 #################################################
@@ -1098,19 +1271,458 @@ def getAllInstantiableSubclasses(parentClass):
     return allInstantiableSubclasses
 
 
+def mayHaveMutants(tokenTexts: Set[str], metaTypes: List[str] = ["Traditional"]) -> bool:
+    """
+    Decides from the tokens of a file alone whether any of the enabled mutation operators could produce a mutant.
+
+    :param tokenTexts: the texts of the tokens in the file, as returned by JavaParse.prescan
+    :type tokenTexts: Set[str]
+    :param metaTypes: types of mutation operators to use
+    :type metaTypes: List[str]
+    :return: False if the file certainly yields no mutants
+    :rtype: bool
+    """
+    for MO in mutationOperatorRegistry.getOperatorClasses(metaTypes):
+        if MO.prescanTokens is None:
+            return True
+
+        if all(not tokenTexts.isdisjoint(tokenGroup) for tokenGroup in MO.prescanTokens):
+            return True
+
+    return False
+
+
+class MutationOperatorRegistry(object):
+    """
+    Finds the mutation operator classes once, and keeps which of them belong to each combination of metaTypes, so
+    that the subclasses of MutationOperator are not walked again for every file. Operators defined outside
+    LittleDarwin are added with register; the operators are used in the order of their class names.
+    """
+
+    def __init__(self):
+        self.operatorClasses = None  # found on first use
+        self.resolvedOperators = dict()  # tuple of metaTypes -> operator classes
+
+    def getAllOperatorClasses(self) -> list:
+        """
+
+        :return: all instantiable operator classes
+        :rtype: list
+        """
+        if self.operatorClasses is None:
+            self.operatorClasses = sorted(getAllInstantiableSubclasses(MutationOperator), key=lambda mo: mo.__name__)
+
+        return self.operatorClasses
+
+    def getOperatorClasses(self, metaTypes: List[str]) -> list:
+        """
+
+        :param metaTypes: types of mutation operators to use
+        :type metaTypes: List[str]
+        :return: the operator classes to instantiate, once for each of the metaTypes they belong to
+        :rtype: list
+        """
+        key = tuple(metaTypes)
+        if key not in self.resolvedOperators:
+            self.resolvedOperators[key] = [MO for MO in self.getAllOperatorClasses()
+                                           for metaType in metaTypes if metaType in MO.metaTypes]
+
+        return self.resolvedOperators[key]
+
+    def register(self, operatorClass):
+        """
+        Adds an operator class. It can be used as a class decorator.
+
+        :param operatorClass: a subclass of MutationOperator
+        :type operatorClass: type
+        :return: the operator class
+        :rtype: type
+        """
+        if not (isinstance(operatorClass, type) and issubclass(operatorClass, MutationOperator)):
+            raise ValueError("Only subclasses of MutationOperator can be registered.")
+
+        operatorClasses = self.getAllOperatorClasses()
+        if operatorClass not in operatorClasses:
+            operatorClasses.append(operatorClass)
+            operatorClasses.sort(key=lambda mo: mo.__name__)
+        self.resolvedOperators.clear()
+
+        return operatorClass
+
+
+mutationOperatorRegistry = MutationOperatorRegistry()
+
+
+class MutationDispatcher(object):
+    """
+    Walks the tree of a file once, and passes each node to every registered mutation operator that looks at nodes of
+    its type, so that adding an operator does not add a traversal.
+    """
+
+    def __init__(self, sourceTree: JavaParser.CompilationUnitContext, javaParseObject: JavaParse,
+                 isProfiling: bool = False):
+        self.sourceTree = sourceTree
+        self.javaParseObject = javaParseObject
+        self.isProfiling = isProfiling  # whether to count the nodes and time spent in each operator
+        self.mutationOperators = list()  # registered operators, and whether they generate mutants
+        self.routes = dict()  # node class -> visitNode of every operator that looks at nodes of the class
+
+    def register(self, mutationOperator: MutationOperator, generateMutants: bool = True):
+        """
+
+        :param mutationOperator: the operator that receives the nodes of its node types
+        :type mutationOperator: MutationOperator
+        :param generateMutants: whether the operator generates its mutants after the walk
+        :type generateMutants: bool
+        """
+        self.mutationOperators.append((mutationOperator, generateMutants))
+        self.routes.clear()
+
+    def getRoute(self, nodeClass) -> list:
+        """
+
+        :param nodeClass: class of a node in the tree
+        :type nodeClass: type
+        :return: the callbacks that receive nodes of the class, in the order the operators were registered
+        :rtype: list
+        """
+        if nodeClass not in self.routes:
+            self.routes[nodeClass] = [mO.visitNode for mO, generateMutants in self.mutationOperators
+                                      if issubclass(nodeClass, mO.nodeTypes)]
+
+        return self.routes[nodeClass]
+
+    def dispatch(self):
+        """
+        Passes the nodes to the registered operators in one walk of the tree, then lets the operators generate their
+        mutants. Every operator receives its nodes in the same order as from its own findNodes.
+        """
+        nodeTypes = list()
+        for mO, generateMutants in self.mutationOperators:
+            nodeTypes.extend([nodeType for nodeType in mO.nodeTypes if nodeType not in nodeTypes])
+
+        if self.isProfiling:
+            for node in self.javaParseObject.seekAllNodes(self.sourceTree, tuple(nodeTypes)):
+                for visitNode in self.getRoute(type(node)):
+                    startTime = perf_counter()
+                    visitNode(node)
+                    visitNode.__self__.elapsedTime += perf_counter() - startTime
+                    visitNode.__self__.candidateNodeCount += 1
+        else:
+            for node in self.javaParseObject.seekAllNodes(self.sourceTree, tuple(nodeTypes)):
+                for visitNode in self.getRoute(type(node)):
+                    visitNode(node)
+
+        for mO, generateMutants in self.mutationOperators:
+            if generateMutants:
+                startTime = perf_counter()
+                mO.generateMutants()
+                mO.elapsedTime += perf_counter() - startTime
+
+
+class MutantDeduplicator(object):
+    """
+    Recognizes the mutants of a file that need not be built: those whose mutated source code is the same as that of
+    an earlier mutant, apart from whitespace, and those that are equivalent to the original source code by one of a
+    few syntactic rules. The first mutant with a given source code is kept, so the result does not depend on how the
+    work is divided between processes.
+    """
+
+    # integer literals with the value 0 or 1. floating point zero is signed, so -0.0 and +0.0 are not equivalent.
+    integerZero = re.compile(r"(0[xXbB])?0[0_]*[lL]?")
+    integerOne = re.compile(r"(0[xXbB])?(0[0_]*)?1[lL]?")
+
+    def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse):
+        """
+
+        :param sourceTree: the tree of the source file
+        :type sourceTree: JavaParser.CompilationUnitContext
+        :param sourceCode: the source code of the file
+        :type sourceCode: str
+        :param javaParseObject: the parser the tree was made with
+        :type javaParseObject: JavaParse
+        """
+        self.sourceTree = sourceTree
+        self.javaParseObject = javaParseObject
+        self.sourceHash = self.getCodeHash(sourceCode)
+        self.mutantGroups = dict()  # hash of the mutated code -> the kept mutant, followed by its duplicates
+        self.equivalentMutants = list()
+
+    @staticmethod
+    def getCodeHash(code: str) -> str:
+        """
+        Hashes source code with every run of whitespace replaced by a single space, so that only changes in the
+        tokens change the hash.
+
+        :param code: the source code
+        :type code: str
+        :return: hex digest of the normalized source code
+        :rtype: str
+        """
+        return hashlib.sha1(" ".join(code.split()).encode("utf-8")).hexdigest()
+
+    def isRedundant(self, mutant: Mutant) -> bool:
+        """
+        Checks whether a mutant is equivalent to the original source code or to a mutant checked before, and
+        remembers it either way.
+
+        :param mutant: the mutant
+        :type mutant: Mutant
+        :return: True if the mutant need not be built
+        :rtype: bool
+        """
+        if len(mutant.mutationList) == 1 and self.isTriviallyEquivalent(mutant.mutationList[0]):
+            self.equivalentMutants.append(mutant)
+            return True
+
+        codeHash = self.getCodeHash(mutant.getMutatedCode())
+        if codeHash == self.sourceHash:
+            self.equivalentMutants.append(mutant)
+            return True
+
+        if codeHash in self.mutantGroups:
+            self.mutantGroups[codeHash].append(mutant)
+            return True
+
+        self.mutantGroups[codeHash] = [mutant]
+        return False
+
+    def isTriviallyEquivalent(self, mutation: Mutation) -> bool:
+        """
+        Applies the syntactic equivalence rules to a mutation: the sign of an integer zero (-0 and +0), multiplying
+        and dividing by an integer one (x * 1 and x / 1), and shifting by zero (x << 0, x >> 0 and x >>> 0).
+
+        :param mutation: the mutation
+        :type mutation: Mutation
+        :return: True if the mutation certainly does not change the behaviour of the code
+        :rtype: bool
+        """
+        if mutation.mutatorType not in ("ArithmeticOperatorReplacementUnary", "ArithmeticOperatorReplacementBinary",
+                                        "ShiftOperatorReplacement"):
+            return False
+
+        node = self.javaParseObject.getNode(self.sourceTree, mutation.nodeID)
+        operandText = node.children[-1].getText()
+
+        if mutation.mutatorType == "ArithmeticOperatorReplacementBinary":
+            return node.children[1].symbol.text in ("*", "/") and mutation.replacementText in ("*", "/") and \
+                   self.integerOne.fullmatch(operandText) is not None
+
+        return self.integerZero.fullmatch(operandText) is not None
+
+    @property
+    def duplicateGroups(self) -> List[List[Mutant]]:
+        """
+        Returns the groups of mutants with the same source code.
+
+        :return: each group starts with the kept mutant, followed by its duplicates
+        :rtype: List[List[Mutant]]
+        """
+        return [mutantGroup for mutantGroup in self.mutantGroups.values() if len(mutantGroup) > 1]
+
+
+class MutationIntervalIndex(object):
+    """
+    Keeps the source code ranges of a set of mutations that do not overlap, sorted by their start, so that checking
+    whether another mutation overlaps any of them takes a binary search instead of a comparison with each.
+    """
+
+    def __init__(self):
+        self.startPositions = list()
+        self.endPositions = dict()  # start position -> end position
+
+    def overlaps(self, mutation: Mutation) -> bool:
+        """
+
+        :param mutation: a mutation of the same source code
+        :type mutation: Mutation
+        :return: whether the mutation overlaps a mutation in the index
+        :rtype: bool
+        """
+        # the ranges in the index do not overlap, so only the last one starting at or before the end of the mutation
+        # can reach it.
+        position = bisect_right(self.startPositions, mutation.endPos) - 1
+        return position >= 0 and self.endPositions[self.startPositions[position]] >= mutation.startPos
+
+    def add(self, mutation: Mutation):
+        """
+
+        :param mutation: a mutation that does not overlap the mutations in the index
+        :type mutation: Mutation
+        """
+        insort(self.startPositions, mutation.startPos)
+        self.endPositions[mutation.startPos] = mutation.endPos
+
+
+class HigherOrderMutantBuilder(object):
+    """
+    Combines first-order mutants into higher-order mutants. The mutations of a higher-order mutant never overlap, so
+    that none of them undoes or breaks another; the strategy decides which other mutants may be combined:
+
+    non-overlapping: any mutants.
+    disjoint-method: mutants in different methods.
+    same-method: mutants in the same method.
+    different-operator: mutants made by different mutation operators.
+    """
+
+    strategies = ["non-overlapping", "disjoint-method", "same-method", "different-operator"]
+
+    def __init__(self, higherOrder: int, strategy: str = "non-overlapping", seed=None):
+        """
+
+        :param higherOrder: the number of first-order mutants in each higher-order mutant
+        :type higherOrder: int
+        :param strategy: one of HigherOrderMutantBuilder.strategies
+        :type strategy: str
+        :param seed: seed for the order in which the mutants are combined. without a seed, the order is different
+            in every run.
+        """
+        if strategy not in self.strategies:
+            raise ValueError("Unknown higher-order strategy: " + str(strategy))
+
+        self.higherOrder = higherOrder
+        self.strategy = strategy
+        self.random = Random(seed) if seed is not None else None
+
+    def shuffle(self, mutants: List[Mutant]):
+        """
+
+        :param mutants: the mutants to shuffle in place
+        :type mutants: List[Mutant]
+        """
+        if self.random is not None:
+            self.random.shuffle(mutants)
+        else:
+            shuffle(mutants)
+
+    @staticmethod
+    def groupMutants(mutants: List[Mutant], getKey) -> List[List[Mutant]]:
+        """
+
+        :param mutants: first-order mutants
+        :type mutants: List[Mutant]
+        :param getKey: gives the group of a mutant
+        :return: the groups, in the order of their first mutant
+        :rtype: List[List[Mutant]]
+        """
+        groups = dict()
+        for mutant in mutants:
+            groups.setdefault(getKey(mutant), list()).append(mutant)
+
+        return list(groups.values())
+
+    def iterateHigherOrderMutants(self, mutants: List[Mutant]):
+        """
+        Shuffles the first-order mutants, and combines them one higher-order mutant at a time.
+
+        :param mutants: first-order mutants of the same source code. the mutations must have their methodName set
+            for the method strategies.
+        :type mutants: List[Mutant]
+        :return: generator of the higher-order mutants
+        :rtype: Iterator[Mutant]
+        """
+        mutants = list(mutants)
+        self.shuffle(mutants)
+
+        if self.strategy == "non-overlapping":
+            return self.combineInOrder(mutants)
+
+        if self.strategy == "same-method":
+            return (higherOrderMutant
+                    for methodMutants in self.groupMutants(mutants, lambda mutant: mutant.mutationList[0].methodName)
+                    for higherOrderMutant in self.combineInOrder(methodMutants))
+
+        if self.strategy == "disjoint-method":
+            return self.combineAcrossGroups(self.groupMutants(mutants,
+                                                              lambda mutant: mutant.mutationList[0].methodName))
+
+        return self.combineAcrossGroups(self.groupMutants(mutants, lambda mutant: mutant.mutationList[0].mutatorType))
+
+    def combineInOrder(self, mutants: List[Mutant]):
+        """
+        Combines the mutants in their order. A mutant that overlaps the ones already combined is left for the next
+        higher-order mutant.
+
+        :param mutants: first-order mutants
+        :type mutants: List[Mutant]
+        :return: generator of the higher-order mutants
+        :rtype: Iterator[Mutant]
+        """
+        pendingMutants = deque(mutants)
+
+        while len(pendingMutants) > 0:
+            higherOrderMutant = None
+            intervalIndex = MutationIntervalIndex()
+            overlappingMutants = list()
+            while len(pendingMutants) > 0 and \
+                    (higherOrderMutant is None or len(higherOrderMutant.mutationList) < self.higherOrder):
+                mutant = pendingMutants.popleft()
+                if any(intervalIndex.overlaps(mutation) for mutation in mutant.mutationList):
+                    overlappingMutants.append(mutant)
+                else:
+                    higherOrderMutant += mutant
+                    for mutation in mutant.mutationList:
+                        intervalIndex.add(mutation)
+
+            pendingMutants.extendleft(reversed(overlappingMutants))
+            yield higherOrderMutant
+
+    def combineAcrossGroups(self, groups: List[List[Mutant]]):
+        """
+        Combines one mutant from each of several groups. The groups with the most mutants left are used first, so
+        that as few mutants as possible are left over for smaller higher-order mutants at the end.
+
+        :param groups: groups of first-order mutants
+        :type groups: List[List[Mutant]]
+        :return: generator of the higher-order mutants
+        :rtype: Iterator[Mutant]
+        """
+        # the heap holds the number of mutants left in each group, negated, and the position of the group for ties.
+        pendingGroups = [deque(group) for group in groups]
+        groupHeap = [(-len(group), position) for position, group in enumerate(pendingGroups)]
+        heapify(groupHeap)
+
+        while len(groupHeap) > 0:
+            higherOrderMutant = None
+            intervalIndex = MutationIntervalIndex()
+            usedGroups = list()
+            while len(groupHeap) > 0 and len(usedGroups) < self.higherOrder:
+                remaining, position = heappop(groupHeap)
+                usedGroups.append(position)
+                group = pendingGroups[position]
+                for index in range(len(group)):
+                    if not any(intervalIndex.overlaps(mutation) for mutation in group[index].mutationList):
+                        mutant = group[index]
+                        del group[index]
+                        higherOrderMutant += mutant
+                        for mutation in mutant.mutationList:
+                            intervalIndex.add(mutation)
+                        break
+
+            for position in usedGroups:
+                if len(pendingGroups[position]) > 0:
+                    heappush(groupHeap, (-len(pendingGroups[position]), position))
+
+            if higherOrderMutant is not None:
+                yield higherOrderMutant
+
+
 class JavaMutate(object):
     """
     Main entry point for mutation of a Java source file.
     """
 
     def __init__(self, sourceTree: JavaParser.CompilationUnitContext, sourceCode: str, javaParseObject: JavaParse,
-                 verbose: bool = False):
+                 verbose: bool = False, deduplicate: bool = False, profile: bool = False):
         self.verbose = verbose
+        self.isProfiling = profile
         self.sourceCode = sourceCode
         self.sourceTree = sourceTree
         self.mutantsPerLine = dict()
         self.mutantsPerMethod = dict()
         self.averageDensity = -1
+        self.mutationCount = 0  # mutations in the mutants generated so far
+        self.mutationTypeCount = dict()
         self.mutants = list()
         self.mutationOperators = list()
 
@@ -1121,6 +1733,10 @@ class JavaMutate(object):
 
         # self.instantiateMutationOperators()
 
+        # the mutants that are duplicates of others, or equivalent to the original code, are dropped if requested.
+        self.deduplicator = MutantDeduplicator(self.sourceTree, self.sourceCode, self.javaParseObject) \
+            if deduplicate else None
+
         self.inMethodLines = self.javaParseObject.getInMethodLines(self.sourceTree)
 
     def instantiateMutationOperators(self, metaTypes: List[str] = ["Traditional"], generateMutants: bool = True):
@@ -1131,113 +1747,235 @@ class JavaMutate(object):
         :param metaTypes:
         :type metaTypes:
         """
-        for MO in getAllInstantiableSubclasses(MutationOperator):
-            for metaType in metaTypes:
-                if metaType in MO.metaTypes:
-                    self.mutationOperators.append(
-                        MO(self.sourceTree, self.sourceCode, self.javaParseObject, generateMutants))
+        dispatcher = MutationDispatcher(self.sourceTree, self.javaParseObject, self.isProfiling)
+
+        # sorted, so that mutants are generated in the same order in every process.
+        for MO in mutationOperatorRegistry.getOperatorClasses(metaTypes):
+            self.mutationOperators.append(
+                MO(self.sourceTree, self.sourceCode, self.javaParseObject, generateMutants, dispatcher))
 
-    def countMutants(self, metaTypes: List[str] = ["Traditional"]):
+        dispatcher.dispatch()
+
+    def countMutants(self, metaTypes: List[str] = ["Traditional"], higherOrderDirective: int = 1,
+                     strategy: str = "non-overlapping", seed=None):
         """
-        Gathers all mutants, creates desired higher-order mutants, and returns the mutated code
+        Counts the mutants per type, and the mutations per line and per method, without keeping the mutants.
 
         :param metaTypes: types of mutation operators to use
         :type metaTypes: List[str]
-        :return: mutated source code for each mutant, number of types of mutants
-        :rtype: Tuple[List, Dict]
+        :param higherOrderDirective: The requested higher-order order
+        :type higherOrderDirective: int
+        :param strategy: which first-order mutants may be combined, one of HigherOrderMutantBuilder.strategies
+        :type strategy: str
+        :param seed: seed for the order in which the mutants are combined
+        :return: number of mutants per type
+        :rtype: Dict
         """
-        mutationTypeCount = dict()
-        self.instantiateMutationOperators(metaTypes, generateMutants=False)
+        return self.countAllMutants(metaTypes, higherOrderDirective, strategy, seed)[1]
 
-        for mO in self.mutationOperators:
-            mutationTypeCount[mO.mutatorType] = len(mO.mutableNodes)
-            for mutableNode in mO.mutableNodes:
-                try:
-                    lineNumber = mutableNode.start.line
-                except Exception as e:
-                    lineNumber = -1
-                self.mutantsPerLine[lineNumber] = 1 + self.mutantsPerLine.get(lineNumber, 0)
-                methodName = self.javaParseObject.getMethodNameForNode(self.sourceTree, mutableNode.nodeIndex)
-                self.mutantsPerMethod[methodName] = 1 + self.mutantsPerMethod.get(methodName, 0)
+    def countAllMutants(self, metaTypes: List[str] = ["Traditional"], higherOrderDirective: int = 1,
+                        strategy: str = "non-overlapping", seed=None):
+        """
+        Counts the mutants, and the mutations per line and per method, without keeping the mutants. Since a mutant
+        only holds its mutations until it is written, this takes little more than finding the mutable nodes, and
+        gives the same counts as gathering the mutants.
+
+        :param metaTypes: types of mutation operators to use
+        :type metaTypes: List[str]
+        :param higherOrderDirective: The requested higher-order order
+        :type higherOrderDirective: int
+        :param strategy: which first-order mutants may be combined, one of HigherOrderMutantBuilder.strategies
+        :type strategy: str
+        :param seed: seed for the order in which the mutants are combined
+        :return: number of mutants, number of mutants per type
+        :rtype: Tuple[int, Dict]
+        """
+        if higherOrderDirective == 1:
+            mutants = self.iterateMutants(metaTypes, keepMutants=False)
+        else:
+            mutants = self.iterateHigherOrderMutants(higherOrderDirective, metaTypes, False, strategy, seed)
+
+        mutantCount = 0
+        for mutant in mutants:
+            mutantCount += 1
 
         self.averageDensity = sum(self.mutantsPerLine.values()) / len(self.inMethodLines) if len(
             self.inMethodLines) > 0 else 0
 
-        return mutationTypeCount
+        return mutantCount, self.mutationTypeCount
 
-    def gatherMutants(self, metaTypes: List[str] = ["Traditional"]):
+    def iterateMutants(self, metaTypes: List[str] = ["Traditional"], keepMutants: bool = True):
         """
-        Gathers all mutants, creates desired higher-order mutants, and returns the mutated code
+        Generates the mutants one at a time, in the same order as gatherMutants. Each mutant only holds its mutations,
+        which carry the operator, line, method and edit. The mutable nodes of all operators are found before the
+        first mutant is generated, but each mutant is generated only when it is requested, so stopping the iteration
+        early also stops the generation. The per-line and per-method counts, the average density, and
+        mutationTypeCount describe the mutants generated so far.
 
         :param metaTypes: types of mutation operators to use
         :type metaTypes: List[str]
-        :return: mutated source code for each mutant, number of types of mutants
-        :rtype: Tuple[List, Dict]
+        :param keepMutants: whether to keep the mutants for aggregateReport. otherwise, the memory used does not grow
+            with the number of mutants.
+        :type keepMutants: bool
+        :return: generator of the mutants
+        :rtype: Iterator[Mutant]
         """
-        mutationTypeCount = dict()
-        mutantTexts = list()
-
-        self.instantiateMutationOperators(metaTypes)
+        self.instantiateMutationOperators(metaTypes, generateMutants=False)
 
         for mO in self.mutationOperators:
             for metaType in metaTypes:
                 if metaType in mO.metaTypes:
-                    mutationTypeCount[mO.mutatorType] = len(mO.mutants)
-                    for mutant in mO.mutants:
-                        self.mutants.append(mutant)
-                        mutantTexts.append(str(mutant))
-                        for mutation in mutant.mutationList:
-                            self.mutantsPerLine[mutation.lineNumber] = 1 + self.mutantsPerLine.get(mutation.lineNumber,
-                                                                                                   0)
-                            methodName = self.javaParseObject.getMethodNameForNode(self.sourceTree, mutation.nodeID)
-                            self.mutantsPerMethod[methodName] = 1 + self.mutantsPerMethod.get(methodName, 0)
-
-        self.averageDensity = sum(self.mutantsPerLine.values()) / len(self.inMethodLines) if len(
-            self.inMethodLines) > 0 else 0
+                    self.mutationTypeCount[mO.mutatorType] = 0
+                    for mutant in self.timeMutants(mO) if self.isProfiling else mO.iterateMutants():
+                        if self.deduplicator is not None and self.deduplicator.isRedundant(mutant):
+                            continue
+                        self.mutationTypeCount[mO.mutatorType] += 1
+                        self.addMutant(mutant, keepMutants)
+                        yield mutant
 
-        return mutantTexts, mutationTypeCount
-
-    def gatherHigherOrderMutants(self, higherOrderDirective: int, metaTypes: List[str] = ["Traditional"]):
+    def iterateHigherOrderMutants(self, higherOrderDirective: int, metaTypes: List[str] = ["Traditional"],
+                                  keepMutants: bool = True, strategy: str = "non-overlapping", seed=None):
         """
-        Gathers all mutants, creates desired higher-order mutants, and returns the mutated code
+        Generates the higher-order mutants one at a time. The first-order mutants they consist of are gathered and
+        shuffled first; each combination is made only when it is requested. The mutations of a higher-order mutant
+        never overlap.
 
         :param higherOrderDirective: The requested higher-order order
         :type higherOrderDirective: int
         :param metaTypes: type of mutation operators to use
         :type metaTypes: List[str]
-        :return: mutated source code for each mutant, number of types of mutants
-        :rtype: Tuple[List, Dict]
+        :param keepMutants: whether to keep the mutants for aggregateReport
+        :type keepMutants: bool
+        :param strategy: which first-order mutants may be combined, one of HigherOrderMutantBuilder.strategies
+        :type strategy: str
+        :param seed: seed for the order in which the mutants are combined
+        :return: generator of the higher-order mutants
+        :rtype: Iterator[Mutant]
         """
+        if len(self.mutationOperators) == 0:
+            self.instantiateMutationOperators(metaTypes)
+
         selectedMutants = list()
         for mO in self.mutationOperators:
             for metaType in metaTypes:
                 if metaType in mO.metaTypes:
                     selectedMutants.extend(mO.mutants)
 
+        self.mutationTypeCount = {"Higher-Order": 0}
+        if len(selectedMutants) == 0:
+            return
+
+        for mutant in selectedMutants:
+            for mutation in mutant.mutationList:
+                mutation.methodName = self.javaParseObject.getMethodNameForNode(self.sourceTree, mutation.nodeID)
+
         higherOrder = max(int(log10(len(selectedMutants))) if higherOrderDirective == -1 else higherOrderDirective, 1)
-        shuffle(selectedMutants)
-        mutantTexts = list()
+        higherOrderMutantBuilder = HigherOrderMutantBuilder(higherOrder, strategy, seed)
 
-        while len(selectedMutants) > 0:
-            higherOrderMutant = None
-            for mutant in selectedMutants[:higherOrder]:
-                higherOrderMutant += mutant
+        for higherOrderMutant in higherOrderMutantBuilder.iterateHigherOrderMutants(selectedMutants):
+            if self.deduplicator is not None and self.deduplicator.isRedundant(higherOrderMutant):
+                continue
 
-            mutantTexts.append(str(higherOrderMutant))
-            self.mutants.append(higherOrderMutant)
+            self.mutationTypeCount["Higher-Order"] += 1
+            if keepMutants:
+                self.mutants.append(higherOrderMutant)
             for mutation in higherOrderMutant.mutationList:
                 self.mutantsPerLine[mutation.lineNumber] = 1 + self.mutantsPerLine.get(mutation.lineNumber, 0)
-                self.mutantsPerMethod[self.javaParseObject.getMethodNameForNode(
-                    self.sourceTree, mutation.nodeID)] = 1 + self.mutantsPerMethod.get(mutation.lineNumber, 0)
+                self.mutantsPerMethod[mutation.methodName] = 1 + self.mutantsPerMethod.get(mutation.methodName, 0)
+                self.mutationCount += 1
 
-            selectedMutants = selectedMutants[higherOrder:]
+            self.averageDensity = self.mutationCount / len(self.inMethodLines) if len(self.inMethodLines) > 0 else 0
+            yield higherOrderMutant
+
+    @staticmethod
+    def timeMutants(mutationOperator: MutationOperator):
+        """
+        Generates the mutants of an operator, and adds the time spent generating them to its elapsed time.
+
+        :param mutationOperator: the operator
+        :type mutationOperator: MutationOperator
+        :return: generator of the mutants
+        :rtype: Iterator[Mutant]
+        """
+        mutantIterator = mutationOperator.iterateMutants()
 
-        mutationTypeCount = {"Higher-Order": len(mutantTexts)}
+        while True:
+            startTime = perf_counter()
+            mutant = next(mutantIterator, None)
+            mutationOperator.elapsedTime += perf_counter() - startTime
 
+            if mutant is None:
+                return
+            yield mutant
+
+    def getOperatorProfile(self) -> List[Dict]:
+        """
+        Reports, for each operator, the nodes it looked at, the nodes it can mutate, the mutants it generated, and the
+        time spent in it. The nodes and time are only measured if the object was made with profile set.
+
+        :return: one entry per operator
+        :rtype: List[Dict]
+        """
+        return [{"operator": mO.mutatorType, "candidateNodes": mO.candidateNodeCount,
+                 "mutableNodes": len(mO.mutableNodes),
+                 "mutants": self.mutationTypeCount.get(mO.mutatorType, len(mO.mutants)),
+                 "seconds": mO.elapsedTime} for mO in self.mutationOperators]
+
+    def addMutant(self, mutant: Mutant, keepMutants: bool = True):
+        """
+        Counts the mutations of a generated mutant per line and per method.
+
+        :param mutant: the mutant
+        :type mutant: Mutant
+        :param keepMutants: whether to keep the mutant for aggregateReport
+        :type keepMutants: bool
+        """
+        if keepMutants:
+            self.mutants.append(mutant)
+
+        for mutation in mutant.mutationList:
+            mutation.methodName = self.javaParseObject.getMethodNameForNode(self.sourceTree, mutation.nodeID)
+            self.mutantsPerLine[mutation.lineNumber] = 1 + self.mutantsPerLine.get(mutation.lineNumber, 0)
+            self.mutantsPerMethod[mutation.methodName] = 1 + self.mutantsPerMethod.get(mutation.methodName, 0)
+            self.mutationCount += 1
+
+        self.averageDensity = self.mutationCount / len(self.inMethodLines) if len(self.inMethodLines) > 0 else 0
+
+    def gatherMutants(self, metaTypes: List[str] = ["Traditional"]):
+        """
+        Gathers all mutants, creates desired higher-order mutants, and returns the mutated code
+
+        :param metaTypes: types of mutation operators to use
+        :type metaTypes: List[str]
+        :return: the mutants, which render their source code when written, number of types of mutants
+        :rtype: Tuple[List[Mutant], Dict]
+        """
+        mutants = list(self.iterateMutants(metaTypes))
+        self.averageDensity = sum(self.mutantsPerLine.values()) / len(self.inMethodLines) if len(
+            self.inMethodLines) > 0 else 0
+
+        return mutants, self.mutationTypeCount
+
+    def gatherHigherOrderMutants(self, higherOrderDirective: int, metaTypes: List[str] = ["Traditional"],
+                                 strategy: str = "non-overlapping", seed=None):
+        """
+        Gathers all mutants, creates desired higher-order mutants, and returns the mutated code
+
+        :param higherOrderDirective: The requested higher-order order
+        :type higherOrderDirective: int
+        :param metaTypes: type of mutation operators to use
+        :type metaTypes: List[str]
+        :param strategy: which first-order mutants may be combined, one of HigherOrderMutantBuilder.strategies
+        :type strategy: str
+        :param seed: seed for the order in which the mutants are combined
+        :return: the higher-order mutants, which render their source code when written, number of types of mutants
+        :rtype: Tuple[List[Mutant], Dict]
+        """
+        higherOrderMutants = list(self.iterateHigherOrderMutants(higherOrderDirective, metaTypes, True, strategy, seed))
         self.averageDensity = sum(self.mutantsPerLine.values()) / len(self.inMethodLines) if len(
             self.inMethodLines) > 0 else 0
 
-        return mutantTexts, mutationTypeCount
+        return higherOrderMutants, self.mutationTypeCount
 
     @property
     def cssStyle(self):
@@ -1263,11 +2001,13 @@ class JavaMutate(object):
 
         return style
 
-    def aggregateReport(self, littleDarwinVersion: str):
+    def aggregateReport(self, littleDarwinVersion: str, mutants: List[Mutant] = None):
         """
 
         :param littleDarwinVersion: LittleDarwin Version
         :type littleDarwinVersion: str
+        :param mutants: the mutants to show, such as the sampled ones. by default, all kept mutants are shown.
+        :type mutants: List[Mutant]
         :return: Aggregate report on all mutations for a file
         :rtype: str
         """
@@ -1285,12 +2025,12 @@ class JavaMutate(object):
             "methodLine" if lineNumber in self.inMethodLines else "outsideLine", lineNumber)
 
         mutationStartDict = dict()
-        mutationEndList = list()
-        for mutant in self.mutants:
+        mutationEndList = set()
+        for mutant in (self.mutants if mutants is None else mutants):
             assert isinstance(mutant, Mutant)
             for mutation in mutant.mutationList:
                 mutationStartDict[mutation.startPos] = (mutation.mutatorType, str(mutation))
-                mutationEndList.append(mutation.endPos)
+                mutationEndList.add(mutation.endPos)
 
         for i in range(0, len(self.sourceCode)):
             colRemainder = 0
@@ -1,21 +1,24 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from array import array
+from bisect import bisect_left
+from heapq import merge
 from typing import Dict
 
 from antlr4 import *
 from antlr4.InputStream import InputStream
 from antlr4.error.ErrorStrategy import BailErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
 from antlr4.tree.Tree import TerminalNodeImpl
 
+from . import JavaLexer as JavaLexerModule
+from . import JavaParser as JavaParserModule
+from .JavaAST import FlatTree, FlatNode
 from .JavaLexer import JavaLexer
 from .JavaParser import JavaParser
 
-try:
-    import graphviz
-
-    noGraphviz = False
-except ImportError as e:
-    noGraphviz = True
-
-
 class LittleDarwinErrorStrategy(BailErrorStrategy):
     """
     A class to handle parsing exceptions. Throws exceptions when occured so that the file can safely be ignored.
@@ -32,14 +35,189 @@ class LittleDarwinErrorStrategy(BailErrorStrategy):
         super().recover(parser, exception)
 
 
+class ParseCache(object):
+    """
+    An on-disk cache of parse trees. Entries are keyed by the content of the source file, the grammar, and the
+    LittleDarwin version, so that a change in any of them invalidates the cached tree.
+    """
+
+    def __init__(self, cacheDirectory: str, versionTag: str = ""):
+        """
+
+        :param cacheDirectory: the directory that holds the cache entries
+        :type cacheDirectory: str
+        :param versionTag: LittleDarwin version
+        :type versionTag: str
+        """
+        self.cacheDirectory = os.path.abspath(cacheDirectory)
+        self.hits = 0
+        self.misses = 0
+        self.recognizerStateSize = None  # number of DFA states when the recognizers were loaded
+
+        grammarDigest = hashlib.sha1()
+        grammarDigest.update(JavaLexerModule.serializedATN().encode("utf-8", errors="surrogatepass"))
+        grammarDigest.update(JavaParserModule.serializedATN().encode("utf-8", errors="surrogatepass"))
+        self.versionTag = versionTag + "-" + str(FlatTree.formatVersion) + "-" + grammarDigest.hexdigest()
+
+        if not os.path.exists(self.cacheDirectory):
+            os.makedirs(self.cacheDirectory)
+
+    def getKey(self, fileContent: str) -> str:
+        """
+
+        :param fileContent: content of the source file
+        :type fileContent: str
+        :return: the cache key for the file content
+        :rtype: str
+        """
+        keyDigest = hashlib.sha1(self.versionTag.encode("utf-8"))
+        keyDigest.update(fileContent.encode("utf-8", errors="surrogatepass"))
+        return keyDigest.hexdigest()
+
+    def getPath(self, key: str) -> str:
+        """
+
+        :param key: the cache key
+        :type key: str
+        :return: path to the cache entry
+        :rtype: str
+        """
+        return os.path.join(self.cacheDirectory, key[:2], key + ".tree")
+
+    def load(self, key: str):
+        """
+
+        :param key: the cache key
+        :type key: str
+        :return: the serialized tree, or None if the entry does not exist or cannot be read
+        """
+        try:
+            with open(self.getPath(key), 'rb') as cacheFile:
+                serializedTree = pickle.load(cacheFile)
+        except Exception:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return serializedTree
+
+    def store(self, key: str, serializedTree):
+        """
+
+        :param key: the cache key
+        :type key: str
+        :param serializedTree: the tree as returned by JavaParse.serializeTree
+        """
+        cachePath = self.getPath(key)
+        cacheDir = os.path.dirname(cachePath)
+
+        try:
+            if not os.path.exists(cacheDir):
+                os.makedirs(cacheDir, exist_ok=True)
+
+            # write to a temporary file first, so that concurrent readers never see a partial entry.
+            fileHandle, temporaryPath = tempfile.mkstemp(dir=cacheDir)
+            with os.fdopen(fileHandle, 'wb') as cacheFile:
+                pickle.dump(serializedTree, cacheFile, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporaryPath, cachePath)
+
+        except OSError as e:
+            print("Cannot write to parse cache: " + str(e))
+
+    def getRecognizerPath(self) -> str:
+        """
+
+        :return: path to the stored ATN and DFA of the lexer and the parser
+        :rtype: str
+        """
+        return os.path.join(self.cacheDirectory, "recognizers-" + self.versionTag + ".pickle")
+
+    @staticmethod
+    def getRecognizerStateSize() -> int:
+        """
+
+        :return: the number of states in the DFA of the lexer and the parser
+        :rtype: int
+        """
+        return sum([len(dfa._states) for dfa in JavaLexer.decisionsToDFA + JavaParser.decisionsToDFA])
+
+    def loadRecognizers(self) -> bool:
+        """
+        Replaces the ATN and DFA of the lexer and the parser with the ones stored by a previous run. ANTLR fills the
+        DFA as it makes predictions, so a parser that starts with a stored DFA does not have to learn the grammar
+        again on every invocation. This must happen before the first lexer or parser is created.
+
+        :return: whether the stored recognizers were loaded
+        :rtype: bool
+        """
+        try:
+            with open(self.getRecognizerPath(), 'rb') as recognizerFile:
+                lexerATN, lexerDFA, parserATN, parserDFA = pickle.load(recognizerFile)
+        except Exception:
+            self.recognizerStateSize = self.getRecognizerStateSize()
+            return False
+
+        JavaLexer.atn, JavaLexer.decisionsToDFA = lexerATN, lexerDFA
+        JavaParser.atn, JavaParser.decisionsToDFA = parserATN, parserDFA
+        self.recognizerStateSize = self.getRecognizerStateSize()
+        return True
+
+    def storeRecognizers(self):
+        """
+        Stores the ATN and DFA of the lexer and the parser for the next run, if the DFA grew since it was loaded.
+        """
+        if self.getRecognizerStateSize() == self.recognizerStateSize:
+            return
+
+        try:
+            fileHandle, temporaryPath = tempfile.mkstemp(dir=self.cacheDirectory)
+            with os.fdopen(fileHandle, 'wb') as recognizerFile:
+                pickle.dump((JavaLexer.atn, JavaLexer.decisionsToDFA, JavaParser.atn, JavaParser.decisionsToDFA),
+                            recognizerFile, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporaryPath, self.getRecognizerPath())
+
+        except (OSError, pickle.PicklingError, RecursionError) as e:
+            print("Cannot write to parse cache: " + str(e))
+
+
 class JavaParse(object):
     """
 
     """
 
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, parseCache: ParseCache = None, twoStageParsing: bool = False,
+                 flatTrees: bool = False):
         self.verbose = verbose
         self.lookupTable = dict()
+        self.parseCache = parseCache
+        self.flatTree = None  # node tables of the tree that was last numerified
+        self.preorderNodes = None  # its ANTLR nodes by preorder rank, unless the tree only exists as a FlatTree
+        self.nodeTypeCache = dict()  # node type -> ordered list of preorder ranks
+        self.scopeTable = None  # preorder rank -> ranks of the (method, constructor, class) declarations around it
+        self.scopeNameCache = dict()
+        self.flatTrees = flatTrees
+        self.prescannedContent = None  # the file content that prescan lexed last, and its tokens
+        self.prescannedTokenStream = None
+        self.twoStageParsing = twoStageParsing
+        self.parseStage = None  # the stage that produced the last tree: "Cache", "SLL" or "LL"
+        self.parseStageCount = dict()
+
+    def prescan(self, fileContent: str) -> set:
+        """
+        Runs only the lexer over the file. The tokens are kept, so that a following parse of the same content does
+        not have to lex it again.
+
+        :param fileContent:
+        :type fileContent: str
+        :return: the texts of all tokens on the default channel
+        :rtype: set
+        """
+        tokenStream = CommonTokenStream(JavaLexer(InputStream(fileContent)))
+        tokenStream.fill()
+        self.prescannedContent = fileContent
+        self.prescannedTokenStream = tokenStream
+
+        return set([token.text for token in tokenStream.tokens if token.channel == Token.DEFAULT_CHANNEL])
 
     # antlr-based parser
     def parse(self, fileContent):
@@ -50,31 +228,195 @@ class JavaParse(object):
         :return:
         :rtype:
         """
-        lexer = JavaLexer(InputStream(fileContent))
-        parser = JavaParser(CommonTokenStream(lexer))
-        parser._errHandler = LittleDarwinErrorStrategy()
-        tree = parser.compilationUnit()
+        cacheKey = None
+        tokenStream = self.prescannedTokenStream if self.prescannedContent is fileContent else None
+        self.prescannedContent = None
+        self.prescannedTokenStream = None
+
+        if self.parseCache is not None:
+            cacheKey = self.parseCache.getKey(fileContent)
+            serializedTree = self.parseCache.load(cacheKey)
+
+            if serializedTree is not None:
+                tree = serializedTree.getNode(0) if self.flatTrees else self.deserializeTree(serializedTree)
+                self.recordParseStage("Cache")
+                self.lookupTable = dict()
+                self.numerify(tree)
+                return tree
+
+        if tokenStream is None:
+            tokenStream = CommonTokenStream(JavaLexer(InputStream(fileContent)))
+        parser = JavaParser(tokenStream)
+        tree = None
+
+        if self.twoStageParsing:
+            # first stage: the faster SLL prediction, bailing out on the first error. SLL only fails on input that
+            # is either invalid or needs full-context prediction, so whatever it accepts is parsed correctly.
+            errorListeners = parser._listeners
+            parser.removeErrorListeners()
+            parser._interp.predictionMode = PredictionMode.SLL
+            parser._errHandler = BailErrorStrategy()
+
+            try:
+                tree = parser.compilationUnit()
+                self.recordParseStage("SLL")
+
+            except ParseCancellationException as e:
+                # second stage: rewind and parse again with full LL prediction.
+                parser.reset()
+                parser._listeners = errorListeners
+                parser._interp.predictionMode = PredictionMode.LL
+
+        if tree is None:
+            parser._errHandler = LittleDarwinErrorStrategy()
+            tree = parser.compilationUnit()
+            self.recordParseStage("LL")
+
         self.lookupTable = dict()
         self.numerify(tree)
 
+        if cacheKey is not None:
+            self.parseCache.store(cacheKey, self.flatTree)
+
+        if self.flatTrees:
+            # from here on only the columns are kept, and the ANTLR tree can be released.
+            tree = self.flatTree.getNode(0)
+            self.numerify(tree)
+
         return tree
 
+    def recordParseStage(self, stage: str):
+        """
+
+        :param stage: the stage that produced the tree
+        :type stage: str
+        """
+        self.parseStage = stage
+        self.parseStageCount[stage] = 1 + self.parseStageCount.get(stage, 0)
+
+    def serializeTree(self, tree) -> FlatTree:
+        """
+        Converts the tree into a FlatTree, which is detached from ANTLR objects and can be pickled.
+
+        :param tree:
+        :type tree: JavaParser.CompilationUnitContext
+        :return:
+        :rtype: FlatTree
+        """
+        if isinstance(tree, FlatNode):
+            return tree.flatTree
+
+        assert isinstance(tree, RuleContext)
+        flatTree = FlatTree()
+        flatTree.addParseTree(tree)
+        return flatTree
+
+    def deserializeTree(self, serializedTree: FlatTree):
+        """
+        Rebuilds an ANTLR tree from the output of serializeTree.
+
+        :param serializedTree:
+        :type serializedTree: FlatTree
+        :return:
+        :rtype: JavaParser.CompilationUnitContext
+        """
+        return serializedTree.toParseTree()
+
     def numerify(self, tree):
         """
+        Assigns a breadth-first index to all nodes, and builds the node tables used by seekAllNodes in the same pass.
 
         :param tree:
         :type tree:
         """
-        assert isinstance(tree, RuleContext)
+        if isinstance(tree, FlatNode):
+            # a flat tree already holds the numbering and the node tables in its columns.
+            self.flatTree = tree.flatTree
+            self.preorderNodes = None
+
+        else:
+            assert isinstance(tree, RuleContext)
+
+            flatTree = FlatTree()
+            preorderNodes = flatTree.addParseTree(tree)
+            for rank in range(0, len(preorderNodes)):
+                preorderNodes[rank].preorderRank = rank
+                preorderNodes[rank].nodeIndex = flatTree.nodeIndices[rank]
+
+            self.flatTree = flatTree
+            self.preorderNodes = preorderNodes
+
+        self.nodeTypeCache = dict()
+        self.scopeTable = None
+        self.scopeNameCache = dict()
+
+    def isIndexed(self, node) -> bool:
+        """
+
+        :param node:
+        :type node:
+        :return: whether the node belongs to the tree that was last numerified
+        :rtype: bool
+        """
+        rank = getattr(node, 'preorderRank', None)
+        if rank is None or self.flatTree is None:
+            return False
+
+        if self.preorderNodes is None:
+            return isinstance(node, FlatNode) and node.flatTree is self.flatTree
+
+        return rank < len(self.preorderNodes) and self.preorderNodes[rank] is node
 
-        numerifyCounter = 1
-        queue = [tree]
+    def getIndexedNodeAt(self, rank: int):
+        """
+
+        :param rank: preorder rank of a node of the tree that was last numerified
+        :type rank: int
+        :return:
+        :rtype:
+        """
+        if self.preorderNodes is None:
+            return self.flatTree.getNode(rank)
+
+        return self.preorderNodes[rank]
+
+    def getIndexedNode(self, tree, nodeIndex):
+        """
+
+        :param tree: a node of the tree that was last numerified
+        :type tree:
+        :param nodeIndex:
+        :type nodeIndex:
+        :return: the node with the given index if it is in the subtree rooted at tree, otherwise None
+        :rtype:
+        """
+        if not 0 < nodeIndex < len(self.flatTree.ranksByNodeIndex):
+            return None
 
-        while len(queue) > 0:
-            node = queue.pop(0)
-            node.nodeIndex = numerifyCounter
-            numerifyCounter += 1
-            queue.extend(getattr(node, 'children', []))
+        rank = self.flatTree.ranksByNodeIndex[nodeIndex]
+        if tree.preorderRank <= rank < tree.preorderRank + self.flatTree.subtreeSizes[tree.preorderRank]:
+            return self.getIndexedNodeAt(rank)
+
+        return None
+
+    def getNodeTypeRanks(self, nodeType):
+        """
+
+        :param nodeType: a class or a tuple of classes, as for isinstance
+        :type nodeType:
+        :return: ordered preorder ranks of all indexed nodes of the given type
+        :rtype: array
+        """
+        if nodeType not in self.nodeTypeCache:
+            kindIndex = self.flatTree.getKindIndex()
+            rankLists = [kindIndex[nodeClass] for nodeClass in kindIndex.keys() if issubclass(nodeClass, nodeType)]
+
+            if len(rankLists) == 1:
+                self.nodeTypeCache[nodeType] = rankLists[0]
+            else:
+                self.nodeTypeCache[nodeType] = array('i', merge(*rankLists))
+
+        return self.nodeTypeCache[nodeType]
 
     def toString(self, tree):
         """
@@ -98,6 +440,13 @@ class JavaParse(object):
         :return:
         :rtype:
         """
+        if self.isIndexed(tree):
+            # the nodes of a subtree have consecutive preorder ranks, so this is a range query on the index.
+            nodeTypeRanks = self.getNodeTypeRanks(nodeType)
+            firstRank = bisect_left(nodeTypeRanks, tree.preorderRank)
+            lastRank = bisect_left(nodeTypeRanks, tree.preorderRank + self.flatTree.subtreeSizes[tree.preorderRank])
+            return [self.getIndexedNodeAt(rank) for rank in nodeTypeRanks[firstRank:lastRank]]
+
         resultList = list()
         seekStack = [tree]
 
@@ -167,6 +516,12 @@ class JavaParse(object):
         :return:
         :rtype:
         """
+        if self.isIndexed(tree):
+            node = self.getIndexedNode(tree, nodeIndex)
+            if node is None:
+                return None
+            return self.flatTree.nodeDepths[node.preorderRank] - self.flatTree.nodeDepths[tree.preorderRank]
+
         if tree.nodeIndex == nodeIndex:
             return 0
 
@@ -190,6 +545,9 @@ class JavaParse(object):
         :return:
         :rtype:
         """
+        if self.isIndexed(tree):
+            return self.getIndexedNode(tree, index)
+
         if index in self.lookupTable:
             return self.lookupTable[index]
 
@@ -354,21 +712,49 @@ class JavaParse(object):
 
         return resultDict
 
-    def getMethodNameForNode(self, tree: JavaParser.CompilationUnitContext, nodeIndex: int):
+    def getScopeTable(self) -> list:
         """
+        Builds the scope of every node of the numerified tree in one pass, the first time it is needed.
 
-        :param tree:
-        :type tree:
-        :param nodeIndex:
-        :type nodeIndex:
+        :return: ranks of the nearest enclosing method, constructor and class declaration of each node (-1 if there is
+                 none), by preorder rank
+        :rtype: list
+        """
+        if self.scopeTable is None:
+            flatTree = self.flatTree
+            scopeKinds = [0 if issubclass(nodeClass, JavaParser.MethodDeclarationContext) else
+                          1 if issubclass(nodeClass, JavaParser.ConstructorDeclarationContext) else
+                          2 if issubclass(nodeClass, JavaParser.ClassDeclarationContext) else -1
+                          for nodeClass in flatTree.nodeClasses]
+            scopeTable = [(-1, -1, -1)] * len(flatTree)
+
+            # parents come before their children in preorder, so each scope is derived from the parent's.
+            for rank in range(1, len(flatTree)):
+                parentRank = flatTree.parentRanks[rank]
+                scopeKind = scopeKinds[flatTree.nodeKinds[parentRank]]
+
+                if scopeKind == -1:
+                    scopeTable[rank] = scopeTable[parentRank]
+                else:
+                    scope = list(scopeTable[parentRank])
+                    scope[scopeKind] = parentRank
+                    scopeTable[rank] = tuple(scope)
+
+            self.scopeTable = scopeTable
+
+        return self.scopeTable
+
+    def getMethodNameForScope(self, methodDeclaration, classDeclaration):
+        """
+
+        :param methodDeclaration:
+        :type methodDeclaration:
+        :param classDeclaration:
+        :type classDeclaration:
         :return:
         :rtype:
         """
         methodName = None
-        node = self.getNode(tree, nodeIndex)
-        methodDeclaration = self.seekFirstMatchingParent(node, JavaParser.MethodDeclarationContext)
-        if methodDeclaration is None:
-            methodDeclaration = self.seekFirstMatchingParent(node, JavaParser.ConstructorDeclarationContext)
         if methodDeclaration is None:
             return "***not in a method***"
 
@@ -378,7 +764,6 @@ class JavaParse(object):
                 methodName = methodDeclaration.children[index - 1].symbol.text + self.getText(
                     methodDeclaration.children[index])
 
-        classDeclaration = self.seekFirstMatchingParent(node, JavaParser.ClassDeclarationContext)
         if classDeclaration is None:
             return methodName
 
@@ -388,6 +773,35 @@ class JavaParse(object):
                     classDeclaration.children[index - 1].symbol.text == 'class':
                 return classDeclaration.children[index].symbol.text + '.' + methodName
 
+    def getMethodNameForNode(self, tree: JavaParser.CompilationUnitContext, nodeIndex: int):
+        """
+
+        :param tree:
+        :type tree:
+        :param nodeIndex:
+        :type nodeIndex:
+        :return:
+        :rtype:
+        """
+        node = self.getNode(tree, nodeIndex)
+
+        if not self.isIndexed(node):
+            methodDeclaration = self.seekFirstMatchingParent(node, JavaParser.MethodDeclarationContext)
+            if methodDeclaration is None:
+                methodDeclaration = self.seekFirstMatchingParent(node, JavaParser.ConstructorDeclarationContext)
+            classDeclaration = self.seekFirstMatchingParent(node, JavaParser.ClassDeclarationContext)
+            return self.getMethodNameForScope(methodDeclaration, classDeclaration)
+
+        scope = self.getScopeTable()[node.preorderRank]
+        if scope not in self.scopeNameCache:
+            methodRank, constructorRank, classRank = scope
+            methodRank = methodRank if methodRank != -1 else constructorRank
+            self.scopeNameCache[scope] = self.getMethodNameForScope(
+                self.getIndexedNodeAt(methodRank) if methodRank != -1 else None,
+                self.getIndexedNodeAt(classRank) if classRank != -1 else None)
+
+        return self.scopeNameCache[scope]
+
     def getMethodTypeForNode(self, node):
         """
 
@@ -469,7 +883,10 @@ class JavaParse(object):
         :return:
         :rtype:
         """
-        if noGraphviz:
+        # graphviz is only needed here, so it is not loaded with the module.
+        try:
+            import graphviz
+        except ImportError as e:
             return None
 
         assert isinstance(tree, JavaParser.CompilationUnitContext)
@@ -24,8 +24,12 @@
 ##                                                                                                            ##
 ################################################################################################################
 
+import csv
 import datetime
+import hashlib
 import io
+import math
+import multiprocessing
 import os
 import platform
 import shelve
@@ -35,14 +39,15 @@ import subprocess
 import sys
 import threading
 import time
-from distutils.spawn import find_executable
+from multiprocessing.util import Finalize
 from optparse import OptionParser
+from random import Random
 
 from littledarwin import License
-from .JavaIO import JavaIO
-from .JavaMutate import JavaMutate
-# LittleDarwin modules
-from .JavaParse import JavaParse
+# LittleDarwin modules. the parser and the mutation operators are imported by the mutation phase, since loading the
+# generated parser takes longer than anything else a short invocation does.
+from .JavaIO import JavaIO, ResultsArchive
+from .MutationDatabase import MutationDatabase, openMutationDatabase
 from .ReportGenerator import ReportGenerator
 
 ### DEBUG ###
@@ -95,7 +100,7 @@ def main(mockArgs: list = None):
     # ---------------------------------------- test suite running phase -----------------------------------------------
     # *****************************************************************************************************************
 
-    if options.isBuildActive:
+    if options.isBuildActive and not options.isCountOnlyActive:
         buildPhase(options)
 
     # if neither build nor mutation phase is active, let's help the user.
@@ -120,7 +125,6 @@ def mutationPhase(options, filterType, filterList, higherOrder):
     """
     # creating our module objects.
     javaIO = JavaIO(options.isVerboseActive)
-    javaParse = JavaParse(options.isVerboseActive)
     totalMutantCount = 0
 
     try:
@@ -137,88 +141,925 @@ def mutationPhase(options, filterType, filterList, higherOrder):
     # so it cannot be simply copied from a platform to another.
     databasePath = os.path.join(javaIO.targetDirectory, "mutationdatabase")
     densityResultsPath = os.path.join(javaIO.targetDirectory, "ProjectDensityReport.csv")
+    countResultsPath = os.path.join(javaIO.targetDirectory, "MutantCountReport.csv")
+    operatorProfilePath = os.path.join(javaIO.targetDirectory, "OperatorProfileReport.csv")
     print("Source Path: ", javaIO.sourceDirectory)
     print("Target Path: ", javaIO.targetDirectory)
-    print("Creating Mutation Database: ", databasePath)
-    mutationDatabase = shelve.open(databasePath, "c")
+
+    # in count-only mode, the results of a previous run are left as they are.
+    if options.isCountOnlyActive:
+        print("Counting mutants only, no mutants are written.")
+        mutationDatabase = None
+    elif options.databaseFormat == "sqlite":
+        # a new database is started unless the mutants of a previous run are reused.
+        if not options.isIncrementalActive:
+            MutationManifest.remove(databasePath)
+        print("Creating Mutation Database: ", databasePath + ".sqlite")
+        mutationDatabase = MutationDatabase(databasePath + ".sqlite", "c")
+    else:
+        # the build phase prefers an SQLite database, so one left by a previous run must not stay next to this one.
+        if os.path.isfile(databasePath + ".sqlite"):
+            os.remove(databasePath + ".sqlite")
+        print("Creating Mutation Database: ", databasePath)
+        mutationDatabase = shelve.open(databasePath, "c")
+    # the mutants dropped as duplicates or as equivalent to the original code are recorded next to the database.
+    duplicateDatabasePath = databasePath + "-duplicates"
+    duplicateDatabase = None
+    if options.isDeduplicationActive and not options.isCountOnlyActive:
+        print("Creating Duplicate Mutant Database: ", duplicateDatabasePath)
+        duplicateDatabase = shelve.open(duplicateDatabasePath, "n")
+    elif not options.isCountOnlyActive:
+        MutationManifest.remove(duplicateDatabasePath)
+    # with patch storage, the edits of the mutants are kept next to the database instead of the mutant files.
+    patchDatabasePath = databasePath + "-patches"
+    patchDatabase = None
+    if options.isPatchStorageActive and not options.isCountOnlyActive:
+        print("Creating Mutant Patch Database: ", patchDatabasePath)
+        patchDatabase = shelve.open(patchDatabasePath, "n")
+    elif not options.isCountOnlyActive:
+        MutationManifest.remove(patchDatabasePath)
+    # in archive mode, the mutants and the reports of each file are written to a single archive.
+    archivePath = os.path.join(javaIO.targetDirectory, "mutationarchive.zip")
+    resultsArchive = None
+    if options.isArchiveActive and not options.isCountOnlyActive:
+        print("Creating Mutation Archive: ", archivePath)
+        resultsArchive = ResultsArchive(archivePath, javaIO.targetDirectory, "w")
+    elif not options.isCountOnlyActive and os.path.isfile(archivePath):
+        os.remove(archivePath)
+    # the outputs of a build phase that was interrupted belong to the mutants of the previous run.
+    if not options.isCountOnlyActive:
+        shutil.rmtree(os.path.join(javaIO.targetDirectory, "mutationarchive-build"), ignore_errors=True)
     mutantTypeDatabase = dict()
     averageDensityDict = dict()
+    parseStageCount = dict()
+    countResults = list()
+    skippedFileCount = 0
+    duplicateMutantCount = 0
+    equivalentMutantCount = 0
+    sampledMutantCount = 0
+    operatorProfiles = list()
+
+    mutationWorker = MutationWorker(options, higherOrder, javaIO.sourceDirectory, javaIO.targetDirectory)
+    jobs = options.jobs if options.jobs > 0 else multiprocessing.cpu_count()
+
+    # in incremental mode, the files that did not change since the previous run keep their mutants, and only the
+    # rest is mutated again. otherwise, a manifest left by a previous run no longer describes the results.
+    manifestPath = os.path.join(javaIO.targetDirectory, "mutationmanifest")
+    mutationManifest = None
+    reusedResults = dict()
+    sourceHashes = dict()
+    removedFileCount = 0
+
+    if options.isCountOnlyActive:
+        pass
+    elif options.isIncrementalActive:
+        print("Using Mutation Manifest: ", manifestPath)
+        mutationManifest = MutationManifest(manifestPath, javaIO.targetDirectory, mutationWorker.settingsTag)
+
+        for srcFile in javaIO.fileList:
+            fileRelativePath = os.path.relpath(srcFile, javaIO.sourceDirectory)
+            sourceHashes[srcFile] = mutationManifest.getSourceHash(srcFile)
+            result = mutationManifest.getResult(fileRelativePath, sourceHashes[srcFile])
+
+            if result is not None:
+                result["sourceFile"] = srcFile
+                reusedResults[srcFile] = result
+            else:
+                removeMutants(javaIO.targetDirectory, fileRelativePath, mutationDatabase)
+
+        currentFiles = set([os.path.relpath(srcFile, javaIO.sourceDirectory) for srcFile in javaIO.fileList])
+        for fileRelativePath in mutationManifest.getFileRelativePaths():
+            if fileRelativePath not in currentFiles:
+                removeMutants(javaIO.targetDirectory, fileRelativePath, mutationDatabase)
+                mutationManifest.removeResult(fileRelativePath)
+                removedFileCount += 1
+    else:
+        MutationManifest.remove(manifestPath)
+
+    filesToMutate = [srcFile for srcFile in javaIO.fileList if srcFile not in reusedResults]
+
+    if jobs > 1 and len(filesToMutate) > 1:
+        print("Mutating with", jobs, "parallel jobs.")
+
+    # a project-wide sample is drawn from the mutants of all files, so they are counted in a first pass.
+    isSamplingActive = options.sampleSize != "***dummy***" and not options.isCountOnlyActive
+    if isSamplingActive and options.sampleScope == "project":
+        # the counting pass and the writing pass must combine higher-order mutants alike, so they share a seed.
+        if options.seed is None:
+            options.seed = Random().randrange(2 ** 31)
+            print("Seed for the project-wide sample: ", options.seed)
+        print("Counting mutants for the project-wide sample.")
+        mutationWorker.isCountOnly = True
+        mutantCounts = [(result["fileRelativePath"], result["mutantCount"])
+                        for result in runMutationWorkers(mutationWorker, filesToMutate, jobs)]
+        mutationWorker.isCountOnly = False
+        mutationWorker.sampleIndices = getProjectSampleIndices(mutantCounts, options.sampleSize, options.seed)
 
     # go through each file, parse it, calculate all mutations, and generate files accordingly.
-    for srcFile in javaIO.fileList:
-        print("\n(" + str(fileCounter + 1) + "/" + str(fileCount) + ") Source file: ", srcFile)
-        targetList = list()
+    results = runMutationWorkers(mutationWorker, filesToMutate, jobs)
 
-        try:
-            # parsing the source file into a tree.
-            sourceCode = javaIO.getFileContent(srcFile)
-            tree = javaParse.parse(sourceCode)
+    if len(reusedResults) > 0:
+        results = withReusedResults(results, reusedResults, javaIO.fileList)
 
-        except Exception as e:
+    for result in results:
+        print("\n(" + str(fileCounter + 1) + "/" + str(fileCount) + ") Source file: ", result["sourceFile"])
+
+        isReused = result["sourceFile"] in reusedResults
+        if isReused:
+            print("--> Unchanged since the previous run, kept its mutants.")
+        elif mutationManifest is not None:
+            mutationManifest.putResult(result["fileRelativePath"], sourceHashes[result["sourceFile"]], result)
+
+        if result["parseError"] is not None:
             print("Error in parsing Java code, skipping the file.")
-            sys.stderr.write(str(e))
+            sys.stderr.write(result["parseError"])
             continue
 
         fileCounter += 1
 
-        enabledMutators = ["Traditional"]
+        if result["skipped"]:
+            print("--> No candidate tokens, skipped parsing.")
+            skippedFileCount += 0 if isReused else 1
+            averageDensityDict[result["fileRelativePath"]] = result["averageDensity"]
+            continue
+
+        if not isReused:
+            parseStageCount[result["parseStage"]] = 1 + parseStageCount.get(result["parseStage"], 0)
+
+        if options.isVerboseActive and not isReused:
+            print("--> Parse stage: ", result["parseStage"])
+
+        print("--> Mutations found: ", result["mutantCount"])
+        if isSamplingActive:
+            print("--> Sampled mutants: ", len(result["targetList"]))
+            sampledMutantCount += len(result["targetList"])
+
+        # go through all mutant types, and add them in total. also output the info to the user.
+        mutantTypes = result["mutantTypes"]
+        for mutantType in mutantTypes.keys():
+            if mutantTypes[mutantType] > 0:
+                print("---->", mutantType, ":", mutantTypes[mutantType])
+            mutantTypeDatabase[mutantType] = mutantTypes[mutantType] + mutantTypeDatabase.get(mutantType, 0)
+        mutantsPerMethod = result.get("mutantsPerMethod", dict())
+        for methodName in sorted(mutantsPerMethod.keys()):
+            print("----> in", methodName, ":", mutantsPerMethod[methodName])
+        totalMutantCount += result["mutantCount"]
+
+        averageDensityDict[result["fileRelativePath"]] = result["averageDensity"]
+        countResults.append(result)
+        if options.isOperatorProfileActive and not isReused:
+            operatorProfiles.append((result["fileRelativePath"], result.get("operatorProfile", list())))
+
+        # if the list is not empty (some mutants were found), put the data in the database.
+        if len(result["targetList"]) != 0:
+            if isinstance(mutationDatabase, MutationDatabase):
+                mutationDatabase.putMutants(result["fileRelativePath"], result["targetList"],
+                                            result.get("mutationRecords"))
+            else:
+                mutationDatabase[result["fileRelativePath"]] = result["targetList"]
+            if patchDatabase is not None:
+                patchDatabase[result["fileRelativePath"]] = result["patches"]
+            if resultsArchive is not None:
+                writeToArchive(resultsArchive, javaIO, result)
+
+        redundantMutants = result.get("redundantMutants")
+        if duplicateDatabase is not None and redundantMutants is not None:
+            duplicateCount = sum(len(duplicates) for duplicates in redundantMutants["duplicates"].values())
+            equivalentCount = len(redundantMutants["equivalent"])
+            if duplicateCount + equivalentCount > 0:
+                print("--> Dropped duplicate mutants: ", duplicateCount, " equivalent mutants: ", equivalentCount)
+                duplicateDatabase[result["fileRelativePath"]] = redundantMutants
+            duplicateMutantCount += duplicateCount
+            equivalentMutantCount += equivalentCount
+
+    mutationWorker.finalize()
+
+    if mutationDatabase is not None:
+        mutationDatabase.close()
+    if patchDatabase is not None:
+        patchDatabase.close()
+    if resultsArchive is not None:
+        resultsArchive.close()
+    print("\nTotal mutations found: ", totalMutantCount)
+
+    if isSamplingActive:
+        print("Sampled mutants: ", sampledMutantCount)
+
+    if duplicateDatabase is not None:
+        duplicateDatabase.close()
+        print("Dropped duplicate mutants: ", duplicateMutantCount, " equivalent mutants: ", equivalentMutantCount)
+
+    if mutationManifest is not None:
+        mutationManifest.close()
+        print("Files unchanged: ", len(reusedResults), " mutated: ", len(filesToMutate), " removed: ",
+              removedFileCount)
+
+    if options.parseCachePath != "***dummy***":
+        print("Parse cache hits: ", parseStageCount.get("Cache", 0), " misses: ",
+              fileCount - skippedFileCount - len(reusedResults) - parseStageCount.get("Cache", 0))
+
+    if options.isPrescanActive:
+        print("Files skipped by prescan: ", skippedFileCount)
+
+    if options.isTwoStageParsing:
+        for parseStage in sorted(parseStageCount.keys()):
+            print("Files parsed by stage", parseStage + ":", parseStageCount[parseStage])
+
+    for mutantType in list(mutantTypeDatabase.keys()):
+        if mutantTypeDatabase[mutantType] > 0:
+            print("-->", mutantType + ":", mutantTypeDatabase[mutantType])
+
+    if options.isOperatorProfileActive:
+        writeOperatorProfileReport(operatorProfilePath, operatorProfiles)
+        print("\nOperator profile report: ", operatorProfilePath)
+
+    if options.isCountOnlyActive:
+        # the build phase builds the project once for each mutant.
+        buildDuration = options.buildDuration
+        if buildDuration <= 0 and options.isBuildActive:
+            buildDuration = measureBuildDuration(options)
+
+        if buildDuration > 0:
+            print("\nBuild duration: ", datetime.timedelta(seconds=int(buildDuration)), " estimated build phase: ",
+                  datetime.timedelta(seconds=int(buildDuration * totalMutantCount)))
+            for result in sorted(countResults, key=lambda result: result["mutantCount"], reverse=True):
+                if result["mutantCount"] > 0:
+                    print("-->", result["fileRelativePath"] + ":",
+                          datetime.timedelta(seconds=int(buildDuration * result["mutantCount"])))
+
+        writeCountReport(countResultsPath, countResults, buildDuration)
+        print("\nMutant count report: ", countResultsPath)
+        return
+
+    with open(densityResultsPath, 'w') as densityReportHandle:
+        for key in averageDensityDict.keys():
+            densityReportHandle.write(key + ',' + str(averageDensityDict[key]) + '\n')
+
+
+def writeCountReport(countResultsPath: str, countResults: list, buildDuration: float):
+    """
+    Writes the number of mutants per file, per operator and per method of a count-only run, along with the
+    estimated duration of building them.
+
+    :param countResultsPath: path of the report
+    :type countResultsPath: str
+    :param countResults: results of MutationWorker calls in count-only mode
+    :type countResults: list
+    :param buildDuration: duration of a single build in seconds, or 0 if it is not known
+    :type buildDuration: float
+    """
+    def estimate(mutantCount):
+        return "{:.0f}".format(buildDuration * mutantCount) if buildDuration > 0 else ""
+
+    with open(countResultsPath, 'w', newline='') as countReportHandle:
+        countReportWriter = csv.writer(countReportHandle)
+        countReportWriter.writerow(["Scope", "File", "Name", "Mutants", "EstimatedBuildSeconds"])
+        totalMutantCount = 0
+
+        for result in countResults:
+            totalMutantCount += result["mutantCount"]
+            countReportWriter.writerow(["file", result["fileRelativePath"], "", result["mutantCount"],
+                                        estimate(result["mutantCount"])])
+            for mutantType in sorted(result["mutantTypes"].keys()):
+                if result["mutantTypes"][mutantType] > 0:
+                    countReportWriter.writerow(["operator", result["fileRelativePath"], mutantType,
+                                                result["mutantTypes"][mutantType],
+                                                estimate(result["mutantTypes"][mutantType])])
+            for methodName in sorted(result["mutantsPerMethod"].keys()):
+                countReportWriter.writerow(["method", result["fileRelativePath"], methodName,
+                                            result["mutantsPerMethod"][methodName],
+                                            estimate(result["mutantsPerMethod"][methodName])])
+
+        countReportWriter.writerow(["total", "", "", totalMutantCount, estimate(totalMutantCount)])
+
+
+def writeOperatorProfileReport(operatorProfilePath: str, operatorProfiles: list):
+    """
+    Writes the nodes, mutants and time of each mutation operator in each file, and prints the operators that took
+    the most time in total.
+
+    :param operatorProfilePath: path of the report
+    :type operatorProfilePath: str
+    :param operatorProfiles: the path of each mutated file, relative to the source directory, and the operator
+        profile of JavaMutate for it
+    :type operatorProfiles: list
+    """
+    operatorTimes = dict()
+
+    with open(operatorProfilePath, 'w', newline='') as profileReportHandle:
+        profileReportWriter = csv.writer(profileReportHandle)
+        profileReportWriter.writerow(["File", "Operator", "CandidateNodes", "MutableNodes", "Mutants", "Seconds"])
+
+        for fileRelativePath, operatorProfile in operatorProfiles:
+            for entry in operatorProfile:
+                profileReportWriter.writerow([fileRelativePath, entry["operator"], entry["candidateNodes"],
+                                              entry["mutableNodes"], entry["mutants"],
+                                              "{:.6f}".format(entry["seconds"])])
+                operatorTimes[entry["operator"]] = entry["seconds"] + operatorTimes.get(entry["operator"], 0)
+
+    for operator in sorted(operatorTimes.keys(), key=lambda operator: operatorTimes[operator], reverse=True):
+        print("-->", operator + ":", "{:.3f}".format(operatorTimes[operator]), "seconds")
+
+
+def measureBuildDuration(options) -> float:
+    """
+    Times a run of the initial build, which the build phase repeats for each mutant.
+
+    :param options:
+    :type options:
+    :return: duration of the build in seconds
+    :rtype: float
+    """
+    if os.path.basename(options.buildPath) == "pom.xml":
+        buildDir = os.path.abspath(os.path.dirname(options.buildPath))
+    else:
+        buildDir = os.path.abspath(options.buildPath)
+
+    if options.initialBuildCommand == "***dummy***":
+        commandString = options.buildCommand.split(',')
+    else:
+        commandString = options.initialBuildCommand.split(',')
+    print("\nTiming the initial build...", end=" ", flush=True)
+
+    startTime = time.time()
+    processKilled, processExitCode, initialOutput = timeoutAlternative(commandString, workingDirectory=buildDir,
+                                                                       timeout=int(options.timeout))
+    buildDuration = time.time() - startTime
+
+    if processKilled or processExitCode:
+        print("failed.\n")
+        print("Initial build failed. Try building the system manually first to make sure it can be built.")
+        sys.exit(3)
+
+    print("done.")
+    return buildDuration
+
+
+class MutationWorker(object):
+    """
+    Parses and mutates a single source file, and writes its mutants. Instances only hold the configuration of the
+    mutation phase, so that they can be sent to worker processes.
+    """
+
+    def __init__(self, options, higherOrder: int, sourceDirectory: str, targetDirectory: str):
+        """
+
+        :param options:
+        :type options:
+        :param higherOrder:
+        :type higherOrder: int
+        :param sourceDirectory:
+        :type sourceDirectory: str
+        :param targetDirectory:
+        :type targetDirectory: str
+        """
+        self.options = options
+        self.higherOrder = higherOrder
+        self.sourceDirectory = sourceDirectory
+        self.targetDirectory = targetDirectory
+        self.javaIO = None
+        self.javaParse = None
+        self.isCountOnly = options.isCountOnlyActive
+        self.sampleIndices = None  # positions of the sampled mutants of each file, for a project-wide sample
+
+        self.enabledMutators = ["Traditional"]
 
         if options.isNullCheck:
-            enabledMutators = ["Null"]
+            self.enabledMutators = ["Null"]
 
         if options.isAll:
-            enabledMutators = ["All"]
+            self.enabledMutators = ["All"]
 
         if options.isMethodLevel:
-            enabledMutators = ["Method"]
+            self.enabledMutators = ["Method"]
 
-        # apply mutations on the tree and receive the resulting mutants as a list of strings, and a detailed
-        # list of which operators created how many mutants.
+    @property
+    def settingsTag(self) -> str:
+        """
+        Describes the settings that decide which mutants are generated for a file.
 
-        javaMutate = JavaMutate(tree, sourceCode, javaParse, options.isVerboseActive)
+        :return: the settings tag
+        :rtype: str
+        """
+        return littleDarwinVersion + ";" + ",".join(self.enabledMutators) + ";" + str(self.higherOrder) + ";" + \
+               self.options.higherOrderStrategy + ";" + str(self.options.seed) + \
+               (";deduplicated" if self.options.isDeduplicationActive else "") + \
+               (";patches" if self.options.isPatchStorageActive else "") + \
+               (";sqlite" if self.options.databaseFormat == "sqlite" else "") + \
+               (";archive" if self.options.isArchiveActive else "") + \
+               (";sample=" + self.options.sampleSize if self.options.sampleSize != "***dummy***" else "")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["javaIO"] = None
+        state["javaParse"] = None
+        return state
+
+    def initialize(self):
+        """
+        Creates the module objects. This happens in the process that does the work.
+        """
+        from .JavaParse import JavaParse, ParseCache
 
-        if higherOrder == 1:
-            mutated, mutantTypes = javaMutate.gatherMutants(enabledMutators)
-        else:
-            mutated, mutantTypes = javaMutate.gatherHigherOrderMutants(higherOrder, enabledMutators)
+        self.javaIO = JavaIO(self.options.isVerboseActive)
+        self.javaIO.sourceDirectory = self.sourceDirectory
+        self.javaIO.targetDirectory = self.targetDirectory
 
-        print("--> Mutations found: ", len(mutated))
+        parseCache = None
+        if self.options.parseCachePath != "***dummy***":
+            parseCache = ParseCache(self.options.parseCachePath, littleDarwinVersion)
+            parseCache.loadRecognizers()
+        # operators and metrics only need the flat form of the tree, which is much smaller than the ANTLR objects.
+        self.javaParse = JavaParse(self.options.isVerboseActive, parseCache, self.options.isTwoStageParsing,
+                                   flatTrees=True)
 
-        # go through all mutant types, and add them in total. also output the info to the user.
-        for mutantType in mutantTypes.keys():
-            if mutantTypes[mutantType] > 0:
-                print("---->", mutantType, ":", mutantTypes[mutantType])
-            mutantTypeDatabase[mutantType] = mutantTypes[mutantType] + mutantTypeDatabase.get(mutantType, 0)
-        totalMutantCount += len(mutated)
+    def __call__(self, srcFile: str) -> dict:
+        """
+
+        :param srcFile: path to the source file
+        :type srcFile: str
+        :return: the mutants written for the file, the number of mutants per type, and the average density
+        :rtype: dict
+        """
+        from .JavaMutate import JavaMutate, mayHaveMutants
 
-        # for each mutant, generate the file, and add it to the list.
+        if self.javaParse is None:
+            self.initialize()
+
+        javaIO = self.javaIO
+        javaParse = self.javaParse
         fileRelativePath = os.path.relpath(srcFile, javaIO.sourceDirectory)
-        densityReport = javaMutate.aggregateReport(littleDarwinVersion)
-        averageDensityDict[fileRelativePath] = javaMutate.averageDensity
-        aggregateComplexity = javaIO.getAggregateComplexityReport(javaMutate.mutantsPerMethod,
-                                                                  javaParse.getCyclomaticComplexityAllMethods(tree),
-                                                                  javaParse.getLinesOfCodePerMethod(tree))
+        result = {"sourceFile": srcFile, "fileRelativePath": fileRelativePath, "parseError": None,
+                  "parseStage": None, "skipped": False, "mutantTypes": dict(), "mutantCount": 0,
+                  "targetList": list(), "mutantsPerMethod": dict(), "redundantMutants": None,
+                  "operatorProfile": list(), "averageDensity": 0}
 
-        for mutatedFile in mutated:
-            targetList.append(javaIO.generateNewFile(srcFile, mutatedFile, javaMutate.mutantsPerLine,
-                                                     densityReport, aggregateComplexity))
+        try:
+            sourceCode = javaIO.getFileContent(srcFile)
 
-        # if the list is not empty (some mutants were found), put the data in the database.
-        if len(targetList) != 0:
-            mutationDatabase[fileRelativePath] = targetList
+            # a file without any of the tokens the operators look for cannot yield mutants, so it is not parsed.
+            if self.options.isPrescanActive and \
+                    not mayHaveMutants(javaParse.prescan(sourceCode), self.enabledMutators):
+                result["skipped"] = True
+                return result
+
+            # parsing the source file into a tree.
+            tree = javaParse.parse(sourceCode)
+            result["parseStage"] = javaParse.parseStage
+
+        except Exception as e:
+            result["parseError"] = str(e)
+            return result
+
+        # apply mutations on the tree and receive the resulting mutants, which only hold their mutations until they
+        # are written, and a detailed list of which operators created how many mutants.
+
+        javaMutate = JavaMutate(tree, sourceCode, javaParse, self.options.isVerboseActive,
+                                self.options.isDeduplicationActive, self.options.isOperatorProfileActive)
+
+        # in count-only mode, the mutants are counted, but nothing is written.
+        if self.isCountOnly:
+            result["mutantCount"], result["mutantTypes"] = javaMutate.countAllMutants(
+                self.enabledMutators, self.higherOrder, self.options.higherOrderStrategy, self.getSeed(fileRelativePath))
+            result["mutantsPerMethod"] = javaMutate.mutantsPerMethod
+            result["averageDensity"] = javaMutate.averageDensity
+            result["operatorProfile"] = javaMutate.getOperatorProfile()
+            return result
+
+        if self.higherOrder == 1:
+            mutated, mutantTypes = javaMutate.gatherMutants(self.enabledMutators)
+        else:
+            mutated, mutantTypes = javaMutate.gatherHigherOrderMutants(self.higherOrder, self.enabledMutators,
+                                                                       self.options.higherOrderStrategy,
+                                                                       self.getSeed(fileRelativePath))
+
+        result["mutantTypes"] = mutantTypes
+        result["mutantCount"] = len(mutated)
+        result["operatorProfile"] = javaMutate.getOperatorProfile()
+
+        result["averageDensity"] = javaMutate.averageDensity
+
+        # the mutants that are not sampled are never written.
+        sampledMutants = self.sampleMutants(fileRelativePath, mutated)
+
+        # for each mutant, generate the file, and add it to the list. with patch storage, only the edits of each
+        # mutant are kept, and the mutant files are written when needed. in archive mode, the edits are passed to the
+        # main process, which writes the mutants to the archive.
+        if self.options.isArchiveActive:
+            result["targetList"] = javaIO.getMutantPaths(srcFile, len(sampledMutants))
+            result["patches"] = [mutant.getPatch() for mutant in sampledMutants]
+        elif self.options.isPatchStorageActive:
+            result["patches"] = list()
+            for mutant in sampledMutants:
+                result["targetList"].append(javaIO.generateNewPatch(srcFile))
+                result["patches"].append(mutant.getPatch())
+        else:
+            result["targetList"] = javaIO.generateNewFiles(srcFile, sampledMutants)
+
+        # the SQLite database keeps the mutations of each mutant, so that it can be queried by operator and method.
+        if self.options.databaseFormat == "sqlite":
+            result["mutationRecords"] = [mutant.getMutationRecords() for mutant in sampledMutants]
+
+        # the density and complexity reports of the file are made and written once, after its mutants. the aggregate
+        # report only marks the mutants that were written, while the densities describe all mutants of the file.
+        if len(result["targetList"]) > 0:
+            densityReport = javaMutate.aggregateReport(littleDarwinVersion, sampledMutants)
+            aggregateComplexity = javaIO.getAggregateComplexityReport(javaMutate.mutantsPerMethod,
+                                                                      javaParse.getCyclomaticComplexityAllMethods(tree),
+                                                                      javaParse.getLinesOfCodePerMethod(tree))
+            if self.options.isArchiveActive:
+                result["fileArtifacts"] = javaIO.getFileArtifacts(javaMutate.mutantsPerLine, densityReport,
+                                                                  aggregateComplexity)
+            else:
+                javaIO.writeFileArtifacts(srcFile, javaMutate.mutantsPerLine, densityReport, aggregateComplexity)
+
+        # the dropped mutants are recorded along with the mutant that was written in their place.
+        if javaMutate.deduplicator is not None:
+            targetFiles = dict(zip(sampledMutants, result["targetList"]))
+            result["redundantMutants"] = {
+                "duplicates": dict((targetFiles[mutantGroup[0]], [mutant.summary for mutant in mutantGroup[1:]])
+                                   for mutantGroup in javaMutate.deduplicator.duplicateGroups
+                                   if mutantGroup[0] in targetFiles),
+                "equivalent": [mutant.summary for mutant in javaMutate.deduplicator.equivalentMutants]}
 
         del javaMutate
 
-    mutationDatabase.close()
-    print("\nTotal mutations found: ", totalMutantCount)
+        return result
 
-    with open(densityResultsPath, 'w') as densityReportHandle:
-        for key in averageDensityDict.keys():
-            densityReportHandle.write(key + ',' + str(averageDensityDict[key]) + '\n')
+    def sampleMutants(self, fileRelativePath: str, mutants: list) -> list:
+        """
+        Chooses the mutants of a file that are written, if a sample is requested.
+
+        :param fileRelativePath: path of the source file, relative to the source directory
+        :type fileRelativePath: str
+        :param mutants: all mutants of the file
+        :type mutants: list
+        :return: the sampled mutants, in their original order
+        :rtype: list
+        """
+        if self.sampleIndices is not None:
+            sampleIndices = self.sampleIndices.get(fileRelativePath, list())
+            # the indices come from counting the same mutants in the first pass.
+            assert all(index < len(mutants) for index in sampleIndices)
+        elif self.options.sampleSize != "***dummy***":
+            sampleIndices = sorted(Random(self.getSeed(fileRelativePath)).sample(
+                range(len(mutants)), getSampleSize(self.options.sampleSize, len(mutants))))
+        else:
+            return mutants
 
-    for mutantType in list(mutantTypeDatabase.keys()):
-        if mutantTypeDatabase[mutantType] > 0:
-            print("-->", mutantType + ":", mutantTypeDatabase[mutantType])
+        return [mutants[index] for index in sampleIndices]
+
+    def getSeed(self, fileRelativePath: str):
+        """
+        Makes the seed for the random choices made for a file. It depends on the file as well, so that files with the
+        same number of mutants are not all shuffled alike, but not on the order in which the files are processed.
+
+        :param fileRelativePath: path of the source file, relative to the source directory
+        :type fileRelativePath: str
+        :return: the seed, or None if no seed was given
+        :rtype: str
+        """
+        if self.options.seed is None:
+            return None
+
+        return str(self.options.seed) + ":" + fileRelativePath.replace(os.sep, "/")
+
+    def finalize(self):
+        """
+        Stores what the parser learned for the next run. This happens in the process that did the work.
+        """
+        if self.javaParse is not None and self.javaParse.parseCache is not None:
+            self.javaParse.parseCache.storeRecognizers()
+
+
+def runMutationWorkers(mutationWorker, fileList: list, jobs: int):
+    """
+    Runs a mutation worker on each source file. With more than one job, the files are processed in a pool of worker
+    processes, largest first so that a big file does not hold up the end of the run, but the results are still
+    returned in the original order.
+
+    :param mutationWorker: the worker
+    :type mutationWorker: MutationWorker
+    :param fileList: the source files
+    :type fileList: list
+    :param jobs: the number of worker processes
+    :type jobs: int
+    :return: generator of the results
+    """
+    if jobs <= 1 or len(fileList) <= 1:
+        for result in map(mutationWorker, fileList):
+            yield result
+        return
+
+    workerPool = multiprocessing.Pool(processes=jobs, initializer=initializeMutationWorker, initargs=(mutationWorker,))
+    try:
+        largestFirst = sorted(fileList, key=lambda srcFile: os.path.getsize(srcFile), reverse=True)
+        for result in inOriginalOrder(workerPool.imap_unordered(runMutationWorker, largestFirst), fileList):
+            yield result
+    finally:
+        workerPool.close()
+        workerPool.join()
+
+
+def getSampleSize(sampleDirective: str, mutantCount: int) -> int:
+    """
+    Finds how many of a number of mutants are sampled.
+
+    :param sampleDirective: a number of mutants, or a percentage of them, such as 10%
+    :type sampleDirective: str
+    :param mutantCount: the number of mutants to sample from
+    :type mutantCount: int
+    :return: the size of the sample
+    :rtype: int
+    """
+    if sampleDirective.endswith("%"):
+        percentage = float(sampleDirective[:-1])
+        if not 0 <= percentage <= 100:
+            raise ValueError("Sample percentage must be between 0 and 100.")
+        # rounded up, so that every file with mutants keeps at least one in a per-file sample.
+        return min(int(math.ceil(mutantCount * percentage / 100)), mutantCount)
+
+    sampleCount = int(sampleDirective)
+    if sampleCount < 0:
+        raise ValueError("Sample size cannot be negative.")
+    return min(sampleCount, mutantCount)
+
+
+def getProjectSampleIndices(mutantCounts: list, sampleDirective: str, seed) -> dict:
+    """
+    Samples from the mutants of all files together, so that each mutant of the project is equally likely to be
+    chosen.
+
+    :param mutantCounts: the path of each source file, relative to the source directory, and its number of mutants
+    :type mutantCounts: list
+    :param sampleDirective: a number of mutants, or a percentage of them, such as 10%
+    :type sampleDirective: str
+    :param seed: seed of the sample, or None
+    :return: the positions of the sampled mutants of each file, in order
+    :rtype: dict
+    """
+    totalMutantCount = sum(mutantCount for fileRelativePath, mutantCount in mutantCounts)
+    sampledPositions = sorted(Random(seed).sample(range(totalMutantCount),
+                                                  getSampleSize(sampleDirective, totalMutantCount)))
+    sampleIndices = dict()
+    firstPosition = 0
+    sampledPosition = 0
+
+    for fileRelativePath, mutantCount in mutantCounts:
+        sampleIndices[fileRelativePath] = list()
+        while sampledPosition < len(sampledPositions) and \
+                sampledPositions[sampledPosition] < firstPosition + mutantCount:
+            sampleIndices[fileRelativePath].append(sampledPositions[sampledPosition] - firstPosition)
+            sampledPosition += 1
+        firstPosition += mutantCount
+
+    return sampleIndices
+
+
+def inOriginalOrder(results, fileList: list):
+    """
+    Puts the results of mutation workers, which may arrive in any order, back in the order of the file list.
+
+    :param results: results of MutationWorker calls
+    :type results:
+    :param fileList: the source files, in the desired order
+    :type fileList: list
+    :return: generator of the results
+    """
+    filePositions = dict([(srcFile, position) for position, srcFile in enumerate(fileList)])
+    pendingResults = dict()
+    nextPosition = 0
+
+    for result in results:
+        pendingResults[filePositions[result["sourceFile"]]] = result
+
+        while nextPosition in pendingResults:
+            yield pendingResults.pop(nextPosition)
+            nextPosition += 1
+
+
+def withReusedResults(results, reusedResults: dict, fileList: list):
+    """
+    Puts the results that were kept from a previous run back in between the results of mutation workers.
+
+    :param results: results of MutationWorker calls, in the order of the file list
+    :type results:
+    :param reusedResults: the kept results, by source file
+    :type reusedResults: dict
+    :param fileList: the source files, in the desired order
+    :type fileList: list
+    :return: generator of the results
+    """
+    results = iter(results)
+
+    for srcFile in fileList:
+        if srcFile in reusedResults:
+            yield reusedResults[srcFile]
+        else:
+            yield next(results)
+
+
+def removeMutants(targetDirectory: str, fileRelativePath: str, mutationDatabase):
+    """
+    Removes the mutants of a source file from the results of a previous run.
+
+    :param targetDirectory: the directory the mutants are written to
+    :type targetDirectory: str
+    :param fileRelativePath: path of the source file, relative to the source directory
+    :type fileRelativePath: str
+    :param mutationDatabase: the mutation database
+    :type mutationDatabase: shelve.Shelf
+    """
+    shutil.rmtree(os.path.join(targetDirectory, fileRelativePath), ignore_errors=True)
+
+    if fileRelativePath in mutationDatabase:
+        del mutationDatabase[fileRelativePath]
+
+
+def writeToArchive(resultsArchive: ResultsArchive, javaIO: JavaIO, result: dict):
+    """
+    Writes the original file, the mutants and the density and complexity reports of a source file to the archive,
+    where they would otherwise be in the results directory.
+
+    :param resultsArchive: the archive
+    :type resultsArchive: ResultsArchive
+    :param javaIO: the JavaIO object of the mutation phase
+    :type javaIO: JavaIO
+    :param result: the result of MutationWorker
+    :type result: dict
+    """
+    targetDir = javaIO.getTargetDirectory(result["sourceFile"])
+    originalCode = javaIO.getFileContent(result["sourceFile"])
+
+    resultsArchive.addFile(os.path.join(targetDir, "original.java"), result["sourceFile"])
+
+    for targetFile, patch in zip(result["targetList"], result["patches"]):
+        with resultsArchive.openText(os.path.join(javaIO.targetDirectory, targetFile)) as mutantFile:
+            javaIO.writePatchedCode(mutantFile, patch, originalCode)
+
+    for artifactName, artifactContent in result["fileArtifacts"].items():
+        resultsArchive.writeText(os.path.join(targetDir, artifactName), artifactContent)
+
+
+def mergeBuildParts(archivePath: str, buildPartsPath: str):
+    """
+    Merges the part archives the build phase wrote for each source file into the archive, and removes them.
+
+    :param archivePath: path of the archive
+    :type archivePath: str
+    :param buildPartsPath: the directory of the part archives
+    :type buildPartsPath: str
+    """
+    if os.path.isdir(buildPartsPath):
+        # the parts that were not finished are left out.
+        partPaths = sorted([os.path.join(buildPartsPath, fileName) for fileName in os.listdir(buildPartsPath)
+                            if fileName.endswith(".zip")],
+                           key=lambda partPath: int(os.path.basename(partPath)[:-len(".zip")]))
+        if len(partPaths) > 0:
+            ResultsArchive.mergeParts(archivePath, partPaths)
+
+    shutil.rmtree(buildPartsPath, ignore_errors=True)
+
+
+class MutationManifest(object):
+    """
+    Keeps, for each source file, the hash of its content and the result of mutating it, so that an incremental run
+    only has to mutate the files that changed since the previous run.
+    """
+
+    def __init__(self, manifestPath: str, targetDirectory: str, settingsTag: str):
+        """
+
+        :param manifestPath: path of the manifest database
+        :type manifestPath: str
+        :param targetDirectory: the directory the mutants are written to
+        :type targetDirectory: str
+        :param settingsTag: the settings of the mutation phase; results recorded with other settings are not reused
+        :type settingsTag: str
+        """
+        self.manifest = shelve.open(manifestPath, "c")
+        self.targetDirectory = targetDirectory
+        self.settingsTag = settingsTag
+
+    @staticmethod
+    def getSourceHash(srcFile: str) -> str:
+        """
+        Hashes the content of a source file.
+
+        :param srcFile: path to the source file
+        :type srcFile: str
+        :return: hex digest of the content
+        :rtype: str
+        """
+        with open(srcFile, "rb") as sourceHandle:
+            return hashlib.sha1(sourceHandle.read()).hexdigest()
+
+    @staticmethod
+    def remove(manifestPath: str):
+        """
+        Removes a manifest database, along with the extra files some database backends create.
+
+        :param manifestPath: path of the manifest database
+        :type manifestPath: str
+        """
+        manifestDirectory, manifestName = os.path.split(manifestPath)
+        if not os.path.isdir(manifestDirectory):
+            return
+
+        for fileName in os.listdir(manifestDirectory):
+            if fileName == manifestName or fileName.startswith(manifestName + "."):
+                os.remove(os.path.join(manifestDirectory, fileName))
+
+    def getFileRelativePaths(self) -> list:
+        """
+
+        :return: the source files recorded in the manifest
+        :rtype: list
+        """
+        return list(self.manifest.keys())
+
+    def getResult(self, fileRelativePath: str, sourceHash: str):
+        """
+        Returns the recorded result for a source file, if the file has not changed, it was mutated with the same
+        settings, and all of its mutants still exist.
+
+        :param fileRelativePath: path of the source file, relative to the source directory
+        :type fileRelativePath: str
+        :param sourceHash: hash of the current content of the file
+        :type sourceHash: str
+        :return: the result of MutationWorker, or None
+        :rtype: dict
+        """
+        entry = self.manifest.get(fileRelativePath, None)
+
+        if entry is None or entry["sourceHash"] != sourceHash or entry["settingsTag"] != self.settingsTag:
+            return None
+
+        result = entry["result"]
+        # mutants kept as patches are not on disk, only their original.java is.
+        if "patches" in result:
+            if len(result["targetList"]) > 0 and not os.path.isfile(
+                    os.path.join(self.targetDirectory, result["fileRelativePath"], "original.java")):
+                return None
+            return result
+
+        for targetFile in result["targetList"]:
+            if not os.path.isfile(os.path.join(self.targetDirectory, targetFile)):
+                return None
+
+        return result
+
+    def putResult(self, fileRelativePath: str, sourceHash: str, result: dict):
+        """
+
+        :param fileRelativePath: path of the source file, relative to the source directory
+        :type fileRelativePath: str
+        :param sourceHash: hash of the content the result was made from
+        :type sourceHash: str
+        :param result: the result of MutationWorker
+        :type result: dict
+        """
+        self.manifest[fileRelativePath] = {"sourceHash": sourceHash, "settingsTag": self.settingsTag,
+                                           "result": result}
+
+    def removeResult(self, fileRelativePath: str):
+        """
+
+        :param fileRelativePath: path of the source file, relative to the source directory
+        :type fileRelativePath: str
+        """
+        del self.manifest[fileRelativePath]
+
+    def close(self):
+        self.manifest.close()
+
+
+# the mutation worker of the current worker process
+processMutationWorker = None
+
+
+def initializeMutationWorker(mutationWorker: MutationWorker):
+    """
+    Initializer for the processes in the worker pool.
+
+    :param mutationWorker:
+    :type mutationWorker: MutationWorker
+    """
+    global processMutationWorker
+    processMutationWorker = mutationWorker
+    processMutationWorker.initialize()
+    Finalize(processMutationWorker, processMutationWorker.finalize, exitpriority=10)
+
+
+def runMutationWorker(srcFile: str) -> dict:
+    """
+
+    :param srcFile:
+    :type srcFile: str
+    :return:
+    :rtype: dict
+    """
+    return processMutationWorker(srcFile)
 
 
 def buildPhase(options):
@@ -271,11 +1112,29 @@ def buildPhase(options):
         separateTestSuite = False
     # try to open the database. if it can't be opened, it means that it does not exist or it is corrupt.
     try:
-        mutationDatabase = shelve.open(databasePath, "r")
+        mutationDatabase = openMutationDatabase(databasePath, "r")
     except:
         print(
             "Cannot open mutation database. It may be corrupted or unavailable. Delete all generated files and run the mutant generation phase again.")
         sys.exit(2)
+    # the mutants kept as patches are written as they are needed.
+    javaIO = JavaIO(options.isVerboseActive)
+    try:
+        patchDatabase = shelve.open(databasePath + "-patches", "r")
+    except Exception:
+        patchDatabase = None
+    # in archive mode, the mutants are read from the archive, and the outputs and reports are added to it.
+    # the archive is only read, and the outputs and reports of each file go to a part archive of their own, which
+    # are merged into the archive at the end. so an interrupted build phase leaves a valid archive, and the parts it
+    # finished are merged in when the build phase is run again.
+    archivePath = os.path.join(mutantsPath, "mutationarchive.zip")
+    buildPartsPath = os.path.join(mutantsPath, "mutationarchive-build")
+    resultsArchive = None
+    if os.path.isfile(archivePath):
+        mergeBuildParts(archivePath, buildPartsPath)
+        os.makedirs(buildPartsPath)
+        resultsArchive = ResultsArchive(archivePath, mutantsPath, "r")
+        reportGenerator.resultsArchive = resultsArchive
     databaseKeys = list(mutationDatabase.keys())
     assert isinstance(databaseKeys, list)
     # let's sort the mutants by name to create the possibility of following the flow of the process by user.
@@ -343,8 +1202,18 @@ def buildPhase(options):
         successList = list()
         failureList = list()
 
+        buildArchive = None
+        if resultsArchive is not None:
+            buildArchive = ResultsArchive(os.path.join(buildPartsPath, str(fileCounter) + ".zip.tmp"), mutantsPath,
+                                          "w")
+
+        patches = None
+        if patchDatabase is not None and key in patchDatabase:
+            patches = patchDatabase[key]
+            originalCode = javaIO.getFileContent(os.path.join(mutantsPath, key, "original.java"))
+
         # for each mutant, replace the original file, run the build, store the results
-        for replacementFileRel in mutationDatabase[key]:
+        for mutantIndex, replacementFileRel in enumerate(mutationDatabase[key]):
             replacementFile = os.path.abspath(os.path.join(mutantsPath, replacementFileRel))
             mutantCounter += 1
             totalMutantCounter += 1
@@ -352,9 +1221,15 @@ def buildPhase(options):
             # let's make sure that runOutput is empty, and not None to begin with.
             runOutput = bytes()
             runOutputTest = bytes()
+            mutantStartTime = time.time()
 
             # replace the original file with the mutant
-            shutil.copyfile(replacementFile, os.path.join(options.sourcePath, key))
+            if patches is not None:
+                javaIO.materializeMutant(os.path.join(options.sourcePath, key), patches[mutantIndex], originalCode)
+            elif resultsArchive is not None:
+                resultsArchive.extractFile(replacementFile, os.path.join(options.sourcePath, key))
+            else:
+                shutil.copyfile(replacementFile, os.path.join(options.sourcePath, key))
 
             commandString = options.buildCommand.split(',')
             if separateTestSuite:
@@ -394,6 +1269,11 @@ def buildPhase(options):
                 # if we are here, it means no exceptions happened, so lets add this to our success list.
                 runOutput = runOutput.decode("utf-8") + '\n' + runOutputTest.decode("utf-8")
                 successList.append(os.path.basename(replacementFile))
+                mutantStatus = "survived"
+
+                # the report links to the mutants that survived, so they are written next to their build output.
+                if patches is not None:
+                    javaIO.materializeMutant(replacementFile, patches[mutantIndex], originalCode)
 
             # putting two exceptions in one except clause, specially when one of them is not defined on some
             # platforms does not look like a good idea; even though both of them do exactly the same thing.
@@ -401,6 +1281,7 @@ def buildPhase(options):
                 runOutput = exception.output.decode("utf-8")
                 # oops, error. let's add this to failure list.
                 failureList.append(os.path.basename(replacementFile))
+                mutantStatus = "killed"
 
             # except subprocess.TimeoutExpired as exception:
             #     runOutput = exception.output
@@ -416,8 +1297,15 @@ def buildPhase(options):
                 len(successList)) + " - killed: " + str(len(failureList)) + "         \r", end="\r", flush=True)
 
             # writing the build output to disk.
-            with open(targetTextOutputFile, 'w') as contentFile:
-                contentFile.write(str(runOutput))
+            if buildArchive is not None:
+                buildArchive.writeText(targetTextOutputFile, str(runOutput))
+            else:
+                with open(targetTextOutputFile, 'w') as contentFile:
+                    contentFile.write(str(runOutput))
+
+            if isinstance(mutationDatabase, MutationDatabase):
+                mutationDatabase.putResult(replacementFileRel, mutantStatus, time.time() - mutantStartTime,
+                                           os.path.relpath(targetTextOutputFile, mutantsPath))
 
             # if there's a cleanup option, execute it. the results will be ignored because we don't want our process
             #  to be interrupted if there's nothing to clean up.
@@ -439,16 +1327,33 @@ def buildPhase(options):
         htmlReportData.append([key, len(successList), mutantCount])
 
         # we are done with the file. let's return it to the original state.
-        shutil.copyfile(os.path.join(os.path.dirname(replacementFile), "original.java"),
-                        os.path.join(options.sourcePath, key))
+        if resultsArchive is not None:
+            resultsArchive.extractFile(os.path.join(os.path.dirname(replacementFile), "original.java"),
+                                       os.path.join(options.sourcePath, key))
+        else:
+            shutil.copyfile(os.path.join(os.path.dirname(replacementFile), "original.java"),
+                            os.path.join(options.sourcePath, key))
 
         # generate an HTML report for the file.
         targetHTMLOutputFile = os.path.join(os.path.dirname(replacementFile), "index.html")
-        with open(targetHTMLOutputFile, 'w') as contentFile:
-            contentFile.write(
-                reportGenerator.generateHTMLReportPerFile(key, targetHTMLOutputFile, successList, failureList))
+        if buildArchive is not None:
+            buildArchive.writeText(targetHTMLOutputFile, reportGenerator.generateHTMLReportPerFile(
+                key, targetHTMLOutputFile, successList, failureList))
+            buildArchive.close()
+            os.replace(buildArchive.archivePath, os.path.join(buildPartsPath, str(fileCounter) + ".zip"))
+        else:
+            with open(targetHTMLOutputFile, 'w') as contentFile:
+                contentFile.write(
+                    reportGenerator.generateHTMLReportPerFile(key, targetHTMLOutputFile, successList, failureList))
 
         print("\n\n")
+    if patchDatabase is not None:
+        patchDatabase.close()
+    if resultsArchive is not None:
+        resultsArchive.close()
+        mergeBuildParts(archivePath, buildPartsPath)
+    mutationDatabase.close()
+
     # write final text report.
     with open(os.path.abspath(os.path.join(mutantsPath, "report.txt")),
               'w') as textReportFile:
@@ -499,6 +1404,22 @@ def parseCmdArgs(optionParser: OptionParser, mockArgs: list = None) -> object:
                             help="Output the license and exit.")
     optionParser.add_option("--higher-order", type="int", action="store", dest="higherOrder", default=1,
                             help="Define order of mutation. Use -1 to dynamically adjust per class.")
+    optionParser.add_option("--higher-order-strategy", type="choice", action="store", dest="higherOrderStrategy",
+                            choices=["non-overlapping", "disjoint-method", "same-method", "different-operator"],
+                            default="non-overlapping",
+                            help="Which mutants are combined into a higher-order mutant: non-overlapping (any), "
+                                 "disjoint-method (mutants in different methods), same-method (mutants in the same "
+                                 "method), or different-operator (mutants of different operators). The mutations of a "
+                                 "higher-order mutant never overlap.")
+    optionParser.add_option("--seed", type="int", action="store", dest="seed", default=None,
+                            help="Seed for the random choices of the mutation phase, to make them reproducible.")
+    optionParser.add_option("--sample", action="store", dest="sampleSize", default="***dummy***",
+                            help="Only write a random sample of the mutants, either a number of them or a percentage, "
+                                 "such as 10%. The other mutants are never written. Use --seed to make it reproducible.")
+    optionParser.add_option("--sample-scope", type="choice", action="store", dest="sampleScope",
+                            choices=["file", "project"], default="file",
+                            help="Take the sample from each file separately (file), or from all mutants of the "
+                                 "project together (project), which takes an extra pass to count them.")
     optionParser.add_option("--null-check", action="store_true", dest="isNullCheck", default=False,
                             help="Use null check mutation operators.")
     optionParser.add_option("--method-level", action="store_true", dest="isMethodLevel", default=False,
@@ -509,6 +1430,43 @@ def parseCmdArgs(optionParser: OptionParser, mockArgs: list = None) -> object:
                             help="Analyze only included packages or files defined in this file (one package name or path to file per line).")
     optionParser.add_option("--blacklist", action="store", dest="blacklist", default="***dummy***",
                             help="Analyze everything except packages or files defined in this file (one package name or path to file per line).")
+    optionParser.add_option("--parse-cache", action="store", dest="parseCachePath", default="***dummy***",
+                            help="Directory to keep parsed source files in between runs. Unchanged files are not parsed again.")
+    optionParser.add_option("-j", "--jobs", type="int", action="store", dest="jobs", default=1,
+                            help="Number of source files to mutate in parallel. Use 0 to use all processors.")
+    optionParser.add_option("--two-stage-parsing", action="store_true", dest="isTwoStageParsing", default=False,
+                            help="Parse with SLL prediction first, and fall back to full LL prediction only if it fails.")
+    optionParser.add_option("--prescan", action="store_true", dest="isPrescanActive", default=False,
+                            help="Run only the lexer first, and skip parsing files that contain none of the tokens the "
+                                 "enabled mutation operators look for.")
+    optionParser.add_option("--incremental", action="store_true", dest="isIncrementalActive", default=False,
+                            help="Only mutate the source files that were added or changed since the previous "
+                                 "incremental run, and remove the mutants of deleted files.")
+    optionParser.add_option("--deduplicate", action="store_true", dest="isDeduplicationActive", default=False,
+                            help="Drop the mutants whose source code is the same as that of another mutant of the file, "
+                                 "apart from whitespace, or that are equivalent to the original code by a few syntactic "
+                                 "rules. The dropped mutants are listed in mutationdatabase-duplicates.")
+    optionParser.add_option("--profile-operators", action="store_true", dest="isOperatorProfileActive", default=False,
+                            help="Measure the nodes, mutants and time of each mutation operator in each file, and "
+                                 "write them to OperatorProfileReport.csv.")
+    optionParser.add_option("--database-format", action="store", type="choice", dest="databaseFormat",
+                            default="shelve", choices=["shelve", "sqlite"],
+                            help="Format of the mutation database: shelve, or sqlite to keep the mutations and the "
+                                 "build results of each mutant in a database that can be queried. Default is "
+                                 "shelve.")
+    optionParser.add_option("--archive", action="store_true", dest="isArchiveActive", default=False,
+                            help="Write the mutants, the build outputs and the reports of each file to a single "
+                                 "archive, mutationarchive.zip, instead of a directory per file.")
+    optionParser.add_option("--patch-storage", action="store_true", dest="isPatchStorageActive", default=False,
+                            help="Keep each mutant as a patch to the original file instead of a full copy. The mutant "
+                                 "files are only written in the build phase.")
+    optionParser.add_option("--count-only", action="store_true", dest="isCountOnlyActive", default=False,
+                            help="Only count the mutants per file, per operator and per method, and write the counts to "
+                                 "MutantCountReport.csv instead of writing the mutants. Requires -m. With -b, the initial "
+                                 "build is timed to estimate the duration of the build phase, which is not run.")
+    optionParser.add_option("--build-duration", type="float", action="store", dest="buildDuration", default=0,
+                            help="Duration of a single build in seconds, used by --count-only to estimate the duration "
+                                 "of the build phase instead of timing the initial build.")
 
     if mockArgs is None:
         (options, args) = optionParser.parse_args()
@@ -530,6 +1488,22 @@ def parseCmdArgs(optionParser: OptionParser, mockArgs: list = None) -> object:
             filterType = "blacklist"
     if filterList is not None:
         filterList = [_f for _f in filterList if _f]
+    if options.sampleSize != "***dummy***":
+        try:
+            getSampleSize(options.sampleSize, 0)
+        except ValueError:
+            print("The sample must be a number of mutants, or a percentage such as 10%.")
+            sys.exit(4)
+        if options.sampleScope == "project" and options.isIncrementalActive:
+            print("A project-wide sample cannot be kept up to date incrementally. Use a per-file sample instead.")
+            sys.exit(4)
+    if options.isCountOnlyActive and not options.isMutationActive:
+        print("The mutants are counted in the mutation phase. Use --count-only together with -m.")
+        sys.exit(4)
+    if options.isArchiveActive and (options.isIncrementalActive or options.isPatchStorageActive):
+        print("The archive is written anew in each run, and holds every mutant in full. It cannot be used with "
+              "--incremental or --patch-storage.")
+        sys.exit(4)
     if options.isLicenseActive:
         License.outputLicense()
         sys.exit(0)
@@ -584,6 +1558,8 @@ def timeoutAlternative(commandString, workingDirectory, timeout, inputData=None)
         # we just killed the process. let everyone know.
         killCheck.set()
 
+    from distutils.spawn import find_executable
+
     # timeout must be int, otherwise problems arise.
     assert isinstance(timeout, int)
 
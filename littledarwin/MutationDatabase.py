@@ -0,0 +1,287 @@
+import os
+import shelve
+import sqlite3
+from typing import Dict, List
+
+
+class MutationDatabase(object):
+    """
+    Keeps the mutants of each source file and the results of building them in an SQLite database. Unlike a shelve
+    database, the file does not depend on the dbm backend of the platform, and it can be queried by operator, method
+    or result. Reading and writing the mutant list of a file works the same as with the shelve mutation database.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS files (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS mutants (
+            id INTEGER PRIMARY KEY,
+            file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+            number INTEGER NOT NULL,
+            path TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS mutations (
+            id INTEGER PRIMARY KEY,
+            mutant_id INTEGER NOT NULL REFERENCES mutants (id) ON DELETE CASCADE,
+            operator TEXT NOT NULL,
+            line INTEGER NOT NULL,
+            node INTEGER,
+            method TEXT,
+            start_pos INTEGER NOT NULL,
+            end_pos INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS results (
+            mutant_id INTEGER PRIMARY KEY REFERENCES mutants (id) ON DELETE CASCADE,
+            status TEXT NOT NULL,
+            duration REAL,
+            output_path TEXT
+        );
+        CREATE INDEX IF NOT EXISTS mutants_file ON mutants (file_id, number);
+        CREATE INDEX IF NOT EXISTS mutations_mutant ON mutations (mutant_id);
+        CREATE INDEX IF NOT EXISTS mutations_operator ON mutations (operator);
+        CREATE INDEX IF NOT EXISTS mutations_method ON mutations (method);
+        CREATE INDEX IF NOT EXISTS results_status ON results (status);
+    """
+
+    def __init__(self, databasePath: str, flag: str = "c"):
+        """
+
+        :param databasePath: path of the database file
+        :type databasePath: str
+        :param flag: "r" to only read an existing database, "c" to create it if needed, "n" to start a new one
+        :type flag: str
+        """
+        assert flag in ["r", "c", "n"]
+
+        if flag == "r" and not os.path.isfile(databasePath):
+            raise IOError("Mutation database does not exist: " + databasePath)
+        if flag == "n" and os.path.isfile(databasePath):
+            os.remove(databasePath)
+
+        self.databasePath = databasePath
+        self.connection = sqlite3.connect(databasePath)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        if flag != "r":
+            self.connection.executescript(self.schema)
+
+    def getFileID(self, fileRelativePath: str, create: bool = False):
+        """
+
+        :param fileRelativePath: path of the source file, relative to the source directory
+        :type fileRelativePath: str
+        :param create: whether to add the file if it is not in the database
+        :type create: bool
+        :return: the id of the file, or None
+        :rtype: int
+        """
+        row = self.connection.execute("SELECT id FROM files WHERE path = ?", (fileRelativePath,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            return None
+
+        return self.connection.execute("INSERT INTO files (path) VALUES (?)", (fileRelativePath,)).lastrowid
+
+    def putMutants(self, fileRelativePath: str, targetList: List[str], mutationRecords: List[List[Dict]] = None):
+        """
+        Replaces the mutants of a source file.
+
+        :param fileRelativePath: path of the source file, relative to the source directory
+        :type fileRelativePath: str
+        :param targetList: paths of the mutant files, relative to the target directory, in order
+        :type targetList: List[str]
+        :param mutationRecords: for each mutant, the mutations it is made of, as made by Mutant.getMutationRecords
+        :type mutationRecords: List[List[Dict]]
+        """
+        with self.connection:
+            fileID = self.getFileID(fileRelativePath, create=True)
+            self.connection.execute("DELETE FROM mutants WHERE file_id = ?", (fileID,))
+
+            for number, targetFile in enumerate(targetList, 1):
+                mutantID = self.connection.execute("INSERT INTO mutants (file_id, number, path) VALUES (?, ?, ?)",
+                                                   (fileID, number, targetFile)).lastrowid
+                if mutationRecords is None:
+                    continue
+                self.connection.executemany(
+                    "INSERT INTO mutations (mutant_id, operator, line, node, method, start_pos, end_pos) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(mutantID, record["operator"], record["line"], record["node"], record["method"],
+                      record["startPos"], record["endPos"]) for record in mutationRecords[number - 1]])
+
+    def getMutants(self, fileRelativePath: str) -> List[str]:
+        """
+
+        :param fileRelativePath: path of the source file, relative to the source directory
+        :type fileRelativePath: str
+        :return: paths of the mutant files of the source file, in order
+        :rtype: List[str]
+        """
+        return [row[0] for row in self.connection.execute(
+            "SELECT mutants.path FROM mutants JOIN files ON files.id = mutants.file_id WHERE files.path = ? "
+            "ORDER BY mutants.number", (fileRelativePath,))]
+
+    def removeFile(self, fileRelativePath: str):
+        """
+        Removes a source file, along with its mutants and their results.
+
+        :param fileRelativePath: path of the source file, relative to the source directory
+        :type fileRelativePath: str
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM files WHERE path = ?", (fileRelativePath,))
+
+    def putResult(self, targetFile: str, status: str, duration: float = None, outputPath: str = None):
+        """
+        Records the result of building a mutant.
+
+        :param targetFile: path of the mutant file, relative to the target directory
+        :type targetFile: str
+        :param status: "survived" or "killed"
+        :type status: str
+        :param duration: seconds the build took
+        :type duration: float
+        :param outputPath: path of the build output, relative to the target directory
+        :type outputPath: str
+        """
+        with self.connection:
+            row = self.connection.execute("SELECT id FROM mutants WHERE path = ?", (targetFile,)).fetchone()
+            if row is None:
+                raise KeyError(targetFile)
+            self.connection.execute("INSERT OR REPLACE INTO results (mutant_id, status, duration, output_path) "
+                                    "VALUES (?, ?, ?, ?)", (row[0], status, duration, outputPath))
+
+    def queryMutants(self, fileRelativePath: str = None, operator: str = None, method: str = None,
+                     status: str = None) -> List[Dict]:
+        """
+        Finds the mutants that match all of the given conditions.
+
+        :param fileRelativePath: path of the source file, relative to the source directory
+        :type fileRelativePath: str
+        :param operator: the type of one of the mutations of the mutant
+        :type operator: str
+        :param method: the method one of the mutations of the mutant is in
+        :type method: str
+        :param status: the result of building the mutant
+        :type status: str
+        :return: the file, path, status, build duration and build output path of each mutant
+        :rtype: List[Dict]
+        """
+        conditions = list()
+        parameters = list()
+
+        if fileRelativePath is not None:
+            conditions.append("files.path = ?")
+            parameters.append(fileRelativePath)
+        if operator is not None:
+            conditions.append("mutants.id IN (SELECT mutant_id FROM mutations WHERE operator = ?)")
+            parameters.append(operator)
+        if method is not None:
+            conditions.append("mutants.id IN (SELECT mutant_id FROM mutations WHERE method = ?)")
+            parameters.append(method)
+        if status is not None:
+            conditions.append("results.status = ?")
+            parameters.append(status)
+
+        query = "SELECT files.path, mutants.path, results.status, results.duration, results.output_path " \
+                "FROM mutants JOIN files ON files.id = mutants.file_id " \
+                "LEFT JOIN results ON results.mutant_id = mutants.id"
+        if len(conditions) > 0:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY files.path, mutants.number"
+
+        return [{"file": row[0], "path": row[1], "status": row[2], "duration": row[3], "outputPath": row[4]}
+                for row in self.connection.execute(query, parameters)]
+
+    def importShelve(self, mutationDatabasePath: str, resultsDatabasePath: str = None):
+        """
+        Copies a shelve mutation database, and optionally the shelve results database of its build phase, into this
+        database. The shelve databases only know the mutant files, so the mutations of the mutants are not recorded.
+
+        :param mutationDatabasePath: path of the shelve mutation database
+        :type mutationDatabasePath: str
+        :param resultsDatabasePath: path of the shelve results database
+        :type resultsDatabasePath: str
+        """
+        mutationDatabase = shelve.open(mutationDatabasePath, "r")
+        try:
+            for fileRelativePath, targetList in mutationDatabase.items():
+                self.putMutants(fileRelativePath, targetList)
+        finally:
+            mutationDatabase.close()
+
+        if resultsDatabasePath is None:
+            return
+
+        # the results database only keeps the file names of the survived and killed mutants of each source file.
+        resultsDatabase = shelve.open(resultsDatabasePath, "r")
+        try:
+            for fileRelativePath, (survived, killed) in resultsDatabase.items():
+                mutantPaths = dict((os.path.basename(targetFile), targetFile)
+                                   for targetFile in self.getMutants(fileRelativePath))
+                for status, mutantNames in [("survived", survived), ("killed", killed)]:
+                    for mutantName in mutantNames:
+                        if mutantName in mutantPaths:
+                            self.putResult(mutantPaths[mutantName], status, None,
+                                           os.path.splitext(mutantPaths[mutantName])[0] + ".txt")
+        finally:
+            resultsDatabase.close()
+
+    def keys(self) -> List[str]:
+        return [row[0] for row in self.connection.execute(
+            "SELECT path FROM files WHERE id IN (SELECT file_id FROM mutants) ORDER BY path")]
+
+    def items(self):
+        return [(fileRelativePath, self.getMutants(fileRelativePath)) for fileRelativePath in self.keys()]
+
+    def get(self, fileRelativePath: str, default=None):
+        return self[fileRelativePath] if fileRelativePath in self else default
+
+    def close(self):
+        self.connection.close()
+
+    def __getitem__(self, fileRelativePath: str) -> List[str]:
+        targetList = self.getMutants(fileRelativePath)
+        if len(targetList) == 0:
+            raise KeyError(fileRelativePath)
+        return targetList
+
+    def __setitem__(self, fileRelativePath: str, targetList: List[str]):
+        self.putMutants(fileRelativePath, targetList)
+
+    def __delitem__(self, fileRelativePath: str):
+        if fileRelativePath not in self:
+            raise KeyError(fileRelativePath)
+        self.removeFile(fileRelativePath)
+
+    def __contains__(self, fileRelativePath: str) -> bool:
+        return self.connection.execute(
+            "SELECT 1 FROM mutants JOIN files ON files.id = mutants.file_id WHERE files.path = ? LIMIT 1",
+            (fileRelativePath,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(DISTINCT file_id) FROM mutants").fetchone()[0]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+
+def openMutationDatabase(databasePath: str, flag: str = "r"):
+    """
+    Opens the mutation database at a path, whichever format it was written in. An SQLite database is kept next to
+    where the shelve database would be, with a ".sqlite" suffix.
+
+    :param databasePath: path of the mutation database, without the suffix
+    :type databasePath: str
+    :param flag: the flag to open the database with
+    :type flag: str
+    :return: the mutation database
+    :rtype: MutationDatabase or shelve.Shelf
+    """
+    if databasePath.endswith(".sqlite"):
+        return MutationDatabase(databasePath, flag)
+    if os.path.isfile(databasePath + ".sqlite"):
+        return MutationDatabase(databasePath + ".sqlite", flag)
+
+    return shelve.open(databasePath, flag)
@@ -9,6 +9,8 @@ class ReportGenerator(object):
     def __init__(self, littleDarwinVersion=None):
         self.database = None
         self.ldVersion = littleDarwinVersion
+        # the archive the mutants are kept in, if they are not in the results directory
+        self.resultsArchive = None
 
     def initiateDatabase(self, databasePath):
         """
@@ -173,11 +175,33 @@ class ReportGenerator(object):
                                len(survived) + len(killed)) * 100)) + "%\"></div><div class=\"coverage_legend\">" + str(
                                len(killed)) + "/" + str(len(killed) + len(survived)) + "</div></div></td></tr>"
 
+        def mutantLink(link, name):
+            """
+            Links to a mutant file, unless the file was never written because the mutant is kept as a patch. In archive
+            mode, the link is relative to where the file is in the archive.
+
+            :param link:
+            :type link:
+            :param name:
+            :type name:
+            :return:
+            :rtype:
+            """
+            if link is not None:
+                linkPath = os.path.join(os.path.dirname(reportPath), link)
+                if self.resultsArchive is not None:
+                    isWritten = self.resultsArchive.contains(linkPath)
+                else:
+                    isWritten = os.path.isfile(linkPath)
+                if not isWritten:
+                    return xstr(name)
+            return "<a href=\"" + xstr(link) + "\">" + xstr(name) + "</a>"
+
         for item in joinedList:
             output.append(
-                "<tr><td><a href=\"" + xstr(item[0]) + "\">" + xstr(item[1]) + "</a></td> <td><a href=\"" + xstr(
-                    item[2]) + "\">" + xstr(item[3]) + "</a></td><td><a href=\"" + xstr(item[4]) + "\">" + xstr(
-                    item[5]) + "</a></td><td><a href=\"" + xstr(item[6]) + "\">" + xstr(item[7]) + "</a></td></tr>")
+                "<tr><td>" + mutantLink(item[0], item[1]) + "</td> <td><a href=\"" + xstr(
+                    item[2]) + "\">" + xstr(item[3]) + "</a></td><td>" + mutantLink(item[4], item[5]) +
+                "</td><td><a href=\"" + xstr(item[6]) + "\">" + xstr(item[7]) + "</a></td></tr>")
 
         reportOutput = list()
         reportOutput.extend([reportBeginning, fileOverallStats, reportMiddle])
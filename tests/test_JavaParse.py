@@ -1,8 +1,11 @@
 import base64
 import bz2
+import io
+import pickle
+import tempfile
 import unittest
 
-from littledarwin.JavaParse import JavaParse
+from littledarwin.JavaParse import JavaParse, ParseCache
 from antlr4.error.Errors import ParseCancellationException
 
 
@@ -1082,6 +1085,15 @@ public class SyntaxError {
         self.assertIn('factorial', methodName)
         self.assertEqual("***not in a method***", self.javaParse.getMethodNameForNode(parsedTree, 3))
 
+    def test_getMethodNameForNodeIndexed(self):
+        for sourceCode in [self.factorialSourceCode, self.methodTypesSourceCode, self.java8SourceCode]:
+            parsedTree = self.javaParse.parse(sourceCode)
+            unindexedParse = JavaParse()  # resolves the names by walking up the tree instead
+
+            for node in self.javaParse.preorderNodes:
+                self.assertEqual(unindexedParse.getMethodNameForNode(parsedTree, node.nodeIndex),
+                                 self.javaParse.getMethodNameForNode(parsedTree, node.nodeIndex))
+
     def test_getCyclomaticComplexity(self):
         parsedTree = self.javaParse.parse(self.factorialSourceCode)
         cyclomaticComplexityDict = self.javaParse.getCyclomaticComplexityAllMethods(parsedTree)
@@ -1131,6 +1143,391 @@ public class SyntaxError {
             self.assertTrue(hasattr(node, 'nodeIndex'))
             nodeStack.extend(getattr(node, 'children', []))
 
+    def flattenTree(self, tree):
+        nodeList = list()
+        nodeStack = [tree]
+        while len(nodeStack) > 0:
+            node = nodeStack.pop()
+            if hasattr(node, 'symbol'):
+                nodeList.append((type(node).__name__, node.nodeIndex, node.symbol.text, node.symbol.start,
+                                 node.symbol.line))
+            else:
+                nodeList.append((type(node).__name__, node.nodeIndex, node.start.start, node.stop.stop,
+                                 node.start.line, node.getText()))
+            nodeStack.extend(getattr(node, 'children', None) or [])
+        return nodeList
+
+    def test_serializeTree(self):
+        tree = self.javaParse.parse(self.java8SourceCode)
+        restoredTree = self.javaParse.deserializeTree(self.javaParse.serializeTree(tree))
+        self.javaParse.numerify(restoredTree)
+
+        self.assertEqual(self.flattenTree(tree), self.flattenTree(restoredTree))
+
+    def test_flatTrees(self):
+        from littledarwin.JavaMutate import JavaMutate
+
+        flatParse = JavaParse(flatTrees=True)
+        for sourceCode in [self.factorialSourceCode, self.methodTypesSourceCode, self.java8SourceCode]:
+            tree = self.javaParse.parse(sourceCode)
+            flatTree = flatParse.parse(sourceCode)
+            self.assertEqual(self.flattenTree(tree), self.flattenTree(flatTree))
+
+            restoredTree = pickle.loads(pickle.dumps(flatParse.flatTree)).getNode(0)
+            self.assertEqual(self.flattenTree(tree), self.flattenTree(restoredTree))
+
+            self.assertEqual(self.javaParse.getCyclomaticComplexityAllMethods(tree),
+                             flatParse.getCyclomaticComplexityAllMethods(flatTree))
+            self.assertEqual(self.javaParse.getLinesOfCodePerMethod(tree), flatParse.getLinesOfCodePerMethod(flatTree))
+
+            mutantList, mutantTypes = JavaMutate(tree, sourceCode, self.javaParse).gatherMutants(["All"])
+            flatMutantList, flatMutantTypes = JavaMutate(flatTree, sourceCode, flatParse).gatherMutants(["All"])
+            self.assertEqual([str(mutant) for mutant in mutantList], [str(mutant) for mutant in flatMutantList])
+            self.assertEqual(mutantTypes, flatMutantTypes)
+
+    def test_iterateMutants(self):
+        from littledarwin.JavaMutate import JavaMutate
+
+        tree = self.javaParse.parse(self.java8SourceCode)
+        javaMutate = JavaMutate(tree, self.java8SourceCode, self.javaParse)
+        mutantList, mutantTypes = javaMutate.gatherMutants(["All"])
+
+        streamingMutate = JavaMutate(tree, self.java8SourceCode, self.javaParse)
+        streamedList = list()
+        for mutant in streamingMutate.iterateMutants(["All"], keepMutants=False):
+            self.assertEqual(mutant.mutationList[0].methodName,
+                             self.javaParse.getMethodNameForNode(tree, mutant.mutationList[0].nodeID))
+            streamedList.append(str(mutant))
+
+        self.assertEqual(streamedList, [str(mutant) for mutant in mutantList])
+        self.assertEqual(streamingMutate.mutationTypeCount, mutantTypes)
+        self.assertEqual(streamingMutate.mutantsPerMethod, javaMutate.mutantsPerMethod)
+        self.assertEqual(streamingMutate.averageDensity, javaMutate.averageDensity)
+        self.assertEqual(streamingMutate.mutants, [])
+
+        # counting gives the same counts without keeping the mutants, and countMutants keeps returning the types.
+        self.assertEqual(JavaMutate(tree, self.java8SourceCode, self.javaParse).countAllMutants(["All"]),
+                         (len(mutantList), mutantTypes))
+        self.assertEqual(JavaMutate(tree, self.java8SourceCode, self.javaParse).countMutants(["All"]), mutantTypes)
+
+        # stopping early does not generate the rest of the mutants.
+        stoppedMutate = JavaMutate(tree, self.java8SourceCode, self.javaParse)
+        mutantIterator = stoppedMutate.iterateMutants(["All"])
+        firstMutants = [str(next(mutantIterator)) for i in range(3)]
+        mutantIterator.close()
+
+        self.assertEqual(firstMutants, streamedList[:3])
+        self.assertEqual(len(stoppedMutate.mutants), 3)
+        self.assertEqual(sum(stoppedMutate.mutationTypeCount.values()), 3)
+        self.assertTrue(all(len(mO.mutants) == 0 for mO in stoppedMutate.mutationOperators))
+
+    def test_higherOrderMutants(self):
+        from littledarwin.JavaMutate import JavaMutate, Mutant, Mutation
+
+        sourceCode = "int a = b + c * d;"
+        plus = Mutation(startPos=10, endPos=10, lineNumber=1, nodeID=1, mutatorType="A", replacementText="-")
+        times = Mutation(startPos=14, endPos=14, lineNumber=1, nodeID=2, mutatorType="A", replacementText="/")
+        product = Mutation(startPos=12, endPos=16, lineNumber=1, nodeID=3, mutatorType="B", replacementText="0")
+        mutants = [Mutant(mutantID, [mutation], sourceCode) for mutantID, mutation in enumerate([plus, times, product])]
+
+        self.assertEqual((None + mutants[1] + mutants[0]).getMutatedCode(), "int a = b - c / d;")
+        self.assertEqual((mutants[0] + mutants[2]).getMutatedCode(), "int a = b - 0;")
+        self.assertRaises(ValueError, mutants[1].__add__, mutants[2])
+        self.assertRaises(ValueError, Mutant(-1, [plus, times, product], sourceCode).getMutatedCode)
+
+        tree = self.javaParse.parse(self.java8SourceCode)
+        mutantList, mutantTypes = JavaMutate(tree, self.java8SourceCode, self.javaParse).gatherMutants(["All"])
+        higherOrderMutants, higherOrderTypes = JavaMutate(tree, self.java8SourceCode,
+                                                          self.javaParse).gatherHigherOrderMutants(3, ["All"])
+
+        self.assertEqual(higherOrderTypes, {"Higher-Order": len(higherOrderMutants)})
+        self.assertEqual(sum([len(mutant.mutationList) for mutant in higherOrderMutants]), len(mutantList))
+        for mutant in higherOrderMutants:
+            self.assertLessEqual(len(mutant.mutationList), 3)
+            self.assertEqual(len(mutant.getSortedMutations()), len(mutant.mutationList))
+
+    def test_higherOrderStrategies(self):
+        from littledarwin.JavaMutate import JavaMutate, Mutation, MutationIntervalIndex
+
+        intervalIndex = MutationIntervalIndex()
+        for startPos, endPos in [(10, 12), (20, 20), (0, 3)]:
+            intervalIndex.add(Mutation(startPos, endPos, 1, 1, "A", "-"))
+        for startPos, endPos, overlaps in [(4, 9, False), (13, 19, False), (21, 30, False), (3, 4, True),
+                                           (5, 10, True), (12, 12, True), (15, 25, True), (0, 40, True)]:
+            self.assertEqual(intervalIndex.overlaps(Mutation(startPos, endPos, 1, 1, "A", "-")), overlaps)
+
+        tree = self.javaParse.parse(self.java7SourceCode)
+        mutantList, mutantTypes = JavaMutate(tree, self.java7SourceCode, self.javaParse).gatherMutants(["All"])
+
+        for strategy in ["non-overlapping", "disjoint-method", "same-method", "different-operator"]:
+            higherOrderMutants, higherOrderTypes = JavaMutate(tree, self.java7SourceCode, self.javaParse). \
+                gatherHigherOrderMutants(4, ["All"], strategy, seed=1)
+            self.assertEqual(sum([len(mutant.mutationList) for mutant in higherOrderMutants]), len(mutantList))
+
+            for mutant in higherOrderMutants:
+                self.assertLessEqual(len(mutant.mutationList), 4)
+                self.assertEqual(len(mutant.getSortedMutations()), len(mutant.mutationList))
+                methodNames = [mutation.methodName for mutation in mutant.mutationList]
+                mutatorTypes = [mutation.mutatorType for mutation in mutant.mutationList]
+                if strategy == "disjoint-method":
+                    self.assertEqual(len(set(methodNames)), len(methodNames))
+                elif strategy == "same-method":
+                    self.assertEqual(len(set(methodNames)), 1)
+                elif strategy == "different-operator":
+                    self.assertEqual(len(set(mutatorTypes)), len(mutatorTypes))
+
+            # the same seed combines the same mutants.
+            seededMutants, seededTypes = JavaMutate(tree, self.java7SourceCode, self.javaParse). \
+                gatherHigherOrderMutants(4, ["All"], strategy, seed=1)
+            self.assertEqual([str(mutant) for mutant in seededMutants], [str(mutant) for mutant in higherOrderMutants])
+
+    def test_deduplicateMutants(self):
+        from littledarwin.JavaMutate import JavaMutate
+
+        sourceCode = "class A {\n" \
+                     "    Object get() {\n        return item;\n    }\n" \
+                     "    int zero(int x) {\n        return -0 + x * 1 + (x << 0) + -0.0;\n    }\n" \
+                     "}\n"
+        tree = self.javaParse.parse(sourceCode)
+        mutantList, mutantTypes = JavaMutate(tree, sourceCode, self.javaParse).gatherMutants(["All"])
+
+        javaMutate = JavaMutate(tree, sourceCode, self.javaParse, deduplicate=True)
+        dedupList, dedupTypes = javaMutate.gatherMutants(["All"])
+        deduplicator = javaMutate.deduplicator
+
+        # removing the method and nullifying the return value give the same code.
+        self.assertEqual(len(deduplicator.duplicateGroups), 1)
+        self.assertEqual([mutant.mutationList[0].mutatorType for mutant in deduplicator.duplicateGroups[0]],
+                         ["NullifyReturnValue", "RemoveMethod"])
+        self.assertIn(deduplicator.duplicateGroups[0][0], dedupList)
+
+        # the sign of an integer zero, multiplying by one and shifting by zero make no difference, but the sign of a
+        # floating point zero does.
+        self.assertEqual(sorted(mutant.mutationList[0].mutatorType for mutant in deduplicator.equivalentMutants),
+                         ["ArithmeticOperatorReplacementBinary", "ArithmeticOperatorReplacementUnary",
+                          "ShiftOperatorReplacement"])
+        self.assertEqual(sum(1 for mutant in dedupList if "+ +0.0;" in mutant.getMutatedCode()), 1)
+
+        self.assertEqual(len(dedupList), len(mutantList) - 4)
+        self.assertEqual(sum(dedupTypes.values()), len(dedupList))
+        self.assertEqual(len(set(mutant.getMutatedCode() for mutant in dedupList)), len(dedupList))
+
+    def test_sourceLines(self):
+        from littledarwin.JavaMutate import Mutation, SourceLines
+
+        sourceCode = "int a;\r\nint b = a\r+ c;\n\x0cint d;\n\nint e;"
+        sourceLines = SourceLines.getSourceLines(sourceCode)
+        self.assertIs(SourceLines.getSourceLines(sourceCode), sourceLines)
+
+        lines = sourceCode.splitlines()
+        for lineNumber in range(1, len(lines) + 1):
+            self.assertEqual(sourceLines.getLine(lineNumber), lines[lineNumber - 1])
+
+        for startPos, endPos, replacementText in [(12, 12, "b"), (14, 20, "0"), (14, 14, "\n\n"), (0, 35, "")]:
+            mutation = Mutation(startPos=startPos, endPos=endPos, lineNumber=1, nodeID=0, mutatorType="Test",
+                                replacementText=replacementText)
+            mutatedLines = mutation.applyMutation(sourceCode).splitlines()
+            for lineNumber in range(1, len(mutatedLines) + 1):
+                self.assertEqual(sourceLines.getMutatedLine(lineNumber, mutation), mutatedLines[lineNumber - 1])
+
+    def test_mutantWrite(self):
+        from littledarwin.JavaMutate import JavaMutate
+
+        tree = self.javaParse.parse(self.java8SourceCode)
+        mutantList, mutantTypes = JavaMutate(tree, self.java8SourceCode, self.javaParse).gatherMutants(["All"])
+        self.assertGreater(len(mutantList), 0)
+
+        for mutant in mutantList:
+            mutantFile = io.StringIO()
+            mutant.write(mutantFile)
+            self.assertIsNone(mutant.mutatedCode)
+            self.assertEqual(mutantFile.getvalue(), str(mutant))
+            self.assertEqual(mutantFile.getvalue(), mutant.stub + mutant.mutationList[0].applyMutation(mutant.sourceCode))
+
+    def test_mutationDispatcher(self):
+        from littledarwin.JavaMutate import JavaMutate, MutationDispatcher, MutationOperator
+        from littledarwin.JavaMutate import getAllInstantiableSubclasses
+
+        for sourceCode in [self.java8SourceCode, self.methodTypesSourceCode]:
+            for javaParse in [self.javaParse, JavaParse(flatTrees=True)]:
+                tree = javaParse.parse(sourceCode)
+                unindexedParse = JavaParse()  # walks the tree instead of using the index
+                for dispatchParse in [javaParse, unindexedParse]:
+                    dispatcher = MutationDispatcher(tree, dispatchParse)
+                    operators = [(MO(tree, sourceCode, javaParse),
+                                  MO(tree, sourceCode, dispatchParse, True, dispatcher))
+                                 for MO in getAllInstantiableSubclasses(MutationOperator)]
+                    dispatcher.dispatch()
+
+                    for mO, dispatchedMO in operators:
+                        self.assertEqual(mO.mutableNodes, dispatchedMO.mutableNodes)
+                        self.assertEqual([str(mutant) for mutant in mO.mutants],
+                                         [str(mutant) for mutant in dispatchedMO.mutants])
+
+                self.assertGreater(len(JavaMutate(tree, sourceCode, javaParse).gatherMutants(["All"])[0]), 0)
+
+    def test_operatorRegistry(self):
+        from littledarwin.JavaMutate import JavaMutate, MutationDispatcher, MutationOperator, \
+            MutationOperatorRegistry, Mutant, Mutation, getAllInstantiableSubclasses
+        from antlr4.tree.Tree import TerminalNodeImpl
+
+        class IncrementOne(MutationOperator):
+            instantiable = False  # only used through the registry it is registered with
+            metaTypes = ["External"]
+            nodeTypes = (TerminalNodeImpl,)
+
+            def __init__(self, sourceTree, sourceCode, javaParseObject, generateMutants=True, dispatcher=None):
+                super().__init__(sourceTree, sourceCode, javaParseObject)
+                self.mutatorType = "IncrementOne"
+                self.collectMutants(generateMutants, dispatcher)
+
+            def visitNode(self, node):
+                if node.symbol.text == "1":
+                    self.mutableNodes.append(node)
+
+            def iterateMutants(self):
+                for mutantID, node in enumerate(self.mutableNodes):
+                    yield Mutant(mutantID, [Mutation(node.symbol.start, node.symbol.stop, node.symbol.line,
+                                                     node.nodeIndex, self.mutatorType, "2")], self.sourceCode)
+
+        registry = MutationOperatorRegistry()
+        allOperators = sorted(getAllInstantiableSubclasses(MutationOperator), key=lambda mo: mo.__name__)
+        self.assertEqual(registry.getOperatorClasses(["All"]),
+                         [MO for MO in allOperators if "All" in MO.metaTypes])
+        self.assertIs(registry.getOperatorClasses(["All"]), registry.getOperatorClasses(["All"]))
+        self.assertEqual(registry.getOperatorClasses(["External"]), [])
+
+        self.assertIs(registry.register(IncrementOne), IncrementOne)
+        self.assertEqual(registry.getOperatorClasses(["External"]), [IncrementOne])
+        self.assertRaises(ValueError, registry.register, JavaMutate)
+
+        tree = self.javaParse.parse(self.factorialSourceCode)
+        dispatcher = MutationDispatcher(tree, self.javaParse, isProfiling=True)
+        externalOperator = IncrementOne(tree, self.factorialSourceCode, self.javaParse, True, dispatcher)
+        dispatcher.dispatch()
+        self.assertGreater(len(externalOperator.mutants), 0)
+        self.assertGreater(externalOperator.candidateNodeCount, len(externalOperator.mutableNodes))
+        self.assertGreater(externalOperator.elapsedTime, 0)
+
+        # the profile of a file accounts for every operator and mutant.
+        javaMutate = JavaMutate(tree, self.factorialSourceCode, self.javaParse, profile=True)
+        mutantList, mutantTypes = javaMutate.gatherMutants(["All"])
+        operatorProfile = javaMutate.getOperatorProfile()
+        self.assertEqual([entry["operator"] for entry in operatorProfile],
+                         [mO.mutatorType for mO in javaMutate.mutationOperators])
+        self.assertEqual(sum(entry["mutants"] for entry in operatorProfile), len(mutantList))
+        for entry in operatorProfile:
+            self.assertGreaterEqual(entry["candidateNodes"], entry["mutableNodes"])
+            self.assertGreaterEqual(entry["seconds"], 0)
+
+    def test_prescan(self):
+        javaParse = JavaParse()
+        tokenTexts = javaParse.prescan(self.factorialSourceCode)
+        self.assertTrue({"class", "return", "*=", "<=", "++"}.issubset(tokenTexts))
+        self.assertNotIn("null", tokenTexts)
+
+        tree = javaParse.parse(self.factorialSourceCode)
+        self.assertIsNone(javaParse.prescannedTokenStream)
+        self.assertEqual(self.flattenTree(self.javaParse.parse(self.factorialSourceCode)), self.flattenTree(tree))
+
+    def test_prescanMayHaveMutants(self):
+        from littledarwin.JavaMutate import JavaMutate, mayHaveMutants
+
+        interfaceSourceCode = "interface I { static int twice(int a) { return a * 2; } double area(); }"
+        nullCountSourceCode = "class C { static boolean f(int nullCount) { return nullCount == 0; } }"
+        self.assertFalse(mayHaveMutants(self.javaParse.prescan("package p; import java.util.List;"), ["Method", "Null"]))
+
+        for sourceCode in [interfaceSourceCode, nullCountSourceCode, self.factorialSourceCode,
+                           self.java7SourceCode, self.java8SourceCode, self.methodTypesSourceCode]:
+            tokenTexts = self.javaParse.prescan(sourceCode)
+            for metaType in ["Traditional", "Method", "Null"]:
+                tree = self.javaParse.parse(sourceCode)
+                mutantList = JavaMutate(tree, sourceCode, self.javaParse).gatherMutants([metaType])[0]
+                if len(mutantList) > 0:
+                    self.assertTrue(mayHaveMutants(tokenTexts, [metaType]), metaType)
+
+        self.assertTrue(mayHaveMutants(self.javaParse.prescan(interfaceSourceCode), ["Method"]))
+        self.assertTrue(mayHaveMutants(self.javaParse.prescan(nullCountSourceCode), ["Null"]))
+
+    def test_parseCache(self):
+        with tempfile.TemporaryDirectory() as cacheDirectory:
+            javaParse = JavaParse(parseCache=ParseCache(cacheDirectory, "test"))
+            tree = javaParse.parse(self.factorialSourceCode)
+            cachedTree = javaParse.parse(self.factorialSourceCode)
+
+            self.assertEqual(javaParse.parseCache.misses, 1)
+            self.assertEqual(javaParse.parseCache.hits, 1)
+            self.assertEqual(self.flattenTree(tree), self.flattenTree(cachedTree))
+            self.assertEqual(javaParse.getCyclomaticComplexityAllMethods(cachedTree),
+                             javaParse.getCyclomaticComplexityAllMethods(tree))
+
+    def test_recognizerCache(self):
+        from littledarwin.JavaLexer import JavaLexer
+        from littledarwin.JavaParser import JavaParser
+
+        recognizers = (JavaLexer.atn, JavaLexer.decisionsToDFA, JavaParser.atn, JavaParser.decisionsToDFA)
+        try:
+            with tempfile.TemporaryDirectory() as cacheDirectory:
+                tree = self.javaParse.parse(self.java8SourceCode)
+                ParseCache(cacheDirectory, "test").storeRecognizers()
+
+                parseCache = ParseCache(cacheDirectory, "test")
+                self.assertTrue(parseCache.loadRecognizers())
+                self.assertIsNot(JavaParser.decisionsToDFA, recognizers[3])
+                self.assertEqual(parseCache.recognizerStateSize, ParseCache.getRecognizerStateSize())
+                self.assertEqual(self.flattenTree(tree), self.flattenTree(JavaParse().parse(self.java8SourceCode)))
+
+        finally:
+            JavaLexer.atn, JavaLexer.decisionsToDFA, JavaParser.atn, JavaParser.decisionsToDFA = recognizers
+
+    def test_twoStageParsing(self):
+        javaParse = JavaParse(twoStageParsing=True)
+        for sourceCode in [self.java7SourceCode, self.java8SourceCode, self.methodTypesSourceCode]:
+            tree = javaParse.parse(sourceCode)
+            self.assertEqual(javaParse.parseStage, "SLL")
+            self.assertEqual(self.flattenTree(tree), self.flattenTree(self.javaParse.parse(sourceCode)))
+
+        self.assertRaises(ParseCancellationException, javaParse.parse, self.issue13Code)
+        self.assertEqual(javaParse.parseStageCount, {"SLL": 3})
+
+    def test_seekAllNodesIndexed(self):
+        from antlr4.tree.Tree import TerminalNodeImpl
+        from littledarwin.JavaParser import JavaParser
+
+        tree = self.javaParse.parse(self.java8SourceCode)
+        unindexedParse = JavaParse()  # has never numerified this tree, so it walks it instead
+        self.assertTrue(self.javaParse.isIndexed(tree))
+        self.assertFalse(unindexedParse.isIndexed(tree))
+
+        nodeTypes = [JavaParser.MethodDeclarationContext, JavaParser.ExpressionContext, TerminalNodeImpl,
+                     (JavaParser.PrimaryContext, JavaParser.LiteralContext), JavaParser.AnnotationTypeDeclarationContext]
+        for subtree in [tree] + unindexedParse.seekAllNodes(tree, JavaParser.MethodDeclarationContext):
+            for nodeType in nodeTypes:
+                indexedNodes = self.javaParse.seekAllNodes(subtree, nodeType)
+                walkedNodes = unindexedParse.seekAllNodes(subtree, nodeType)
+                self.assertEqual(len(indexedNodes), len(walkedNodes))
+                self.assertTrue(all(a is b for a, b in zip(indexedNodes, walkedNodes)))
+
+    def test_getNodeIndexed(self):
+        from littledarwin.JavaParser import JavaParser
+
+        tree = self.javaParse.parse(self.factorialSourceCode)
+        unindexedParse = JavaParse()
+        methodDeclaration = self.javaParse.seekAllNodes(tree, JavaParser.MethodDeclarationContext)[0]
+        nodeCount = len(self.javaParse.flatTree) + 1
+
+        for subtree in [tree, methodDeclaration]:
+            for nodeIndex in range(0, nodeCount + 1):
+                self.assertIs(unindexedParse.getNode(subtree, nodeIndex), self.javaParse.getNode(subtree, nodeIndex))
+                self.assertEqual(unindexedParse.seekNode(subtree, nodeIndex),
+                                 self.javaParse.seekNode(subtree, nodeIndex))
+            unindexedParse.lookupTable = dict()
+
+        for node1 in range(1, nodeCount, 7):
+            for node2 in [1, methodDeclaration.nodeIndex, node1, nodeCount - node1]:
+                self.assertEqual(unindexedParse.distance(tree, node1, node2),
+                                 self.javaParse.distance(tree, node1, node2))
+
     def test_numerifyWrongTree(self):
         tree = ['This is the wrong type for a tree']
         try:
@@ -1,4 +1,8 @@
+import contextlib
+import csv
+import io
 import os
+import shelve
 import shutil
 import sys
 import unittest
@@ -8,6 +12,8 @@ import zipfile
 from io import BytesIO
 
 from littledarwin import LittleDarwin
+from littledarwin.JavaIO import JavaIO
+from littledarwin.MutationDatabase import MutationDatabase, openMutationDatabase
 
 
 class TestLittleDarwin(unittest.TestCase):
@@ -53,6 +59,423 @@ class TestLittleDarwin(unittest.TestCase):
         except SystemExit as e:
             self.assertEqual(int(e.code), 0)
 
+    def test_VideoStoreGenerateMutantsParallel(self):
+        resultsPath = os.path.join(self.videoStoreBuildPath, "LittleDarwinResults")
+        generatedMutants = dict()
+
+        for jobs in ["1", "2"]:
+            argList = ['-m', '--all', '-j', jobs, '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath]
+            print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+            self.assertEqual(LittleDarwin.main(argList), 0)
+
+            mutationDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase"), "r")
+            for key in mutationDatabase.keys():
+                for mutantPath in mutationDatabase[key]:
+                    with open(os.path.join(resultsPath, mutantPath), 'r') as mutantFile:
+                        generatedMutants[(jobs, mutantPath)] = mutantFile.read()
+            mutationDatabase.close()
+            shutil.rmtree(resultsPath)
+
+        serialMutants = sorted((path, text) for (jobs, path), text in generatedMutants.items() if jobs == "1")
+        parallelMutants = sorted((path, text) for (jobs, path), text in generatedMutants.items() if jobs == "2")
+        self.assertGreater(len(serialMutants), 0)
+        self.assertEqual(serialMutants, parallelMutants)
+
+    def test_VideoStoreGenerateMutantsPrescan(self):
+        resultsPath = os.path.join(self.videoStoreBuildPath, "LittleDarwinResults")
+        interfacePath = os.path.join(self.videoStoreSourcePath, "java", "videostore", "Priced.java")
+        with open(interfacePath, 'w') as interfaceFile:
+            interfaceFile.write("package videostore;\npublic interface Priced {\n    double getCharge(int days);\n}\n")
+
+        generatedMutants = dict()
+        for prescanArgs in [[], ['--prescan', '-j', '2']]:
+            argList = ['-m', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath] + prescanArgs
+            print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+            self.assertEqual(LittleDarwin.main(argList), 0)
+
+            mutationDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase"), "r")
+            generatedMutants[len(prescanArgs)] = dict(mutationDatabase)
+            mutationDatabase.close()
+            shutil.rmtree(resultsPath)
+
+        self.assertGreater(len(generatedMutants[0]), 0)
+        self.assertEqual(generatedMutants[0], generatedMutants[3])
+
+    def test_VideoStoreGenerateMutantsIncremental(self):
+        resultsPath = os.path.join(self.videoStoreBuildPath, "LittleDarwinResults")
+        videoStorePath = os.path.join(self.videoStoreSourcePath, "java", "videostore")
+        argList = ['-m', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath, '--incremental']
+
+        def runIncremental():
+            print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+            self.assertEqual(LittleDarwin.main(argList), 0)
+
+            mutationDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase"), "r")
+            generatedMutants = dict(mutationDatabase)
+            mutationDatabase.close()
+
+            mutantContents = dict()
+            for fileRelativePath, targetList in generatedMutants.items():
+                for targetFile in targetList:
+                    with open(os.path.join(resultsPath, targetFile), 'r') as mutantFile:
+                        mutantContents[targetFile] = mutantFile.read()
+
+            return generatedMutants, mutantContents
+
+        firstMutants, firstContents = runIncremental()
+        self.assertGreater(len(firstMutants), 0)
+
+        # a run without any changes keeps everything as it was.
+        self.assertEqual(runIncremental(), (firstMutants, firstContents))
+
+        # only the mutants of the changed file are generated again.
+        moviePath = os.path.join(videoStorePath, "Movie.java")
+        movieKey = os.path.join("java", "videostore", "Movie.java")
+        with open(moviePath, 'a') as movieFile:
+            movieFile.write("\nclass Discount {\n    int apply(int price) {\n        return price / 2;\n    }\n}\n")
+
+        secondMutants, secondContents = runIncremental()
+        self.assertGreater(len(secondMutants[movieKey]), len(firstMutants[movieKey]))
+        for fileRelativePath in firstMutants.keys():
+            if fileRelativePath != movieKey:
+                self.assertEqual(secondMutants[fileRelativePath], firstMutants[fileRelativePath])
+                for targetFile in firstMutants[fileRelativePath]:
+                    self.assertEqual(secondContents[targetFile], firstContents[targetFile])
+
+        # the mutants of a deleted file are removed.
+        os.remove(moviePath)
+        thirdMutants, thirdContents = runIncremental()
+        self.assertNotIn(movieKey, thirdMutants)
+        self.assertFalse(os.path.exists(os.path.join(resultsPath, movieKey)))
+
+        # and the results are the same as those of a complete run.
+        shutil.rmtree(resultsPath)
+        self.assertEqual(runIncremental(), (thirdMutants, thirdContents))
+
+    def test_VideoStoreGenerateMutantsDeduplicated(self):
+        resultsPath = os.path.join(self.videoStoreBuildPath, "LittleDarwinResults")
+        generatedMutants = dict()
+
+        for deduplicateArgs in [[], ['--deduplicate']]:
+            argList = ['-m', '--all', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath] + deduplicateArgs
+            print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+            self.assertEqual(LittleDarwin.main(argList), 0)
+
+            mutationDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase"), "r")
+            generatedMutants[len(deduplicateArgs)] = dict(mutationDatabase)
+            mutationDatabase.close()
+
+        duplicateDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase-duplicates"), "r")
+        droppedMutants = dict()
+        for key, redundantMutants in duplicateDatabase.items():
+            for keptMutant, duplicates in redundantMutants["duplicates"].items():
+                self.assertIn(keptMutant, generatedMutants[1][key])
+            droppedMutants[key] = sum(len(duplicates) for duplicates in redundantMutants["duplicates"].values()) + \
+                len(redundantMutants["equivalent"])
+        duplicateDatabase.close()
+
+        self.assertGreater(sum(droppedMutants.values()), 0)
+        for key in generatedMutants[0].keys():
+            self.assertEqual(len(generatedMutants[1][key]), len(generatedMutants[0][key]) - droppedMutants.get(key, 0))
+
+    def test_VideoStoreGenerateMutantsSampled(self):
+        resultsPath = os.path.join(self.videoStoreBuildPath, "LittleDarwinResults")
+
+        def runSampled(sampleArgs):
+            argList = ['-m', '--all', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath] + sampleArgs
+            print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+            self.assertEqual(LittleDarwin.main(argList), 0)
+
+            mutationDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase"), "r")
+            generatedMutants = dict()
+            for key, targetList in mutationDatabase.items():
+                generatedMutants[key] = list()
+                for targetFile in targetList:
+                    with open(os.path.join(resultsPath, targetFile), 'r') as mutantFile:
+                        generatedMutants[key].append(mutantFile.read())
+                # the aggregate report only marks the mutations of the mutants that were written.
+                with open(os.path.join(resultsPath, key, "aggregate.html"), 'r') as aggregateReport:
+                    self.assertLessEqual(aggregateReport.read().count("class=\"tooltiptext\""),
+                                         sum(mutant.count("mutant type: ") for mutant in generatedMutants[key]))
+            mutationDatabase.close()
+            shutil.rmtree(resultsPath)
+
+            return generatedMutants
+
+        allMutants = runSampled([])
+        totalMutantCount = sum(len(mutants) for mutants in allMutants.values())
+
+        perFileSample = runSampled(['--sample', '2', '--seed', '5'])
+        for key, mutants in allMutants.items():
+            self.assertEqual(len(perFileSample[key]), min(2, len(mutants)))
+            self.assertTrue(all(mutant in mutants for mutant in perFileSample[key]))
+
+        projectSample = runSampled(['--sample', '25%', '--sample-scope', 'project', '--seed', '5', '-j', '2'])
+        self.assertEqual(sum(len(mutants) for mutants in projectSample.values()), -(-totalMutantCount // 4))
+        for key, mutants in projectSample.items():
+            self.assertTrue(all(mutant in allMutants[key] for mutant in mutants))
+
+        # the same seed gives the same sample.
+        self.assertEqual(runSampled(['--sample', '25%', '--sample-scope', 'project', '--seed', '5']), projectSample)
+
+        # without a seed, both passes still combine the higher-order mutants alike, so a full sample is every mutant.
+        runOutput = io.StringIO()
+        with contextlib.redirect_stdout(runOutput):
+            runSampled(['--higher-order', '3', '--sample', '100%', '--sample-scope', 'project'])
+        outputLines = runOutput.getvalue().splitlines()
+        totalLine = [line for line in outputLines if line.startswith("Total mutations found:")][0]
+        sampledLine = [line for line in outputLines if line.startswith("Sampled mutants:")][0]
+        self.assertEqual(totalLine.split(":")[1].strip(), sampledLine.split(":")[1].strip())
+
+    def test_VideoStoreGenerateMutantsAsPatches(self):
+        resultsPath = os.path.join(self.videoStoreBuildPath, "LittleDarwinResults")
+        argList = ['-m', '--all', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath]
+        print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+        self.assertEqual(LittleDarwin.main(argList), 0)
+
+        mutationDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase"), "r")
+        generatedMutants = dict()
+        for key, targetList in mutationDatabase.items():
+            generatedMutants[key] = list()
+            for targetFile in targetList:
+                with open(os.path.join(resultsPath, targetFile), 'r') as mutantFile:
+                    generatedMutants[key].append(mutantFile.read())
+        mutationDatabase.close()
+        shutil.rmtree(resultsPath)
+
+        argList.append('--patch-storage')
+        print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+        self.assertEqual(LittleDarwin.main(argList), 0)
+
+        # only the original files are written, and each mutant is written from its patch as it is needed.
+        mutationDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase"), "r")
+        patchDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase-patches"), "r")
+        javaIO = JavaIO()
+        mutantFilePath = os.path.join(self.videoStoreBuildPath, "mutant.java")
+        self.assertEqual(sorted(mutationDatabase.keys()), sorted(generatedMutants.keys()))
+        for key, targetList in mutationDatabase.items():
+            self.assertEqual(len(patchDatabase[key]), len(targetList))
+            for targetFile, patch, generatedMutant in zip(targetList, patchDatabase[key], generatedMutants[key]):
+                self.assertFalse(os.path.exists(os.path.join(resultsPath, targetFile)))
+                javaIO.materializeMutant(mutantFilePath, patch,
+                                         javaIO.getFileContent(os.path.join(resultsPath, key, "original.java")))
+                with open(mutantFilePath, 'r') as mutantFile:
+                    self.assertEqual(mutantFile.read(), generatedMutant)
+        patchDatabase.close()
+        mutationDatabase.close()
+        os.remove(mutantFilePath)
+        shutil.rmtree(resultsPath)
+
+    def test_generateNewFilesNumbering(self):
+        with tempfile.TemporaryDirectory() as workDirectory:
+            sourceDirectory = os.path.join(workDirectory, "src")
+            targetDirectory = os.path.join(workDirectory, "LittleDarwinResults")
+            os.makedirs(os.path.join(targetDirectory, "Movie.java"))
+            os.makedirs(sourceDirectory)
+            sourceFile = os.path.join(sourceDirectory, "Movie.java")
+            with open(sourceFile, 'w') as contentFile:
+                contentFile.write("class Movie {}\n")
+
+            # the mutants left from an earlier run keep their numbers.
+            for mutantNumber in [1, 2, 4]:
+                with open(os.path.join(targetDirectory, "Movie.java", str(mutantNumber) + ".java"), 'w') as mutantFile:
+                    mutantFile.write("old mutant\n")
+
+            javaIO = JavaIO()
+            javaIO.sourceDirectory = sourceDirectory
+            javaIO.targetDirectory = targetDirectory
+            targetList = javaIO.generateNewFiles(sourceFile, ["mutant 1\n", "mutant 2\n", "mutant 3\n"])
+            targetList.append(javaIO.generateNewFile(sourceFile, "mutant 4\n"))
+
+            self.assertEqual(targetList, [os.path.join("Movie.java", str(mutantNumber) + ".java")
+                                          for mutantNumber in [3, 5, 6, 7]])
+            with open(os.path.join(targetDirectory, "Movie.java", "4.java"), 'r') as mutantFile:
+                self.assertEqual(mutantFile.read(), "old mutant\n")
+            with open(os.path.join(targetDirectory, "Movie.java", "6.java"), 'r') as mutantFile:
+                self.assertEqual(mutantFile.read(), "mutant 3\n")
+
+            # the density and complexity reports are written once, by their own call.
+            self.assertFalse(os.path.exists(os.path.join(targetDirectory, "Movie.java", "aggregate.html")))
+            javaIO.writeFileArtifacts(sourceFile, {1: 4}, "report", {"Movie": [4, 1, 1]})
+            javaIO.writeFileArtifacts(sourceFile, {1: 5}, "another report", {"Movie": [5, 1, 1]})
+            with open(os.path.join(targetDirectory, "Movie.java", "MutantDensityPerLine.csv"), 'r') as densityFile:
+                self.assertEqual(densityFile.read(), "1,4\n")
+            with open(os.path.join(targetDirectory, "Movie.java", "ComplexityPerMethod.csv"), 'r') as complexityFile:
+                self.assertEqual(complexityFile.read(), "Movie;4;1;1\n")
+
+    def test_VideoStoreGenerateMutantsSQLite(self):
+        resultsPath = os.path.join(self.videoStoreBuildPath, "LittleDarwinResults")
+        argList = ['-m', '--all', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath]
+        print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+        self.assertEqual(LittleDarwin.main(argList), 0)
+
+        mutationDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase"), "r")
+        shelveMutants = dict(mutationDatabase.items())
+        mutationDatabase.close()
+        shutil.rmtree(resultsPath)
+
+        argList.extend(['--database-format', 'sqlite'])
+        print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+        self.assertEqual(LittleDarwin.main(argList), 0)
+
+        # the build phase finds the SQLite database where it looks for the shelve database.
+        mutationDatabase = openMutationDatabase(os.path.join(resultsPath, "mutationdatabase"))
+        self.assertIsInstance(mutationDatabase, MutationDatabase)
+        self.assertEqual(dict(mutationDatabase.items()), shelveMutants)
+
+        key = "java/videostore/Customer.java"
+        removeMethodMutants = list()
+        for targetList in shelveMutants.values():
+            for targetFile in targetList:
+                with open(os.path.join(resultsPath, targetFile), 'r') as mutantFile:
+                    if "mutant type: RemoveMethod\n" in mutantFile.read():
+                        removeMethodMutants.append(targetFile)
+        self.assertGreater(len(removeMethodMutants), 0)
+        self.assertEqual([mutant["path"] for mutant in mutationDatabase.queryMutants(operator="RemoveMethod")],
+                         sorted(removeMethodMutants, key=lambda targetFile: (
+                             os.path.dirname(targetFile), int(os.path.basename(targetFile)[:-5]))))
+        self.assertTrue(all(mutant["status"] is None for mutant in mutationDatabase.queryMutants(key)))
+        methodMutants = mutationDatabase.queryMutants(key, method="Customer.addRental( Rental rental )")
+        self.assertEqual(len(methodMutants), 6)
+
+        mutationDatabase.putResult(shelveMutants[key][0], "killed", 1.5, "java/videostore/Customer.java/1.txt")
+        self.assertEqual(mutationDatabase.queryMutants(status="killed"),
+                         [{"file": key, "path": shelveMutants[key][0], "status": "killed", "duration": 1.5,
+                           "outputPath": "java/videostore/Customer.java/1.txt"}])
+        mutationDatabase.close()
+        shutil.rmtree(resultsPath)
+
+    def test_importShelveDatabase(self):
+        with tempfile.TemporaryDirectory() as workDirectory:
+            shelvePath = os.path.join(workDirectory, "mutationdatabase")
+            mutationDatabase = shelve.open(shelvePath, "c")
+            mutationDatabase["pkg/A.java"] = ["pkg/A.java/1.java", "pkg/A.java/2.java"]
+            mutationDatabase["pkg/B.java"] = ["pkg/B.java/1.java"]
+            mutationDatabase.close()
+            resultsDatabase = shelve.open(shelvePath + "-results", "c")
+            resultsDatabase["pkg/A.java"] = (["2.java"], ["1.java"])
+            resultsDatabase.close()
+
+            sqliteDatabase = MutationDatabase(shelvePath + ".sqlite", "n")
+            sqliteDatabase.importShelve(shelvePath, shelvePath + "-results")
+            self.assertEqual(sqliteDatabase.keys(), ["pkg/A.java", "pkg/B.java"])
+            self.assertEqual(sqliteDatabase["pkg/A.java"], ["pkg/A.java/1.java", "pkg/A.java/2.java"])
+            self.assertEqual([mutant["path"] for mutant in sqliteDatabase.queryMutants(status="survived")],
+                             ["pkg/A.java/2.java"])
+
+            del sqliteDatabase["pkg/A.java"]
+            self.assertNotIn("pkg/A.java", sqliteDatabase)
+            self.assertEqual(len(sqliteDatabase), 1)
+            self.assertEqual(sqliteDatabase.queryMutants(status="killed"), list())
+            sqliteDatabase.close()
+
+    def test_VideoStoreGenerateMutantsArchive(self):
+        resultsPath = os.path.join(self.videoStoreBuildPath, "LittleDarwinResults")
+        argList = ['-m', '--all', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath]
+        print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+        self.assertEqual(LittleDarwin.main(argList), 0)
+
+        generatedFiles = dict()
+        for directoryPath, directoryNames, fileNames in os.walk(resultsPath):
+            for fileName in fileNames:
+                filePath = os.path.join(directoryPath, fileName)
+                if os.path.dirname(filePath) != resultsPath:
+                    with open(filePath, 'rb') as generatedFile:
+                        generatedFiles[os.path.relpath(filePath, resultsPath).replace(os.sep, "/")] = \
+                            generatedFile.read()
+        shutil.rmtree(resultsPath)
+
+        argList.extend(['--archive', '-j', '2'])
+        print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+        self.assertEqual(LittleDarwin.main(argList), 0)
+
+        # the archive holds what would otherwise be the directory of each source file.
+        self.assertFalse(any(os.path.isdir(os.path.join(resultsPath, fileName))
+                             for fileName in os.listdir(resultsPath)))
+        with zipfile.ZipFile(os.path.join(resultsPath, "mutationarchive.zip"), 'r') as mutationArchive:
+            self.assertEqual(sorted(mutationArchive.namelist()), sorted(generatedFiles.keys()))
+            for fileName in generatedFiles.keys():
+                if not fileName.endswith(".html"):
+                    self.assertEqual(mutationArchive.read(fileName), generatedFiles[fileName])
+        shutil.rmtree(resultsPath)
+
+    def test_VideoStoreBuildArchive(self):
+        resultsPath = os.path.join(self.videoStoreBuildPath, "LittleDarwinResults")
+        archivePath = os.path.join(resultsPath, "mutationarchive.zip")
+        argList = ['-m', '--all', '--archive', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath]
+        print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+        self.assertEqual(LittleDarwin.main(argList), 0)
+
+        # the build fails for the mutants that remove a method, and passes for the rest.
+        sourcePattern = os.path.join(self.videoStoreSourcePath, "java", "videostore", "*.java")
+        buildCommand = ",".join([sys.executable, "-c", "import glob; import sys; sys.exit(any('RemoveMethod' in "
+                                                       "open(f).read() for f in glob.glob('" + sourcePattern + "')))"])
+        argList = ['-b', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath, '-c', buildCommand]
+        print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+        self.assertEqual(LittleDarwin.main(argList), 0)
+
+        mutationDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase"), "r")
+        resultsDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase-results"), "r")
+        with zipfile.ZipFile(archivePath, 'r') as mutationArchive:
+            archivedNames = mutationArchive.namelist()
+            self.assertEqual(len(archivedNames), len(set(archivedNames)))
+            for key, targetList in mutationDatabase.items():
+                self.assertIn(key + "/index.html", archivedNames)
+                survived, killed = resultsDatabase[key]
+                for targetFile in targetList:
+                    self.assertIn(os.path.splitext(targetFile)[0] + ".txt", archivedNames)
+                    isRemoveMethod = "RemoveMethod" in mutationArchive.read(targetFile).decode()
+                    self.assertIn(os.path.basename(targetFile), killed if isRemoveMethod else survived)
+        resultsDatabase.close()
+        mutationDatabase.close()
+        self.assertFalse(os.path.exists(os.path.join(resultsPath, "mutationarchive-build")))
+
+        # an unfinished part left by an interrupted build phase is dropped, and running the build phase again
+        # replaces the outputs instead of adding them twice.
+        os.makedirs(os.path.join(resultsPath, "mutationarchive-build"))
+        with open(os.path.join(resultsPath, "mutationarchive-build", "1.zip.tmp"), 'wb') as unfinishedPart:
+            unfinishedPart.write(b"PK")
+        self.assertEqual(LittleDarwin.main(argList), 0)
+        with zipfile.ZipFile(archivePath, 'r') as mutationArchive:
+            self.assertEqual(mutationArchive.namelist(), archivedNames)
+        self.assertFalse(os.path.exists(os.path.join(resultsPath, "mutationarchive-build")))
+        shutil.rmtree(resultsPath)
+
+    def test_VideoStoreCountMutants(self):
+        resultsPath = os.path.join(self.videoStoreBuildPath, "LittleDarwinResults")
+        argList = ['-m', '--all', '--count-only', '--build-duration', '2', '-p', self.videoStoreSourcePath,
+                   '-t', self.videoStoreBuildPath]
+        print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+        self.assertEqual(LittleDarwin.main(argList), 0)
+
+        # nothing but the report is written.
+        self.assertEqual(os.listdir(resultsPath), ["MutantCountReport.csv"])
+        with open(os.path.join(resultsPath, "MutantCountReport.csv"), 'r', newline='') as countReport:
+            countRows = list(csv.DictReader(countReport))
+        countedMutants = dict((row["File"], int(row["Mutants"])) for row in countRows if row["Scope"] == "file")
+        totalRow = countRows[-1]
+        self.assertEqual(totalRow["Scope"], "total")
+        self.assertEqual(int(totalRow["EstimatedBuildSeconds"]), 2 * int(totalRow["Mutants"]))
+
+        argList = ['-m', '--all', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath]
+        print("Running LittleDarwin with arguments:\n" + " ".join(argList))
+        self.assertEqual(LittleDarwin.main(argList), 0)
+
+        mutationDatabase = shelve.open(os.path.join(resultsPath, "mutationdatabase"), "r")
+        generatedMutants = dict((key, len(targetList)) for key, targetList in mutationDatabase.items())
+        mutationDatabase.close()
+
+        self.assertGreater(len(generatedMutants), 0)
+        self.assertEqual(dict((key, count) for key, count in countedMutants.items() if count > 0), generatedMutants)
+        self.assertEqual(int(totalRow["Mutants"]), sum(generatedMutants.values()))
+
+        # without the mutation phase, there is nothing to count.
+        argList = ['-b', '--count-only', '-p', self.videoStoreSourcePath, '-t', self.videoStoreBuildPath]
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(SystemExit) as exitContext:
+                LittleDarwin.main(argList)
+        self.assertEqual(exitContext.exception.code, 4)
+
     def test_VideoStoreTraditionalBuild(self):
         mavenPath = shutil.which("mvn")
         if mavenPath is None: